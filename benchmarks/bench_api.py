@@ -0,0 +1,131 @@
+"""
+Benchmark de carga de la API JSON (src/ui/api/app.py): levanta el servidor ASGI (uvicorn) en otro
+proceso sobre una red cuadrícula y mide peticiones por segundo y latencias con clientes concurrentes.
+Compara la ejecución en hilos (procesos=0) con el pool de procesos.
+
+Uso: python -m benchmarks.bench_api [lado] [segundos] [concurrencia] [procesos]
+"""
+
+import asyncio
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+from benchmarks.redes import red_cuadricula
+from src.model.snapshot import guardar_snapshot
+
+
+def servidor(ruta_snapshot: str, procesos: int, puerto: int):
+    """
+    Proceso servidor: sirve la API sobre la red de la instantánea dada.
+    """
+    import uvicorn
+
+    from src.model.snapshot import abrir_snapshot
+    from src.ui.api.app import crear_app
+
+    app = crear_app(cargar=lambda: abrir_snapshot(ruta_snapshot), procesos=procesos)
+    uvicorn.run(app, host="127.0.0.1", port=puerto, log_level="warning")
+
+
+def _puerto_libre() -> int:
+    """
+    Devuelve un puerto TCP libre en localhost.
+    """
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+async def _esperar_servidor(url: str, limite: float = 60):
+    """
+    Espera a que el servidor responda (la primera petición también carga la red).
+    """
+    fin = time.perf_counter() + limite
+    async with httpx.AsyncClient() as cliente:
+        while True:
+            try:
+                if (await cliente.get(url + "/api/componentes")).status_code == 200:
+                    return
+            except httpx.TransportError:
+                if time.perf_counter() > fin:
+                    raise
+            await asyncio.sleep(0.2)
+
+
+async def _carga(url: str, nombres, segundos: float, concurrencia: int):
+    """
+    Lanza 'concurrencia' clientes que repiten consultas durante 'segundos': 90 % caminos más cortos
+    entre pares al azar y 10 % de 3 caminos alternativos. Devuelve (latencias, errores).
+    """
+    latencias = []
+    errores = 0
+    fin = time.perf_counter() + segundos
+
+    async def cliente_carga(semilla):
+        nonlocal errores
+        rnd = random.Random(semilla)
+        async with httpx.AsyncClient(base_url=url, timeout=60) as cliente:
+            while time.perf_counter() < fin:
+                origen, destino = rnd.sample(nombres, 2)
+                if rnd.random() < 0.9:
+                    peticion = cliente.get("/api/camino", params={"origen": origen, "destino": destino})
+                else:
+                    peticion = cliente.get("/api/k_caminos", params={"origen": origen, "destino": destino, "k": 3})
+                inicio = time.perf_counter()
+                respuesta = await peticion
+                latencias.append(time.perf_counter() - inicio)
+                if respuesta.status_code != 200:
+                    errores += 1
+
+    await asyncio.gather(*(cliente_carga(i) for i in range(concurrencia)))
+    return latencias, errores
+
+
+def medir(ruta_snapshot: str, nombres, procesos: int, segundos: float, concurrencia: int):
+    """
+    Levanta el servidor con la cantidad de procesos dada, lo somete a carga y muestra los resultados.
+    """
+    puerto = _puerto_libre()
+    url = f"http://127.0.0.1:{puerto}"
+    proceso = subprocess.Popen([sys.executable, "-m", "benchmarks.bench_api", "servidor",
+                                ruta_snapshot, str(procesos), str(puerto)])
+    try:
+        asyncio.run(_esperar_servidor(url))
+        latencias, errores = asyncio.run(_carga(url, nombres, segundos, concurrencia))
+    finally:
+        proceso.terminate()
+        proceso.wait()
+    latencias.sort()
+    p50 = latencias[len(latencias) // 2] * 1000
+    p99 = latencias[int(len(latencias) * 0.99)] * 1000
+    modo = "hilos" if procesos == 0 else f"{procesos} procesos"
+    print(f"{modo:>12}: {len(latencias) / segundos:8.1f} req/s  p50 {p50:7.1f} ms  p99 {p99:7.1f} ms  errores {errores}")
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == "servidor":
+        servidor(sys.argv[2], int(sys.argv[3]), int(sys.argv[4]))
+        return
+    lado = int(sys.argv[1]) if len(sys.argv) > 1 else 60
+    segundos = float(sys.argv[2]) if len(sys.argv) > 2 else 10
+    concurrencia = int(sys.argv[3]) if len(sys.argv) > 3 else 32
+    procesos = int(sys.argv[4]) if len(sys.argv) > 4 else os.cpu_count()
+    grafo = red_cuadricula(lado, semilla=2)
+    nombres = [e.nombre for e in grafo.obtener_estaciones()]
+    print(f"Red: {len(nombres)} estaciones; {concurrencia} clientes durante {segundos:.0f} s")
+    with tempfile.TemporaryDirectory() as directorio:
+        ruta_snapshot = os.path.join(directorio, "red.csr")
+        guardar_snapshot(grafo, ruta_snapshot)
+        for n in (0, procesos):
+            medir(ruta_snapshot, nombres, n, segundos, concurrencia)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""
+Benchmark: rendimiento de la carga masiva (rutas/s y memoria pico) en CSV y NDJSON,
+hacia Grafo (cargar_red) y directo a GrafoCSR (cargar_red_csr).
+
+Uso: python -m benchmarks.bench_carga [rutas]
+"""
+
+import json
+import os
+import random
+import resource
+import sys
+import tempfile
+
+from src.model.cargador import cargar_red, cargar_red_csr
+
+
+def _escribir_red(directorio, n_rutas, rnd):
+    """
+    Escribe una red aleatoria (unas 5 rutas por estación, sin pares repetidos) en CSV y NDJSON.
+    """
+    n_estaciones = max(2, n_rutas // 5)
+    pares = set()
+    while len(pares) < n_rutas:
+        a, b = rnd.randrange(n_estaciones), rnd.randrange(n_estaciones)
+        if a != b:
+            pares.add((a, b))
+    archivo_csv = os.path.join(directorio, "red.csv")
+    archivo_ndjson = os.path.join(directorio, "red.ndjson")
+    with open(archivo_csv, "w", encoding="utf-8") as f_csv, open(archivo_ndjson, "w", encoding="utf-8") as f_nd:
+        f_csv.write("origen,destino,peso\n")
+        for a, b in pares:
+            peso = rnd.randint(1, 20)
+            f_csv.write(f"S{a},S{b},{peso}\n")
+            f_nd.write(json.dumps({"origen": f"S{a}", "destino": f"S{b}", "peso": peso}) + "\n")
+    return archivo_csv, archivo_ndjson
+
+
+def main():
+    n_rutas = int(sys.argv[1]) if len(sys.argv) > 1 else 500_000
+    rnd = random.Random(0)
+    with tempfile.TemporaryDirectory() as directorio:
+        archivos = _escribir_red(directorio, n_rutas, rnd)
+        for archivo in archivos:
+            for nombre, cargar in (("csr", cargar_red_csr), ("grafo", cargar_red)):
+                _, estadisticas = cargar(archivo)
+                print(f"{os.path.basename(archivo):>11} -> {nombre:<6} {estadisticas}")
+    # ru_maxrss está en KiB en Linux
+    print(f"Memoria pico del proceso: {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.0f} MiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+"""
+Benchmark: simular_congestion (objetos Ruta) frente a simular_congestion_pesos (NumPy vectorizado),
+y el motor vectorizado solo sobre arreglos de millones de rutas.
+
+Uso: python -m benchmarks.bench_congestion [lado] [millones_de_rutas]
+"""
+
+import random
+import sys
+import time
+
+import numpy as np
+
+from benchmarks.redes import red_cuadricula
+from src.services.actualizacion import simular_congestion, simular_congestion_csr, simular_congestion_pesos
+
+
+def main():
+    lado = int(sys.argv[1]) if len(sys.argv) > 1 else 150
+    millones = float(sys.argv[2]) if len(sys.argv) > 2 else 5
+    grafo = red_cuadricula(lado, semilla=2)
+    csr = grafo.a_csr()
+    print(f"Red: {csr.num_estaciones()} estaciones, {csr.num_rutas()} rutas")
+    random.seed(2)
+    inicio = time.perf_counter()
+    simular_congestion(grafo, porcentaje=0.3)
+    t_objetos = time.perf_counter() - inicio
+    inicio = time.perf_counter()
+    simular_congestion_csr(csr, np.random.default_rng(2), porcentaje=0.3)
+    t_vectorizado = time.perf_counter() - inicio
+    print(f"objetos: {t_objetos:.3f} s   vectorizado: {t_vectorizado:.4f} s   ({t_objetos / t_vectorizado:.0f}x)")
+    m = int(millones * 1_000_000)
+    pesos = np.random.default_rng(0).integers(1, 30, m).astype(np.float64)
+    generador = np.random.default_rng(3)
+    inicio = time.perf_counter()
+    for _ in range(5):
+        pesos, _, _, _ = simular_congestion_pesos(pesos, generador, porcentaje=0.3)
+    print(f"{m} rutas: {(time.perf_counter() - inicio) / 5:.3f} s por paso de escenario")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+"""
+Benchmark: latencia por consulta de los modos de camino_corto ("dijkstra", "bidireccional", "alt")
+y de la jerarquía de contracción.
+
+Uso: python -m benchmarks.bench_consultas [lado] [consultas]
+"""
+
+import random
+import sys
+import time
+
+from benchmarks.redes import red_cuadricula
+from src.services.contraccion import JerarquiaContraccion
+from src.services.dijkstra import calcular_landmarks, camino_corto
+
+
+def main():
+    lado = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    n_consultas = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    grafo = red_cuadricula(lado, semilla=2)
+    estaciones = grafo.obtener_estaciones()
+    rnd = random.Random(2)
+    consultas = [tuple(rnd.sample(estaciones, 2)) for _ in range(n_consultas)]
+    inicio = time.perf_counter()
+    tabla = calcular_landmarks(grafo, cantidad=8)
+    print(f"Red: {len(estaciones)} estaciones; landmarks en {time.perf_counter() - inicio:.2f} s")
+    for modo in ("dijkstra", "bidireccional", "alt"):
+        inicio = time.perf_counter()
+        for origen, destino in consultas:
+            camino_corto(grafo, origen, destino, modo=modo, landmarks=tabla)
+        promedio = (time.perf_counter() - inicio) / n_consultas
+        print(f"{modo:>14}: {promedio * 1000:8.2f} ms/consulta")
+    inicio = time.perf_counter()
+    jerarquia = JerarquiaContraccion(grafo)
+    print(f"Jerarquía de contracción en {time.perf_counter() - inicio:.2f} s")
+    inicio = time.perf_counter()
+    for origen, destino in consultas:
+        jerarquia.camino_corto(origen, destino)
+    promedio = (time.perf_counter() - inicio) / n_consultas
+    print(f"{'contraccion':>14}: {promedio * 1000:8.2f} ms/consulta")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""
+Benchmark: latencia y memoria asignada por consulta del núcleo de Dijkstra con buffers reutilizables
+(camino_corto_csr / BuscadorCaminos) frente a las implementaciones anteriores: diccionarios sobre el
+Grafo y arreglos nuevos de tamaño V en cada consulta. Mide viajes cortos (pocos saltos) y al azar.
+
+Uso: python -m benchmarks.bench_dijkstra [lado] [consultas]
+"""
+
+import heapq
+import random
+import sys
+import time
+import tracemalloc
+
+from benchmarks.redes import red_cuadricula
+from src.services.dijkstra import BuscadorCaminos
+
+
+def camino_corto_diccionarios(grafo, inicio, destino):
+    """
+    Implementación anterior de camino_corto: diccionarios del tamaño de la red y desempate por nombre.
+    """
+    distances = {node: float("inf") for node in grafo.obtener_estaciones()}
+    anterior = {node: None for node in grafo.obtener_estaciones()}
+    distances[inicio] = 0
+    visitados = set()
+    heap = [(0, inicio.nombre, inicio)]
+    while heap:
+        _, _, current = heapq.heappop(heap)
+        if current in visitados:
+            continue
+        visitados.add(current)
+        if current == destino:
+            break
+        for vecino in grafo.obtener_vecinos(current):
+            tentativa = distances[current] + vecino.peso
+            if tentativa < distances[vecino.dest]:
+                distances[vecino.dest] = tentativa
+                anterior[vecino.dest] = current
+                heapq.heappush(heap, (tentativa, vecino.dest.nombre, vecino.dest))
+    camino = []
+    actual = destino
+    while actual is not None:
+        camino.insert(0, actual)
+        actual = anterior[actual]
+    if distances[destino] == float("inf"):
+        return None, float("inf")
+    return camino, distances[destino]
+
+
+def camino_corto_arreglos_nuevos(csr, inicio, destino):
+    """
+    Implementación anterior de camino_corto_csr: listas nuevas de tamaño V en cada consulta.
+    """
+    n = csr.num_estaciones()
+    offsets, destinos, pesos, rango = csr.offsets, csr.destinos, csr.pesos, csr.rango
+    distances = [float("inf")] * n
+    anterior = [-1] * n
+    visitados = bytearray(n)
+    distances[inicio] = 0
+    heap = [(0, rango[inicio], inicio)]
+    while heap:
+        _, _, current = heapq.heappop(heap)
+        if visitados[current]:
+            continue
+        visitados[current] = 1
+        if current == destino:
+            break
+        base = distances[current]
+        for e in range(offsets[current], offsets[current + 1]):
+            v = destinos[e]
+            tentativa = base + pesos[e]
+            if tentativa < distances[v]:
+                distances[v] = tentativa
+                anterior[v] = current
+                heapq.heappush(heap, (tentativa, rango[v], v))
+    if distances[destino] == float("inf"):
+        return None, float("inf")
+    camino = []
+    actual = destino
+    while actual != -1:
+        camino.append(actual)
+        actual = anterior[actual]
+    camino.reverse()
+    return camino, distances[destino]
+
+
+def medir(nombre: str, consulta, pares):
+    """
+    Ejecuta las consultas y muestra la latencia media y la memoria asignada por consulta
+    (pico y total de bloques según tracemalloc, medidos en una segunda pasada).
+    """
+    inicio = time.perf_counter()
+    for origen, destino in pares:
+        consulta(origen, destino)
+    latencia = (time.perf_counter() - inicio) / len(pares)
+    pico = 0
+    tracemalloc.start()
+    for origen, destino in pares:
+        tracemalloc.reset_peak()
+        antes = tracemalloc.get_traced_memory()[0]
+        consulta(origen, destino)
+        pico = max(pico, tracemalloc.get_traced_memory()[1] - antes)
+    tracemalloc.stop()
+    print(f"{nombre:>22}: {latencia * 1000:8.3f} ms/consulta  pico asignado {pico / 1024:9.1f} KiB")
+
+
+def main():
+    lado = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    n_consultas = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    grafo = red_cuadricula(lado, semilla=2, atajos=0)
+    csr = grafo.a_csr()
+    estaciones = grafo.obtener_estaciones()
+    print(f"Red: {csr.num_estaciones()} estaciones, {csr.num_rutas()} rutas")
+    rnd = random.Random(2)
+    # Viajes cortos: destino a dos cuadras del origen
+    cortos = []
+    for _ in range(n_consultas):
+        f, c = rnd.randrange(lado - 2), rnd.randrange(lado - 2)
+        cortos.append((f * lado + c, (f + 1) * lado + c + 1))
+    azar = [tuple(rnd.sample(range(len(estaciones)), 2)) for _ in range(max(1, n_consultas // 20))]
+    buscador = BuscadorCaminos(csr.num_estaciones())
+    for titulo, pares in (("Viajes cortos", cortos), ("Viajes al azar", azar)):
+        print(f"{titulo} ({len(pares)} consultas):")
+        medir("diccionarios (Grafo)", lambda u, v: camino_corto_diccionarios(grafo, estaciones[u], estaciones[v]), pares)
+        medir("arreglos nuevos (CSR)", lambda u, v: camino_corto_arreglos_nuevos(csr, u, v), pares)
+        medir("buffers reutilizables", lambda u, v: buscador.camino_corto(csr, u, v), pares)
+
+
+if __name__ == "__main__":
+    main()
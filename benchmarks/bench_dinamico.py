@@ -0,0 +1,53 @@
+"""
+Benchmark: reparación incremental de árboles (CaminosDinamicos) frente a recálculo completo
+cuando cambia el 1%, 10% y 50% de las rutas.
+
+Uso: python -m benchmarks.bench_dinamico [lado] [origenes]
+"""
+
+import random
+import sys
+import time
+
+from benchmarks.redes import red_cuadricula
+from src.services.dinamico import CaminosDinamicos
+
+
+def _cambios_aleatorios(grafo, porcentaje, rnd):
+    """
+    Modifica en sitio un porcentaje de rutas (aumentos y disminuciones) y retorna las tuplas de cambio.
+    """
+    rutas = [ruta for estacion in grafo.obtener_estaciones() for ruta in grafo.obtener_vecinos(estacion)]
+    cambios = []
+    for ruta in rnd.sample(rutas, max(1, int(len(rutas) * porcentaje))):
+        anterior = ruta.peso
+        ruta.peso = round(ruta.peso * rnd.uniform(0.5, 2.0), 2)
+        cambios.append((ruta.origen.nombre, ruta.dest.nombre, anterior, ruta.peso))
+    grafo.registrar_cambio()
+    return cambios
+
+
+def main():
+    lado = int(sys.argv[1]) if len(sys.argv) > 1 else 60
+    n_origenes = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    rnd = random.Random(1)
+    grafo = red_cuadricula(lado, semilla=1)
+    origenes = rnd.sample([e.nombre for e in grafo.obtener_estaciones()], n_origenes)
+    print(f"Red: {lado * lado} estaciones, {grafo.a_csr().num_rutas()} rutas, {n_origenes} orígenes")
+    print(f"{'cambiadas':>10} {'reparación (s)':>15} {'recálculo (s)':>15} {'aceleración':>12}")
+    for porcentaje in (0.01, 0.10, 0.50):
+        dinamico = CaminosDinamicos(grafo, origenes)
+        cambios = _cambios_aleatorios(grafo, porcentaje, rnd)
+        inicio = time.perf_counter()
+        dinamico.aplicar_cambios(cambios)
+        t_reparacion = time.perf_counter() - inicio
+        referencia = CaminosDinamicos(grafo)
+        inicio = time.perf_counter()
+        for origen in origenes:
+            referencia.agregar_origen(origen)
+        t_recalculo = time.perf_counter() - inicio
+        print(f"{porcentaje:>10.0%} {t_reparacion:>15.4f} {t_recalculo:>15.4f} {t_recalculo / t_reparacion:>11.1f}x")
+
+
+if __name__ == "__main__":
+    main()
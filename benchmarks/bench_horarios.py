@@ -0,0 +1,60 @@
+"""
+Benchmark: consultas sobre horarios con el Connection Scan Algorithm (llegada más temprana,
+Pareto llegada x viajes y perfil de una hora) en un horario sintético de un día.
+
+Uso: python -m benchmarks.bench_horarios [paradas] [lineas] [frecuencia_minutos]
+"""
+
+import random
+import sys
+import time
+
+from src.model.horario import Horario
+from src.services.planificador import llegada_mas_temprana_horario, perfil_horario, viajes_pareto_horario
+
+
+def horario_sintetico(n_paradas: int, n_lineas: int, frecuencia: int, semilla: int = 0) -> Horario:
+    """
+    Genera líneas de 10 a 30 paradas al azar con viajes cada 'frecuencia' minutos entre las 5:00 y
+    las 24:00, de 1 a 4 minutos entre paradas y 2 minutos de cambio en todas las paradas.
+    """
+    rnd = random.Random(semilla)
+    paradas = [f"P{i}" for i in range(n_paradas)]
+    viajes = []
+    for linea in range(n_lineas):
+        recorrido = rnd.sample(paradas, rnd.randint(10, 30))
+        tramos = [rnd.randint(1, 4) for _ in recorrido]
+        for inicio in range(5 * 60 + rnd.randrange(frecuencia), 24 * 60, frecuencia):
+            hora = inicio
+            paradas_viaje = []
+            for parada, duracion in zip(recorrido, tramos):
+                paradas_viaje.append((parada, hora, hora))
+                hora += duracion
+            viajes.append((f"L{linea}-{inicio}", paradas_viaje))
+    return Horario.desde_viajes(viajes, {parada: 2 for parada in paradas})
+
+
+def main():
+    n_paradas = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    n_lineas = int(sys.argv[2]) if len(sys.argv) > 2 else 300
+    frecuencia = int(sys.argv[3]) if len(sys.argv) > 3 else 10
+    inicio = time.perf_counter()
+    horario = horario_sintetico(n_paradas, n_lineas, frecuencia)
+    print(f"Horario: {len(horario.nombres)} paradas, {len(horario.viajes)} viajes, "
+          f"{horario.num_conexiones()} conexiones; construido en {time.perf_counter() - inicio:.2f} s")
+    rnd = random.Random(1)
+    consultas = [(rnd.randrange(len(horario.nombres)), rnd.randrange(len(horario.nombres)), rnd.randint(6 * 60, 20 * 60))
+                 for _ in range(20)]
+    for nombre, consulta in (
+        ("llegada más temprana", lambda u, v, t: llegada_mas_temprana_horario(horario, u, v, t)),
+        ("pareto (hasta 5 viajes)", lambda u, v, t: viajes_pareto_horario(horario, u, v, t, 5)),
+        ("perfil de una hora", lambda u, v, t: perfil_horario(horario, u, v, t, t + 60)),
+    ):
+        inicio = time.perf_counter()
+        for u, v, t in consultas:
+            consulta(u, v, t)
+        print(f"{nombre:>24}: {(time.perf_counter() - inicio) / len(consultas) * 1000:8.2f} ms/consulta")
+
+
+if __name__ == "__main__":
+    main()
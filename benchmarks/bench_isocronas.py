@@ -0,0 +1,46 @@
+"""
+Benchmark: isócronas con Dijkstra acotado frente a calcular el árbol completo y filtrar por
+tiempo, para varios límites, y una isócrona multiorigen desde una fila entera de la cuadrícula.
+
+Uso: python -m benchmarks.bench_isocronas [lado] [consultas]
+"""
+
+import random
+import sys
+import time
+
+from benchmarks.redes import red_cuadricula
+from src.services.dijkstra import arbol_caminos_csr
+from src.services.isocronas import isocrona_csr
+
+
+def main():
+    lado = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    n_consultas = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    csr = red_cuadricula(lado, semilla=3).a_csr()
+    print(f"Red: {csr.num_estaciones()} estaciones, {csr.num_rutas()} rutas")
+    rnd = random.Random(3)
+    origenes = [rnd.randrange(csr.num_estaciones()) for _ in range(n_consultas)]
+    inicio = time.perf_counter()
+    for u in origenes:
+        distances, _ = arbol_caminos_csr(csr, u)
+        [d for d in distances if d <= 30]
+    completo = (time.perf_counter() - inicio) / n_consultas
+    print(f"{'árbol completo':>22}: {completo * 1000:8.2f} ms/consulta")
+    for limite in (10, 30, 60, 120):
+        inicio = time.perf_counter()
+        alcanzadas = 0
+        for u in origenes:
+            alcanzadas += len(isocrona_csr(csr, [u], limite))
+        acotado = (time.perf_counter() - inicio) / n_consultas
+        print(f"{f'acotado a {limite} min':>22}: {acotado * 1000:8.2f} ms/consulta "
+              f"({alcanzadas / n_consultas:.0f} estaciones, {completo / acotado:.1f}x)")
+    fila = [csr.id_de(f"P{lado // 2:03d}-{c:03d}") for c in range(lado)]
+    inicio = time.perf_counter()
+    alcanzadas = isocrona_csr(csr, fila, 15)
+    print(f"{'multiorigen (una fila)':>22}: {(time.perf_counter() - inicio) * 1000:8.2f} ms "
+          f"({len(fila)} orígenes, {len(alcanzadas)} estaciones)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Benchmark: latencia de camino_multimodal (estados estación x modo con transbordos) frente al
+Dijkstra simple sobre la misma red, y tiempo de construcción del índice multimodal.
+
+Uso: python -m benchmarks.bench_multimodal [lado] [consultas]
+"""
+
+import random
+import sys
+import time
+
+from benchmarks.redes import red_cuadricula
+from src.services.dijkstra import camino_corto_csr
+from src.services.multimodal import IndiceMultimodal
+
+
+def asignar_modos(grafo, lado: int):
+    """
+    Convierte la cuadrícula en una red multimodal: las filas y columnas múltiplo de 5 son líneas de
+    metro (más rápidas), el resto de las rutas son de bus, y cambiar de modo cuesta 3 minutos.
+    """
+    for estacion in grafo.obtener_estaciones():
+        estacion.transbordo = 3
+        f, c = (int(x) for x in estacion.nombre[1:].split("-"))
+        for ruta in grafo.obtener_vecinos(estacion):
+            f2, c2 = (int(x) for x in ruta.dest.nombre[1:].split("-"))
+            if (f == f2 and f % 5 == 0) or (c == c2 and c % 5 == 0):
+                ruta.modo = "metro"
+                ruta.peso = max(1, ruta.peso // 2)
+            else:
+                ruta.modo = "bus"
+    grafo.registrar_cambio()
+
+
+def main():
+    lado = int(sys.argv[1]) if len(sys.argv) > 1 else 150
+    n_consultas = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    grafo = red_cuadricula(lado, semilla=2, atajos=0)
+    asignar_modos(grafo, lado)
+    csr = grafo.a_csr()
+    inicio = time.perf_counter()
+    indice = IndiceMultimodal(grafo)
+    print(f"Red: {csr.num_estaciones()} estaciones, {csr.num_rutas()} rutas; "
+          f"índice de {indice.num_estados()} estados en {time.perf_counter() - inicio:.2f} s")
+    rnd = random.Random(2)
+    pares = [tuple(rnd.sample(range(csr.num_estaciones()), 2)) for _ in range(n_consultas)]
+    inicio = time.perf_counter()
+    for u, v in pares:
+        camino_corto_csr(csr, u, v)
+    simple = (time.perf_counter() - inicio) / n_consultas
+    inicio = time.perf_counter()
+    for u, v in pares:
+        indice.camino_corto_ids(u, v)
+    multimodal = (time.perf_counter() - inicio) / n_consultas
+    inicio = time.perf_counter()
+    for u, v in pares:
+        indice.camino_corto_ids(u, v, prohibidos={"metro"})
+    sin_metro = (time.perf_counter() - inicio) / n_consultas
+    print(f"{'dijkstra simple':>22}: {simple * 1000:8.2f} ms/consulta")
+    print(f"{'multimodal':>22}: {multimodal * 1000:8.2f} ms/consulta ({multimodal / simple:.2f}x)")
+    print(f"{'multimodal sin metro':>22}: {sin_metro * 1000:8.2f} ms/consulta")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,34 @@
+"""
+Benchmark: diseño voraz de k conexiones nuevas (disenar_conexiones) sobre una cuadrícula, con la
+matriz de distancias calculada aparte.
+
+Uso: python -m benchmarks.bench_optimizacion [lado] [k] [tiempo_conexion] [max_candidatos]
+"""
+
+import sys
+import time
+
+from benchmarks.redes import red_cuadricula
+from src.services.distancias import calcular_matriz_distancias
+from src.services.optimizacion import MAX_CANDIDATOS, disenar_conexiones
+
+
+def main():
+    lado = int(sys.argv[1]) if len(sys.argv) > 1 else 71
+    k = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    tiempo_conexion = float(sys.argv[3]) if len(sys.argv) > 3 else 5
+    max_candidatos = int(sys.argv[4]) if len(sys.argv) > 4 else MAX_CANDIDATOS
+    grafo = red_cuadricula(lado, semilla=5)
+    inicio = time.perf_counter()
+    matriz = calcular_matriz_distancias(grafo)
+    print(f"Red: {lado * lado} estaciones; matriz de distancias en {time.perf_counter() - inicio:.1f} s")
+    inicio = time.perf_counter()
+    elegidas = disenar_conexiones(grafo, k, k * tiempo_conexion, tiempo_conexion, matriz=matriz,
+                                  max_candidatos=max_candidatos)
+    print(f"{k} conexiones entre {max_candidatos} candidatos en {time.perf_counter() - inicio:.2f} s")
+    for origen, destino, peso, conectados, reduccion in elegidas:
+        print(f"  {origen.nombre} -> {destino.nombre} ({peso} min): -{reduccion:.3f} min en promedio")
+
+
+if __name__ == "__main__":
+    main()
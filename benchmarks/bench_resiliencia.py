@@ -0,0 +1,45 @@
+"""
+Benchmark: ranking de resiliencia (cierre de cada estación y cada ruta) reutilizando los árboles de
+caminos más cortos, frente a volver a resolver todos los orígenes en cada falla (estimado con una
+muestra de fallas), con uno o varios procesos.
+
+Uso: python -m benchmarks.bench_resiliencia [lado] [procesos]
+"""
+
+import random
+import sys
+import time
+
+from benchmarks.redes import red_cuadricula
+from src.services.dijkstra import arbol_caminos_csr
+from src.services.resiliencia import ranking_resiliencia
+
+
+def main():
+    lado = int(sys.argv[1]) if len(sys.argv) > 1 else 15
+    procesos = int(sys.argv[2]) if len(sys.argv) > 2 else 2
+    csr = red_cuadricula(lado, semilla=4).a_csr()
+    n, m = csr.num_estaciones(), csr.num_rutas()
+    print(f"Red: {n} estaciones, {m} rutas ({n + m} fallas)")
+    # Sin reutilizar árboles: la ruta caída con peso infinito y n Dijkstras por falla
+    rnd = random.Random(4)
+    muestra = rnd.sample(range(m), 10)
+    inicio = time.perf_counter()
+    for e in muestra:
+        pesos = list(csr.pesos)
+        pesos[e] = float("inf")
+        caida = csr.con_pesos(pesos)
+        for s in range(n):
+            arbol_caminos_csr(caida, s)
+    por_falla = (time.perf_counter() - inicio) / len(muestra)
+    print(f"{'todos los orígenes':>22}: {por_falla * (n + m):8.2f} s (estimado con {len(muestra)} fallas)")
+    for p in sorted({1, procesos}):
+        inicio = time.perf_counter()
+        ranking = ranking_resiliencia(csr, procesos=p)
+        print(f"{f'reutilizando ({p} proc.)':>22}: {time.perf_counter() - inicio:8.2f} s")
+    for elemento, aumento, desconectados in ranking[:5]:
+        print(f"  {elemento}: +{aumento:.2f} min en promedio, {desconectados} pares desconectados")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+"""
+Módulo con generadores de redes sintéticas para los benchmarks.
+"""
+
+import random
+
+from src.model.estacion import Estacion
+from src.model.grafo import Grafo
+from src.model.ruta import Ruta
+
+
+def red_cuadricula(lado: int, semilla: int = 0, atajos: float = 0.05) -> Grafo:
+    """
+    Genera una red tipo ciudad: una cuadrícula lado x lado con rutas en ambos sentidos entre vecinas
+    y una fracción 'atajos' de rutas largas aleatorias. Los pesos son minutos enteros entre 1 y 10.
+    """
+    rnd = random.Random(semilla)
+    grafo = Grafo()
+    estaciones = [[Estacion(f"P{f:03d}-{c:03d}") for c in range(lado)] for f in range(lado)]
+    for fila in estaciones:
+        for estacion in fila:
+            grafo.añadir_estacion(estacion)
+    for f in range(lado):
+        for c in range(lado):
+            for df, dc in ((0, 1), (1, 0)):
+                if f + df < lado and c + dc < lado:
+                    a, b = estaciones[f][c], estaciones[f + df][c + dc]
+                    grafo.añadir_ruta(Ruta(a, b, rnd.randint(1, 10)))
+                    grafo.añadir_ruta(Ruta(b, a, rnd.randint(1, 10)))
+    planas = [e for fila in estaciones for e in fila]
+    for _ in range(int(len(planas) * atajos)):
+        a, b = rnd.sample(planas, 2)
+        if not any(ruta.dest == b for ruta in grafo.obtener_vecinos(a)):
+            grafo.añadir_ruta(Ruta(a, b, rnd.randint(5, 30)))
+    return grafo
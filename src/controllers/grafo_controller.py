@@ -33,10 +33,10 @@ def agregar_ruta(grafo: Grafo, origen_nombre: str, destino_nombre: str, peso: fl
 
 def eliminar_ruta(grafo: Grafo, origen_nombre: str, destino_nombre: str):
     """
-    Elimina todas las rutas entre dos estaciones.
+    Elimina la ruta entre dos estaciones, si existe.
     """
     origen = grafo.encontrar_estacion(origen_nombre)
     destino = grafo.encontrar_estacion(destino_nombre)
-    rutas = [ruta for ruta in grafo.obtener_vecinos(origen) if ruta.dest == destino]
-    for ruta in rutas:
+    ruta = grafo.obtener_ruta(origen, destino)
+    if ruta is not None:
         grafo.eliminar_ruta(ruta)
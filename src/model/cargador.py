@@ -0,0 +1,369 @@
+"""
+Módulo que implementa la carga masiva de la red de transporte urbano desde archivos JSON, NDJSON y CSV.
+"""
+
+import csv
+import json
+import time
+from array import array
+
+from src.model.estacion import Estacion
+from src.model.grafo import Grafo
+from src.model.grafo_csr import GrafoCSR
+from src.model.ruta import Ruta
+
+# Cantidad de registros que se leen y agregan por bloque
+TAM_BLOQUE = 65536
+
+
+class EstadisticasCarga:
+    """
+    Resumen de una carga: estaciones y rutas cargadas, segundos empleados y rendimiento.
+    """
+
+    def __init__(self, estaciones: int, rutas: int, segundos: float):
+        """
+        Inicializa el resumen de la carga.
+        """
+        self.estaciones = estaciones
+        self.rutas = rutas
+        self.segundos = segundos
+
+    def rutas_por_segundo(self) -> float:
+        """
+        Devuelve el rendimiento de la carga en rutas por segundo.
+        """
+        return self.rutas / self.segundos if self.segundos > 0 else float("inf")
+
+    def __str__(self):
+        """
+        Devuelve el resumen en una línea legible.
+        """
+        return (f"{self.estaciones} estaciones, {self.rutas} rutas en {self.segundos:.2f} s "
+                f"({self.rutas_por_segundo():,.0f} rutas/s)")
+
+
+def _detectar_formato(ruta_archivo) -> str:
+    """
+    Deduce el formato por la extensión del archivo: .csv, .ndjson/.jsonl o .json.
+    """
+    nombre = str(ruta_archivo).lower()
+    if nombre.endswith(".csv"):
+        return "csv"
+    if nombre.endswith((".ndjson", ".jsonl")):
+        return "ndjson"
+    if nombre.endswith(".json"):
+        return "json"
+    raise Exception(f"No se reconoce el formato del archivo {ruta_archivo}")
+
+
+def _datos_estacion(registro, clave_nombre: str):
+    """
+    Devuelve el registro (nombre, None, transbordo, transbordos) de una estación de JSON o NDJSON:
+    un nombre, o un objeto con su nombre y, opcionalmente, "transbordo" (minutos) y "transbordos"
+    (lista de {"desde", "hacia", "minutos"}).
+    """
+    if isinstance(registro, str):
+        return registro, None, None, None
+    transbordos = registro.get("transbordos")
+    if transbordos is not None:
+        transbordos = [(t["desde"], t["hacia"], t["minutos"]) for t in transbordos]
+    return registro[clave_nombre], None, registro.get("transbordo", 0), transbordos
+
+
+def _es_declaracion(transbordo, transbordos) -> bool:
+    """
+    Indica si un registro sin destino declara una estación; los que solo traen 'transbordos' (las
+    filas CSV con desde/hacia) completan una estación y pueden repetirse.
+    """
+    return transbordo is not None or transbordos is None
+
+
+def _validar_declaracion(nombre, declaradas):
+    """
+    Registra la declaración de la estación 'nombre' en una carga estricta (falla si ya estaba declarada).
+    """
+    if nombre in declaradas:
+        raise Exception(f"La estación {nombre} está declarada más de una vez")
+    declaradas.add(nombre)
+
+
+def leer_registros(ruta_archivo, formato: str = None, tam_bloque: int = TAM_BLOQUE):
+    """
+    Lee el archivo por bloques y genera listas de tuplas (origen, destino, peso, modo), con modo
+    None si la ruta no lo indica.
+    Una tupla (nombre, None, transbordo, transbordos) declara una estación: 'transbordo' son sus
+    minutos de transbordo y 'transbordos' una lista de (desde, hacia, minutos) (None si no se indican).
+    Formatos:
+    - "json": {"estaciones": [...], "rutas": [{"origen", "destino", "peso", "modo"}, ...]} (se lee entero).
+      Cada estación es un nombre o {"nombre", "transbordo", "transbordos": [{"desde", "hacia", "minutos"}]}.
+    - "ndjson": una ruta {"origen", "destino", "peso", "modo"} o una estación {"estacion", "transbordo",
+      "transbordos"} por línea.
+    - "csv": encabezado con origen,destino,peso y opcionalmente modo,transbordo,desde,hacia; una ruta
+      por fila. Una fila sin destino declara la estación 'origen' con sus minutos de 'transbordo', o
+      el transbordo de 'desde' a 'hacia' si alguna de esas columnas tiene valor.
+    "modo", "transbordo" y "transbordos" son opcionales en todos los formatos.
+    NDJSON y CSV se procesan en streaming: la memoria no depende del tamaño del archivo.
+    """
+    formato = formato or _detectar_formato(ruta_archivo)
+    bloque = []
+    if formato == "json":
+        with open(ruta_archivo, "r", encoding="utf-8") as f:
+            datos = json.load(f)
+        for estacion in datos["estaciones"]:
+            bloque.append(_datos_estacion(estacion, "nombre"))
+        for ruta in datos["rutas"]:
+            bloque.append((ruta["origen"], ruta["destino"], ruta["peso"], ruta.get("modo")))
+            if len(bloque) >= tam_bloque:
+                yield bloque
+                bloque = []
+    elif formato == "ndjson":
+        with open(ruta_archivo, "r", encoding="utf-8") as f:
+            for linea in f:
+                if not linea.strip():
+                    continue
+                registro = json.loads(linea)
+                if "estacion" in registro:
+                    bloque.append(_datos_estacion(registro, "estacion"))
+                else:
+                    bloque.append((registro["origen"], registro["destino"], registro["peso"], registro.get("modo")))
+                if len(bloque) >= tam_bloque:
+                    yield bloque
+                    bloque = []
+    elif formato == "csv":
+        with open(ruta_archivo, "r", encoding="utf-8", newline="") as f:
+            lector = csv.reader(f)
+            encabezado = next(lector, None)
+            if encabezado is None:
+                return
+            columnas = [c.strip() for c in encabezado]
+            try:
+                i_origen, i_destino, i_peso = (columnas.index(c) for c in ("origen", "destino", "peso"))
+            except ValueError:
+                raise Exception("El CSV debe tener las columnas origen, destino y peso")
+            i_modo, i_transbordo, i_desde, i_hacia = (
+                columnas.index(c) if c in columnas else None for c in ("modo", "transbordo", "desde", "hacia")
+            )
+
+            def columna(fila, i):
+                # Valor de una columna opcional (None si no existe o está vacía)
+                return fila[i] or None if i is not None else None
+
+            for fila in lector:
+                if not fila:
+                    continue
+                if not fila[i_destino]:
+                    minutos = columna(fila, i_transbordo)
+                    minutos = float(minutos) if minutos is not None else None
+                    desde, hacia = columna(fila, i_desde), columna(fila, i_hacia)
+                    if desde is None and hacia is None:
+                        bloque.append((fila[i_origen], None, minutos, None))
+                    else:
+                        bloque.append((fila[i_origen], None, None, [(desde, hacia, minutos)]))
+                else:
+                    bloque.append((fila[i_origen], fila[i_destino], float(fila[i_peso]), columna(fila, i_modo)))
+                if len(bloque) >= tam_bloque:
+                    yield bloque
+                    bloque = []
+    else:
+        raise Exception(f"Formato de archivo desconocido: {formato}")
+    if bloque:
+        yield bloque
+
+
+def cargar_red(ruta_archivo, grafo: Grafo = None, formato: str = None, tam_bloque: int = TAM_BLOQUE,
+               estricto: bool = True):
+    """
+    Carga la red en un Grafo (nuevo o existente) en una sola pasada sobre el archivo.
+    Las estaciones se crean al declararse o la primera vez que aparecen en una ruta, y las rutas se
+    agregan por bloques con Grafo.añadir_rutas, con su modo; los transbordos declarados se aplican
+    a su estación.
+    Con estricto=True (por defecto), como al cargar con Grafo.cargar_desde_json:
+    - una estación declarada dos veces en el archivo es un error;
+    - en JSON, y en NDJSON o CSV que declaran estaciones, una ruta con una estación que no está en
+      el grafo ni se declaró antes en el archivo es un error. Los archivos NDJSON o CSV con solo
+      rutas crean sus estaciones.
+    Con estricto=False las declaraciones repetidas se combinan y las estaciones desconocidas se crean.
+    Devuelve una tupla (grafo, EstadisticasCarga).
+    """
+    inicio = time.perf_counter()
+    formato = formato or _detectar_formato(ruta_archivo)
+    grafo = grafo if grafo is not None else Grafo()
+    estaciones = grafo.nombre_a_estacion
+    estaciones_antes = len(estaciones)
+    declaradas = set()
+    exigir_declaradas = estricto and formato == "json"
+    total_rutas = 0
+    for bloque in leer_registros(ruta_archivo, formato, tam_bloque):
+        rutas = []
+        for origen, destino, peso, modo in bloque:
+            if destino is None:
+                # Declaración de estación: 'peso' son sus minutos de transbordo y 'modo' sus excepciones
+                if estricto and _es_declaracion(peso, modo):
+                    _validar_declaracion(origen, declaradas)
+                    exigir_declaradas = True
+                estacion = estaciones.get(origen)
+                if estacion is None:
+                    estacion = Estacion(origen)
+                    grafo.añadir_estacion(estacion)
+                if peso is not None:
+                    estacion.transbordo = peso
+                for desde, hacia, minutos in modo or ():
+                    estacion.definir_transbordo(desde, hacia, minutos)
+                continue
+            estacion_origen = estaciones.get(origen)
+            estacion_destino = estaciones.get(destino)
+            if estacion_origen is None or estacion_destino is None:
+                if exigir_declaradas:
+                    desconocida = origen if estacion_origen is None else destino
+                    raise Exception(f"La ruta {origen} -> {destino} usa la estación no declarada {desconocida}")
+                if estacion_origen is None:
+                    estacion_origen = Estacion(origen)
+                    grafo.añadir_estacion(estacion_origen)
+                if estacion_destino is None:
+                    estacion_destino = estaciones.get(destino)  # Puede ser el mismo origen
+                    if estacion_destino is None:
+                        estacion_destino = Estacion(destino)
+                        grafo.añadir_estacion(estacion_destino)
+            rutas.append(Ruta(estacion_origen, estacion_destino, peso, modo))
+        grafo.añadir_rutas(rutas)
+        total_rutas += len(rutas)
+    segundos = time.perf_counter() - inicio
+    return grafo, EstadisticasCarga(len(estaciones) - estaciones_antes, total_rutas, segundos)
+
+
+def _estacion_a_dict(estacion: Estacion, clave_nombre: str):
+    """
+    Devuelve la estación como en JSON y NDJSON: solo el nombre si no tiene transbordos, o un
+    objeto con el nombre, sus minutos de transbordo y sus excepciones por par de modos.
+    """
+    if not estacion.transbordo and not estacion.transbordos:
+        return estacion.nombre
+    datos = {clave_nombre: estacion.nombre, "transbordo": estacion.transbordo}
+    if estacion.transbordos:
+        datos["transbordos"] = [{"desde": desde, "hacia": hacia, "minutos": minutos}
+                                for (desde, hacia), minutos in estacion.transbordos.items()]
+    return datos
+
+
+def _ruta_a_dict(ruta: Ruta) -> dict:
+    """
+    Devuelve la ruta como en JSON y NDJSON ("modo" solo si la ruta lo tiene).
+    """
+    datos = {"origen": ruta.origen.nombre, "destino": ruta.dest.nombre, "peso": ruta.peso}
+    if ruta.modo is not None:
+        datos["modo"] = ruta.modo
+    return datos
+
+
+def guardar_red(grafo: Grafo, ruta_archivo, formato: str = None):
+    """
+    Guarda la red en JSON, NDJSON o CSV (el formato se deduce de la extensión si no se indica),
+    con el modo de cada ruta y los transbordos de cada estación, de modo que cargar_red la
+    reconstruye igual. Las estaciones se escriben antes que las rutas, así conservan su orden.
+    """
+    formato = formato or _detectar_formato(ruta_archivo)
+    estaciones = grafo.obtener_estaciones()
+    if formato == "json":
+        datos = {
+            "estaciones": [_estacion_a_dict(e, "nombre") for e in estaciones],
+            "rutas": [_ruta_a_dict(ruta) for e in estaciones for ruta in grafo.obtener_vecinos(e)],
+        }
+        with open(ruta_archivo, "w", encoding="utf-8") as f:
+            json.dump(datos, f, ensure_ascii=False, indent=2)
+    elif formato == "ndjson":
+        with open(ruta_archivo, "w", encoding="utf-8") as f:
+            for estacion in estaciones:
+                datos = _estacion_a_dict(estacion, "estacion")
+                if isinstance(datos, str):
+                    datos = {"estacion": datos}
+                f.write(json.dumps(datos, ensure_ascii=False) + "\n")
+            for estacion in estaciones:
+                for ruta in grafo.obtener_vecinos(estacion):
+                    f.write(json.dumps(_ruta_a_dict(ruta), ensure_ascii=False) + "\n")
+    elif formato == "csv":
+        with open(ruta_archivo, "w", encoding="utf-8", newline="") as f:
+            escritor = csv.writer(f)
+            escritor.writerow(["origen", "destino", "peso", "modo", "transbordo", "desde", "hacia"])
+            for estacion in estaciones:
+                escritor.writerow([estacion.nombre, "", "", "", estacion.transbordo, "", ""])
+                for (desde, hacia), minutos in estacion.transbordos.items():
+                    escritor.writerow([estacion.nombre, "", "", "", minutos, desde or "", hacia or ""])
+            for estacion in estaciones:
+                for ruta in grafo.obtener_vecinos(estacion):
+                    escritor.writerow([estacion.nombre, ruta.dest.nombre, ruta.peso, ruta.modo or "", "", "", ""])
+    else:
+        raise Exception(f"Formato de archivo desconocido: {formato}")
+
+
+def cargar_red_csr(ruta_archivo, formato: str = None, tam_bloque: int = TAM_BLOQUE, estricto: bool = True):
+    """
+    Carga la red directamente como instantánea GrafoCSR, sin crear objetos Estacion ni Ruta:
+    solo un diccionario de nombres y arreglos compactos (origen, destino, peso y modo), que al final
+    se ordenan por origen. Es el camino recomendado para redes regionales de millones de rutas.
+    Los transbordos de las estaciones no se guardan en la instantánea; 'estricto' valida las
+    estaciones como en cargar_red.
+    El resultado es idéntico a cargar_red(...)[0].a_csr(). Devuelve una tupla (csr, EstadisticasCarga).
+    """
+    import numpy as np
+
+    inicio = time.perf_counter()
+    formato = formato or _detectar_formato(ruta_archivo)
+    declaradas = set()
+    exigir_declaradas = estricto and formato == "json"
+    # Tabla de internado: cada nombre se guarda una sola vez y se reemplaza por su id entero
+    indice = {}
+    nombres = []
+    origenes = array("q")
+    destinos = array("q")
+    pesos = array("d")
+    modos = array("q")
+    modos_por_nombre = {None: -1}
+
+    def id_de(nombre):
+        indice[nombre] = len(nombres)
+        nombres.append(nombre)
+        return len(nombres) - 1
+
+    # Los ids se asignan en orden de aparición (el origen antes que el destino), como en cargar_red
+    for bloque in leer_registros(ruta_archivo, formato, tam_bloque):
+        for origen, destino, peso, modo in bloque:
+            if destino is None:
+                if estricto and _es_declaracion(peso, modo):
+                    _validar_declaracion(origen, declaradas)
+                    exigir_declaradas = True
+                if origen not in indice:
+                    id_de(origen)
+                continue
+            if exigir_declaradas and (origen not in indice or destino not in indice):
+                desconocida = destino if origen in indice else origen
+                raise Exception(f"La ruta {origen} -> {destino} usa la estación no declarada {desconocida}")
+            u = indice[origen] if origen in indice else id_de(origen)
+            origenes.append(u)
+            destinos.append(indice[destino] if destino in indice else id_de(destino))
+            pesos.append(peso)
+            id_modo = modos_por_nombre.get(modo)
+            if id_modo is None:
+                id_modo = modos_por_nombre[modo] = len(modos_por_nombre) - 1
+            modos.append(id_modo)
+    n, m = len(nombres), len(origenes)
+    # Ordenamiento estable por origen: conserva el orden del archivo dentro de cada estación
+    origen_np = np.frombuffer(origenes, dtype=np.int64) if m else np.zeros(0, dtype=np.int64)
+    destino_np = np.frombuffer(destinos, dtype=np.int64) if m else np.zeros(0, dtype=np.int64)
+    orden = np.argsort(origen_np, kind="stable")
+    destino_np = destino_np[orden]
+    pares = origen_np[orden] * max(n, 1) + destino_np
+    if m and len(np.unique(pares)) != m:
+        raise Exception("Ruta ya se encuentra en el grafo")
+    offsets_np = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(origen_np, minlength=n), out=offsets_np[1:])
+    offsets = array("q", offsets_np.tobytes())
+    destinos = array("q", destino_np.tobytes())
+    pesos = array("d", np.frombuffer(pesos, dtype=np.float64)[orden].tobytes()) if m else array("d")
+    if len(modos_por_nombre) == 1:
+        csr = GrafoCSR(nombres, offsets, destinos, pesos)
+    else:
+        modos = array("q", np.frombuffer(modos, dtype=np.int64)[orden].tobytes())
+        csr = GrafoCSR(nombres, offsets, destinos, pesos, modos=modos, nombres_modos=list(modos_por_nombre)[1:])
+    segundos = time.perf_counter() - inicio
+    return csr, EstadisticasCarga(n, m, segundos)
@@ -7,11 +7,27 @@ class Estacion:
     Representa una estación o parada en la red de transporte.
     """
 
-    def __init__(self, nombre: str):
+    def __init__(self, nombre: str, transbordo: float = 0):
         """
         Inicializa una estación con su nombre.
+        'transbordo' son los minutos que cuesta cambiar de modo de transporte en la estación
+        (caminar entre andenes, esperar); 'transbordos' guarda excepciones por par de modos.
         """
         self.nombre = nombre
+        self.transbordo = transbordo
+        self.transbordos = {}
+
+    def definir_transbordo(self, desde: str, hacia: str, minutos: float):
+        """
+        Fija los minutos del transbordo del modo 'desde' al modo 'hacia' en esta estación.
+        """
+        self.transbordos[(desde, hacia)] = minutos
+
+    def tiempo_transbordo(self, desde: str, hacia: str) -> float:
+        """
+        Devuelve los minutos para cambiar del modo 'desde' al modo 'hacia' en esta estación.
+        """
+        return self.transbordos.get((desde, hacia), self.transbordo)
 
     def __str__(self):
         """
@@ -0,0 +1,226 @@
+"""
+Módulo que implementa el estado compartido de la red para servidores concurrentes (copy-on-write).
+"""
+
+import threading
+from array import array
+
+from src.model.grafo import Grafo, nueva_version
+from src.model.grafo_csr import GrafoCSR, entero_si_exacto
+from src.model.ruta import Ruta
+
+
+class InstantaneaRed:
+    """
+    Versión inmutable de la red: una instantánea GrafoCSR más las Estacion de su topología.
+    Ofrece la interfaz de lectura de Grafo (obtener_estaciones, obtener_vecinos, encontrar_estacion,
+    obtener_ruta, a_csr, version), así que los servicios que solo leen el grafo funcionan sobre ella
+    sin bloqueos: nadie la modifica después de publicarla.
+    """
+
+    def __init__(self, csr: GrafoCSR, estaciones, version: int, nombre_a_estacion=None):
+        """
+        Inicializa la instantánea con el CSR, la lista de Estacion indexada por id y su versión.
+        Las versiones con la misma topología pueden compartir el mapeo de nombres.
+        """
+        self.csr = csr
+        self.estaciones = estaciones
+        self.version = version
+        if nombre_a_estacion is None:
+            nombre_a_estacion = {estacion.nombre: estacion for estacion in estaciones}
+        self.nombre_a_estacion = nombre_a_estacion
+
+    def a_csr(self) -> GrafoCSR:
+        """
+        Devuelve la instantánea CSR de esta versión.
+        """
+        return self.csr
+
+    def obtener_estaciones(self):
+        """
+        Devuelve una lista de todas las estaciones.
+        """
+        return list(self.estaciones)
+
+    def encontrar_estacion(self, nombre: str):
+        """
+        Busca y retorna la estación por su nombre.
+        """
+        return self.nombre_a_estacion[nombre]
+
+    def obtener_vecinos(self, estacion):
+        """
+        Devuelve una lista de rutas salientes desde la estación dada (objetos Ruta nuevos, de solo lectura).
+        Los pesos enteros vuelven a ser int, como en el Grafo cargado desde JSON.
+        """
+        csr = self.csr
+        u = csr.indice[estacion.nombre]
+        return [Ruta(estacion, self.estaciones[csr.destinos[e]], entero_si_exacto(csr.pesos[e]), csr.modo(e))
+                for e in range(csr.offsets[u], csr.offsets[u + 1])]
+
+    def obtener_ruta(self, origen, destino):
+        """
+        Devuelve la ruta de origen a destino, o None si no existe.
+        """
+        return next((ruta for ruta in self.obtener_vecinos(origen) if ruta.dest == destino), None)
+
+
+class EstadoRed:
+    """
+    Estado de la red compartido entre hilos con el modelo copy-on-write:
+    - Los lectores toman la instantánea publicada con actual(), sin bloqueos; la instantánea no
+      cambia nunca, así que una consulta no ve pesos a medio actualizar.
+    - Los escritores se serializan con un lock: aplican el cambio sobre un Grafo privado, copian
+      los pesos a un arreglo nuevo y publican la nueva instantánea con una sola asignación.
+    """
+
+    def __init__(self, cargar):
+        """
+        Inicializa el estado con una función sin argumentos que devuelve la red inicial: un Grafo o
+        un GrafoCSR (p. ej. una instantánea abierta con mmap, que se publica sin copiarla).
+        La carga se hace en la primera lectura.
+        """
+        self._cargar = cargar
+        self._escritura = threading.Lock()
+        self._grafo = None  # Grafo privado de los escritores (None hasta que haga falta si se cargó un GrafoCSR)
+        self._topologia = None  # version_topologia del Grafo privado en la última publicación completa
+        self._actual = None
+        self._perfiles = None  # Perfiles horarios sobre los pesos base (se crean al activar una hora)
+        self._por_franja = {}  # franja -> InstantaneaRed ya publicada alguna vez
+        self._sincronizar = False  # Los pesos publicados no están copiados en el Grafo privado
+
+    def actual(self) -> InstantaneaRed:
+        """
+        Devuelve la instantánea publicada (la carga si aún no existe).
+        """
+        instantanea = self._actual
+        if instantanea is None:
+            with self._escritura:
+                if self._actual is None:
+                    self._publicar(self._cargar())
+            instantanea = self._actual
+        return instantanea
+
+    def _publicar(self, red):
+        """
+        Publica la red cargada. Un GrafoCSR se publica tal cual y el Grafo privado se reconstruye
+        recién cuando un escritor lo necesita (_grafo_privado). Requiere el lock.
+        """
+        if isinstance(red, GrafoCSR):
+            estaciones = [red.estacion(i) for i in range(red.num_estaciones())]
+            self._publicar_instantanea(None, InstantaneaRed(red, estaciones, nueva_version()))
+        else:
+            self._publicar_grafo(red)
+
+    def _publicar_grafo(self, grafo: Grafo):
+        """
+        Toma 'grafo' como estado privado y publica su instantánea completa. Requiere el lock.
+        """
+        self._publicar_instantanea(grafo, InstantaneaRed(grafo.a_csr(), grafo.obtener_estaciones(), grafo.version))
+
+    def _publicar_instantanea(self, grafo, instantanea: InstantaneaRed):
+        """
+        Publica una instantánea completa con su Grafo privado (o None) y descarta los perfiles.
+        Requiere el lock.
+        """
+        self._grafo = grafo
+        self._topologia = grafo.version_topologia if grafo is not None else None
+        self._actual = instantanea
+        self._perfiles = None
+        self._por_franja = {}
+        self._sincronizar = False
+
+    def _grafo_privado(self) -> Grafo:
+        """
+        Devuelve el Grafo privado de los escritores; si la red se cargó como GrafoCSR, lo
+        reconstruye una vez desde la instantánea publicada. Requiere el lock.
+        """
+        if self._grafo is None:
+            from src.model.snapshot import csr_a_grafo
+
+            self._grafo = csr_a_grafo(self._actual.csr)
+            self._topologia = self._grafo.version_topologia
+        return self._grafo
+
+    def reiniciar(self):
+        """
+        Vuelve a cargar la red y publica la versión nueva.
+        """
+        with self._escritura:
+            self._publicar(self._cargar())
+
+    def modificar_pesos(self, funcion):
+        """
+        Aplica funcion(grafo) sobre el Grafo privado (p. ej. simular_congestion) y publica una
+        instantánea con los pesos nuevos, compartiendo la topología con la anterior.
+        La función debería cambiar solo pesos; para cambios de estaciones o rutas conviene usar
+        reemplazar (si la función añade o elimina estaciones o rutas, lo detecta la
+        version_topologia del Grafo y se publica la instantánea completa).
+        Los cambios de peso base (actualizar_peso_ruta) se conservan al activar otra hora; los de
+        peso vigente (simular_congestion) duran hasta el próximo activar_hora, que parte de los
+        pesos base.
+        Retorna lo que devuelva la función.
+        """
+        self.actual()
+        with self._escritura:
+            anterior = self._actual
+            grafo = self._grafo_privado()
+            if self._sincronizar:
+                # La versión publicada viene de un perfil horario: el Grafo privado toma esos pesos
+                pesos = anterior.csr.pesos
+                e = 0
+                for estacion in anterior.estaciones:
+                    for ruta in grafo.obtener_vecinos(estacion):
+                        ruta.peso = pesos[e]
+                        e += 1
+                self._sincronizar = False
+            resultado = funcion(grafo)
+            grafo.registrar_cambio()  # Versión nueva aunque la función no la haya registrado
+            if grafo.version_topologia != self._topologia:
+                self._publicar_grafo(grafo)  # La función cambió la topología
+                return resultado
+            pesos = array("d")
+            for estacion in anterior.estaciones:
+                pesos.extend(ruta.peso for ruta in grafo.obtener_vecinos(estacion))
+            self._actual = InstantaneaRed(anterior.csr.con_pesos(pesos), anterior.estaciones,
+                                          grafo.version, anterior.nombre_a_estacion)
+            # La función pudo cambiar pesos base (actualizar_peso_ruta): los perfiles se recalculan
+            self._perfiles = None
+            self._por_franja = {}
+        return resultado
+
+    def activar_hora(self, hora: int, franjas: int = 24):
+        """
+        Publica la versión de la red con los pesos de la hora dada según los perfiles horarios
+        (peso base x factor de la franja; ver src/services/perfiles.py). La primera vez que se activa
+        una franja se calcula su vector de pesos; después, activarla es cambiar una referencia, O(1),
+        y la versión se reutiliza, así que los árboles en caché de esa franja siguen sirviendo
+        (hasta el próximo modificar_pesos, que descarta los perfiles y las versiones por franja).
+        """
+        from src.services.perfiles import PerfilesHorarios
+
+        self.actual()
+        with self._escritura:
+            grafo = self._grafo_privado()
+            if self._perfiles is None or self._perfiles.franjas != franjas:
+                self._perfiles = PerfilesHorarios.desde_grafo(grafo, franjas)
+                self._por_franja = {}
+            franja = hora * franjas // 24
+            instantanea = self._por_franja.get(franja)
+            if instantanea is None:
+                anterior = self._actual
+                grafo.registrar_cambio()
+                instantanea = InstantaneaRed(self._perfiles.instantanea(franja), anterior.estaciones,
+                                             grafo.version, anterior.nombre_a_estacion)
+                self._por_franja[franja] = instantanea
+            self._actual = instantanea
+            self._sincronizar = True
+        return instantanea
+
+    def reemplazar(self, grafo: Grafo):
+        """
+        Publica una red nueva completa (cambios de topología): un Grafo, que pasa a ser del estado,
+        o un GrafoCSR.
+        """
+        with self._escritura:
+            self._publicar(grafo)
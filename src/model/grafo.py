@@ -4,22 +4,58 @@ Módulo que define la clase Grafo para la red de transporte urbano.
 
 from src.model.estacion import Estacion
 from src.model.ruta import Ruta
+from src.model.grafo_csr import GrafoCSR
+from itertools import count
+
+# Contador global de versiones: cada cambio en cualquier grafo recibe un número único
+_versiones = count(1)
+
+
+def nueva_version() -> int:
+    """
+    Devuelve un número de versión nuevo del contador global (p. ej. para una instantánea que no
+    viene de un Grafo).
+    """
+    return next(_versiones)
 
 
 class Grafo:
     """
     Representa un grafo dirigido y ponderado para la red de transporte urbano.
     Permite agregar/eliminar estaciones y rutas, y cargar/guardar desde archivo.
+    Las consultas (camino_corto, etc.) usan la instantánea CSR de la versión actual: cada cambio
+    de estaciones o rutas y cada asignación de ruta.peso a una ruta del grafo crea una versión
+    nueva. Otros cambios que leen las consultas (modo de una ruta, transbordos de una estación)
+    necesitan registrar_cambio().
     """
 
     def __init__(self):
         """
         Inicializa el grafo con listas de adyacencia y mapeo de nombres.
         """
-        # Lista de adyacencia: Estacion -> lista de Rutas salientes
-        self.adjlist: dict[Estacion, list[Ruta]] = {}
+        # Adyacencia: Estacion origen -> {Estacion destino: Ruta}. Funciona como índice hash
+        # (origen, destino) -> Ruta y conserva el orden de inserción de las rutas
+        self.adjlist: dict[Estacion, dict[Estacion, Ruta]] = {}
+        # Adyacencia inversa: Estacion destino -> {Estacion origen: Ruta}
+        self.entrantes: dict[Estacion, dict[Estacion, Ruta]] = {}
         # Mapeo rápido de nombre a objeto Estacion
         self.nombre_a_estacion = {}
+        # Versión del grafo; cambia con cada modificación (útil para invalidar cachés)
+        self.version = next(_versiones)
+        # Versión de la última vez que se añadieron o eliminaron estaciones o rutas
+        self.version_topologia = self.version
+        self._csr = None
+
+    def registrar_cambio(self, topologia: bool = False):
+        """
+        Marca el grafo como modificado asignándole una nueva versión.
+        Asignar ruta.peso a una ruta del grafo ya la llama; hace falta llamarla tras otros cambios
+        que leen las cachés por versión, como el modo de una ruta o los transbordos de una estación.
+        Con topologia=True (al añadir o eliminar estaciones o rutas) también cambia version_topologia.
+        """
+        self.version = next(_versiones)
+        if topologia:
+            self.version_topologia = self.version
 
     def añadir_estacion(self, estacion: Estacion):
         """
@@ -28,21 +64,47 @@ class Grafo:
         if estacion.nombre in self.nombre_a_estacion:
             raise Exception(f"la estacion {estacion} ya se encuentra en el grafo")
         else:
-            self.adjlist[estacion] = []
+            self.adjlist[estacion] = {}
+            self.entrantes[estacion] = {}
             self.nombre_a_estacion[estacion.nombre] = estacion
+            self.registrar_cambio(topologia=True)
 
     def añadir_ruta(self, ruta: Ruta):
         """
-        Agrega una ruta dirigida entre dos estaciones.
+        Agrega una ruta dirigida entre dos estaciones. Solo puede haber una ruta por par (origen, destino).
         """
         if ruta.origen not in self.adjlist:
             raise Exception(f"No hay estacion {ruta.origen} en el grafo")
         if ruta.dest not in self.adjlist:
             raise Exception("No se encentra estacion destino")
-        if ruta in self.adjlist[ruta.origen]:
+        if ruta.dest in self.adjlist[ruta.origen]:
             raise Exception("Ruta ya se encuentra en el grafo")
         else:
-            self.adjlist[ruta.origen].append(ruta)
+            self.adjlist[ruta.origen][ruta.dest] = ruta
+            self.entrantes[ruta.dest][ruta.origen] = ruta
+            ruta._grafo = self
+            self.registrar_cambio(topologia=True)
+
+    def añadir_rutas(self, rutas):
+        """
+        Agrega muchas rutas de una vez (carga masiva): misma validación que añadir_ruta, con
+        búsquedas O(1) y un solo cambio de versión al final.
+        """
+        adjlist, entrantes = self.adjlist, self.entrantes
+        try:
+            for ruta in rutas:
+                salientes = adjlist.get(ruta.origen)
+                if salientes is None:
+                    raise Exception(f"No hay estacion {ruta.origen} en el grafo")
+                if ruta.dest not in entrantes:
+                    raise Exception("No se encentra estacion destino")
+                if ruta.dest in salientes:
+                    raise Exception("Ruta ya se encuentra en el grafo")
+                salientes[ruta.dest] = ruta
+                entrantes[ruta.dest][ruta.origen] = ruta
+                ruta._grafo = self
+        finally:
+            self.registrar_cambio(topologia=True)
 
     def obtener_estaciones(self):
         """
@@ -54,7 +116,20 @@ class Grafo:
         """
         Devuelve una lista de rutas salientes desde la estación dada.
         """
-        return self.adjlist[estacion]
+        return list(self.adjlist[estacion].values())
+
+    def obtener_entrantes(self, estacion):
+        """
+        Devuelve una lista de rutas entrantes a la estación dada.
+        """
+        return list(self.entrantes[estacion].values())
+
+    def obtener_ruta(self, origen: Estacion, destino: Estacion):
+        """
+        Devuelve la ruta de origen a destino, o None si no existe. O(1).
+        """
+        salientes = self.adjlist.get(origen)
+        return None if salientes is None else salientes.get(destino)
 
     def encontrar_estacion(self, nombre: str) -> Estacion:
         """
@@ -64,27 +139,47 @@ class Grafo:
 
     def eliminar_estacion(self, estacion: Estacion):
         """
-        Elimina la estación y todas las rutas asociadas (entrantes y salientes).
+        Elimina la estación y todas las rutas asociadas (entrantes y salientes), en O(grado).
         """
         if estacion not in self.adjlist:
             raise Exception(f"La estación {estacion} no existe en el grafo")
         # Elimina rutas que llegan a esta estación
-        for rutas in self.adjlist.values():
-            rutas[:] = [ruta for ruta in rutas if ruta.dest != estacion]
+        for origen, ruta in self.entrantes[estacion].items():
+            ruta._grafo = None
+            if origen != estacion:
+                del self.adjlist[origen][estacion]
+        # Elimina las rutas salientes de los índices de entrada de sus destinos
+        for destino, ruta in self.adjlist[estacion].items():
+            ruta._grafo = None
+            if destino != estacion:
+                del self.entrantes[destino][estacion]
         # Elimina la estación
         del self.adjlist[estacion]
+        del self.entrantes[estacion]
         del self.nombre_a_estacion[estacion.nombre]
+        self.registrar_cambio(topologia=True)
 
     def eliminar_ruta(self, ruta: Ruta):
         """
-        Elimina una ruta específica del grafo.
+        Elimina una ruta específica del grafo en O(1).
         """
         if ruta.origen not in self.adjlist:
             raise Exception(f"No existe la estación de origen {ruta.origen}")
-        try:
-            self.adjlist[ruta.origen].remove(ruta)
-        except ValueError:
+        if self.adjlist[ruta.origen].get(ruta.dest) != ruta:
             raise Exception("La ruta no existe en el grafo")
+        self.adjlist[ruta.origen][ruta.dest]._grafo = None
+        del self.adjlist[ruta.origen][ruta.dest]
+        del self.entrantes[ruta.dest][ruta.origen]
+        self.registrar_cambio(topologia=True)
+
+    def a_csr(self) -> GrafoCSR:
+        """
+        Exporta una instantánea CSR (ids enteros y arreglos compactos) del grafo actual.
+        La instantánea se reutiliza mientras la versión del grafo no cambie.
+        """
+        if self._csr is None or self._csr[0] != self.version:
+            self._csr = (self.version, GrafoCSR.desde_grafo(self))
+        return self._csr[1]
 
     def cargar_desde_json(self, ruta_archivo):
         """
@@ -94,43 +189,20 @@ class Grafo:
             "rutas": [{"origen": ..., "destino": ..., "peso": ...}, ...]
         }
         """
-        import json
-        from src.model.estacion import Estacion
-        from src.model.ruta import Ruta
+        from src.model.cargador import cargar_red
 
-        with open(ruta_archivo, "r", encoding="utf-8") as f:
-            datos = json.load(f)
         # Limpiar grafo actual
         self.adjlist.clear()
+        self.entrantes.clear()
         self.nombre_a_estacion.clear()
-        # Agregar estaciones
-        for nombre in datos["estaciones"]:
-            self.añadir_estacion(Estacion(nombre))
-        # Agregar rutas
-        for ruta in datos["rutas"]:
-            origen = self.nombre_a_estacion[ruta["origen"]]
-            destino = self.nombre_a_estacion[ruta["destino"]]
-            peso = ruta["peso"]
-            self.añadir_ruta(Ruta(origen, destino, peso))
+        self.registrar_cambio(topologia=True)
+        cargar_red(ruta_archivo, self, formato="json")
 
     def guardar_a_json(self, ruta_archivo):
         """
-        Guarda el grafo actual en un archivo JSON.
-        """
-        import json
-
-        estaciones = [e.nombre for e in self.obtener_estaciones()]
-        rutas = []
-        for estacion in self.obtener_estaciones():
-            for ruta in self.obtener_vecinos(estacion):
-                rutas.append(
-                    {
-                        "origen": ruta.origen.nombre,
-                        "destino": ruta.dest.nombre,
-                        "peso": ruta.peso,
-                    }
-                )
-        datos = {"estaciones": estaciones, "rutas": rutas}
-        with open(ruta_archivo, "w", encoding="utf-8") as f:
-            json.dump(datos, f, ensure_ascii=False, indent=2)
+        Guarda el grafo actual en un archivo JSON (con el modo de las rutas y los transbordos de las
+        estaciones que los tengan).
+        """
+        from src.model.cargador import guardar_red
 
+        guardar_red(self, ruta_archivo, formato="json")
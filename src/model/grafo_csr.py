@@ -0,0 +1,163 @@
+"""
+Módulo que define la clase GrafoCSR, una instantánea compacta e inmutable de la red de transporte urbano.
+"""
+
+from array import array
+
+from src.model.estacion import Estacion
+
+
+def entero_si_exacto(valor):
+    """
+    Devuelve el valor como int si es un flotante sin parte decimal (los pesos del CSR son flotantes;
+    así los pesos y tiempos de las redes con pesos enteros se muestran como al cargarlas desde JSON).
+    """
+    return int(valor) if isinstance(valor, float) and valor.is_integer() else valor
+
+
+class GrafoCSR:
+    """
+    Representa la red en formato CSR (compressed sparse row) indexado por enteros.
+    Cada estación recibe un id entero (en el orden de Grafo.obtener_estaciones()) y sus rutas
+    salientes ocupan el rango destinos[offsets[u]:offsets[u+1]] con los pesos alineados en 'pesos'.
+    Si alguna ruta tiene modo, modos[e] es el id de su modo en 'nombres_modos' (-1 si no tiene);
+    si ninguna lo tiene, modos es None.
+    La instantánea es de solo lectura: no refleja cambios posteriores en el Grafo de origen.
+    """
+
+    def __init__(self, nombres, offsets, destinos, pesos, rango=None, modos=None, nombres_modos=None):
+        """
+        Inicializa la instantánea a partir de sus arreglos.
+        - nombres: lista de nombres de estación indexada por id.
+        - offsets: V+1 enteros con el inicio de las rutas salientes de cada estación.
+        - destinos: E enteros con el id de la estación destino de cada ruta.
+        - pesos: E flotantes con el tiempo de cada ruta.
+        - rango: posición de cada estación en orden alfabético (desempate como en camino_corto).
+        - modos / nombres_modos: E enteros con el id del modo de cada ruta y la tabla de modos.
+        """
+        self.nombres = nombres
+        self.indice = {nombre: i for i, nombre in enumerate(nombres)}
+        self.offsets = offsets
+        self.destinos = destinos
+        self.pesos = pesos
+        if rango is None:
+            rango = array("q", [0]) * len(nombres)
+            for posicion, i in enumerate(sorted(range(len(nombres)), key=nombres.__getitem__)):
+                rango[i] = posicion
+        self.rango = rango
+        self.modos = modos
+        self.nombres_modos = nombres_modos if nombres_modos is not None else []
+        self._inversa = None
+
+    @classmethod
+    def desde_grafo(cls, grafo):
+        """
+        Construye la instantánea CSR de un Grafo respetando el orden de estaciones y rutas.
+        """
+        estaciones = grafo.obtener_estaciones()
+        nombres = [e.nombre for e in estaciones]
+        indice = {nombre: i for i, nombre in enumerate(nombres)}
+        offsets = array("q", [0])
+        destinos = array("q")
+        pesos = array("d")
+        modos = array("q")
+        id_modo = {None: -1}
+        for estacion in estaciones:
+            for ruta in grafo.obtener_vecinos(estacion):
+                destinos.append(indice[ruta.dest.nombre])
+                pesos.append(ruta.peso)
+                modo = id_modo.get(ruta.modo)
+                if modo is None:
+                    modo = id_modo[ruta.modo] = len(id_modo) - 1
+                modos.append(modo)
+            offsets.append(len(destinos))
+        if len(id_modo) == 1:
+            return cls(nombres, offsets, destinos, pesos)
+        return cls(nombres, offsets, destinos, pesos, modos=modos, nombres_modos=list(id_modo)[1:])
+
+    def num_estaciones(self) -> int:
+        """
+        Devuelve la cantidad de estaciones de la instantánea.
+        """
+        return len(self.nombres)
+
+    def num_rutas(self) -> int:
+        """
+        Devuelve la cantidad de rutas de la instantánea.
+        """
+        return len(self.destinos)
+
+    def id_de(self, nombre: str) -> int:
+        """
+        Devuelve el id entero de la estación con el nombre dado.
+        """
+        return self.indice[nombre]
+
+    def estacion(self, i: int) -> Estacion:
+        """
+        Devuelve la Estacion correspondiente al id dado.
+        """
+        return Estacion(self.nombres[i])
+
+    def vecinos(self, u: int):
+        """
+        Devuelve una lista de pares (destino, peso) de las rutas salientes de 'u'.
+        """
+        inicio, fin = self.offsets[u], self.offsets[u + 1]
+        return list(zip(self.destinos[inicio:fin], self.pesos[inicio:fin]))
+
+    def modo(self, e: int):
+        """
+        Devuelve el modo de la ruta e, o None si no tiene.
+        """
+        if self.modos is None or self.modos[e] < 0:
+            return None
+        return self.nombres_modos[self.modos[e]]
+
+    def con_pesos(self, pesos):
+        """
+        Devuelve una instantánea nueva con la misma topología y otros pesos (alineados con 'destinos').
+        Comparte nombres, índice, offsets, destinos, rango y modos con esta; no copia nada más que lo recibido.
+        """
+        if len(pesos) != self.num_rutas():
+            raise Exception("La cantidad de pesos no coincide con la cantidad de rutas")
+        copia = GrafoCSR.__new__(GrafoCSR)
+        copia.nombres = self.nombres
+        copia.indice = self.indice
+        copia.offsets = self.offsets
+        copia.destinos = self.destinos
+        copia.pesos = pesos
+        copia.rango = self.rango
+        copia.modos = self.modos
+        copia.nombres_modos = self.nombres_modos
+        copia._inversa = None
+        return copia
+
+    def inversa(self):
+        """
+        Devuelve (y memoriza) la instantánea con todas las rutas invertidas.
+        En la inversa, las rutas entrantes a cada estación conservan el orden de la instantánea.
+        """
+        if self._inversa is None:
+            n = self.num_estaciones()
+            conteo = array("q", [0]) * (n + 1)
+            for v in self.destinos:
+                conteo[v + 1] += 1
+            for i in range(n):
+                conteo[i + 1] += conteo[i]
+            offsets = array("q", conteo)
+            destinos = array("q", [0]) * self.num_rutas()
+            pesos = array("d", [0.0]) * self.num_rutas()
+            modos = array("q", [0]) * self.num_rutas() if self.modos is not None else None
+            siguiente = conteo
+            for u in range(n):
+                for e in range(self.offsets[u], self.offsets[u + 1]):
+                    v = self.destinos[e]
+                    destinos[siguiente[v]] = u
+                    pesos[siguiente[v]] = self.pesos[e]
+                    if modos is not None:
+                        modos[siguiente[v]] = self.modos[e]
+                    siguiente[v] += 1
+            self._inversa = GrafoCSR(self.nombres, offsets, destinos, pesos, self.rango, modos, self.nombres_modos)
+            self._inversa._inversa = self
+        return self._inversa
@@ -0,0 +1,141 @@
+"""
+Módulo que define la clase Horario: los viajes programados de la red como arreglos de conexiones.
+"""
+
+import csv
+from array import array
+
+from src.model.grafo import Grafo
+
+# Nombres de columna aceptados en el CSV de horarios (los del proyecto y los de stop_times.txt de GTFS)
+_COLUMNAS = {
+    "viaje": "viaje", "trip_id": "viaje",
+    "parada": "parada", "estacion": "parada", "stop_id": "parada",
+    "llegada": "llegada", "arrival_time": "llegada",
+    "salida": "salida", "departure_time": "salida",
+    "secuencia": "secuencia", "stop_sequence": "secuencia",
+}
+
+
+def minutos(hora) -> float:
+    """
+    Convierte una hora "HH:MM" o "HH:MM:SS" (puede pasar de 24:00, como en GTFS) o un número
+    a minutos desde la medianoche.
+    """
+    if isinstance(hora, (int, float)):
+        return float(hora)
+    partes = [float(p) for p in hora.strip().split(":")]
+    if len(partes) == 1:
+        return partes[0]
+    return partes[0] * 60 + partes[1] + (partes[2] / 60 if len(partes) > 2 else 0)
+
+
+class Horario:
+    """
+    Horario de la red en arreglos planos, listo para el Connection Scan Algorithm:
+    - Una conexión c es un tramo de un viaje entre dos paradas consecutivas: sale de desde[c] en el
+      minuto salida[c] y llega a hacia[c] en el minuto llegada[c], dentro del viaje viaje[c].
+    - Las conexiones están ordenadas por (salida, llegada, viaje, posición), así que una consulta las
+      recorre en orden, en un solo barrido lineal sobre arreglos contiguos, y los tramos de un viaje
+      aparecen en su orden aunque duren cero minutos.
+    - Las paradas de cada viaje, en orden, son paradas_viaje[inicio_viaje[t]:inicio_viaje[t + 1]];
+      posicion[c] es la posición de desde[c] en su viaje (para reconstruir los tramos).
+    - cambio[s]: minutos mínimos para cambiar de viaje en la parada s.
+    """
+
+    def __init__(self, nombres, viajes, salida, llegada, desde, hacia, viaje, posicion,
+                 inicio_viaje, paradas_viaje, cambio=None):
+        """
+        Inicializa el horario a partir de sus arreglos (ver Horario.desde_viajes).
+        """
+        self.nombres = nombres
+        self.indice = {nombre: i for i, nombre in enumerate(nombres)}
+        self.viajes = viajes
+        self.salida = salida
+        self.llegada = llegada
+        self.desde = desde
+        self.hacia = hacia
+        self.viaje = viaje
+        self.posicion = posicion
+        self.inicio_viaje = inicio_viaje
+        self.paradas_viaje = paradas_viaje
+        self.cambio = cambio if cambio is not None else array("d", [0.0]) * len(nombres)
+
+    @classmethod
+    def desde_viajes(cls, viajes, cambio=None):
+        """
+        Construye el horario desde un iterable de (id de viaje, [(parada, llegada, salida), ...])
+        con las paradas de cada viaje en orden. 'cambio' es un diccionario opcional
+        parada -> minutos mínimos de transbordo.
+        """
+        nombres, indice = [], {}
+        ids_viajes = []
+        inicio_viaje = array("q", [0])
+        paradas_viaje = array("q")
+        conexiones = []  # (salida, llegada, desde, hacia, viaje, posicion)
+        for id_viaje, paradas in viajes:
+            t = len(ids_viajes)
+            ids_viajes.append(id_viaje)
+            anterior = None
+            for posicion, (parada, hora_llegada, hora_salida) in enumerate(paradas):
+                s = indice.get(parada)
+                if s is None:
+                    s = indice[parada] = len(nombres)
+                    nombres.append(parada)
+                paradas_viaje.append(s)
+                if anterior is not None:
+                    desde, salida_anterior = anterior
+                    if minutos(hora_llegada) < salida_anterior:
+                        raise Exception(f"El viaje {id_viaje} llega a {parada} antes de salir de la parada anterior")
+                    conexiones.append((salida_anterior, minutos(hora_llegada), desde, s, t, posicion - 1))
+                anterior = (s, minutos(hora_salida))
+            inicio_viaje.append(len(paradas_viaje))
+        # Con empates de hora (tramos de duración cero), las conexiones de un mismo viaje quedan en su orden
+        conexiones.sort(key=lambda conexion: (conexion[0], conexion[1], conexion[4], conexion[5]))
+        columnas = list(zip(*conexiones)) if conexiones else [(), (), (), (), (), ()]
+        tiempos_cambio = array("d", [0.0]) * len(nombres)
+        for parada, minutos_cambio in (cambio or {}).items():
+            if parada in indice:
+                tiempos_cambio[indice[parada]] = minutos_cambio
+        return cls(nombres, ids_viajes, array("d", columnas[0]), array("d", columnas[1]), array("q", columnas[2]),
+                   array("q", columnas[3]), array("q", columnas[4]), array("q", columnas[5]),
+                   inicio_viaje, paradas_viaje, tiempos_cambio)
+
+    def num_conexiones(self) -> int:
+        """
+        Devuelve la cantidad de conexiones del horario.
+        """
+        return len(self.salida)
+
+    def paradas_entre(self, t: int, desde_posicion: int, hasta_posicion: int):
+        """
+        Devuelve los ids de las paradas del viaje t entre dos posiciones (incluidas).
+        """
+        inicio = self.inicio_viaje[t]
+        return list(self.paradas_viaje[inicio + desde_posicion:inicio + hasta_posicion + 1])
+
+
+def cargar_horarios(ruta_archivo, grafo: Grafo = None) -> Horario:
+    """
+    Carga un horario desde un CSV con una fila por parada de cada viaje: columnas viaje, parada,
+    llegada, salida y opcionalmente secuencia (también se aceptan las de stop_times.txt de GTFS).
+    Las horas pueden ser "HH:MM[:SS]" o minutos. Sin secuencia, las paradas de cada viaje van en el
+    orden del archivo. Si se pasa el grafo, el tiempo mínimo de cambio en cada parada es el
+    transbordo de la Estacion del mismo nombre.
+    """
+    viajes = {}
+    with open(ruta_archivo, "r", encoding="utf-8", newline="") as f:
+        lector = csv.DictReader(f)
+        for numero, fila in enumerate(lector):
+            fila = {_COLUMNAS[c.strip()]: v for c, v in fila.items() if c and c.strip() in _COLUMNAS}
+            if not {"viaje", "parada", "llegada", "salida"} <= fila.keys():
+                raise Exception("El CSV de horarios debe tener las columnas viaje, parada, llegada y salida")
+            orden = float(fila["secuencia"]) if fila.get("secuencia") else numero
+            viajes.setdefault(fila["viaje"], []).append((orden, fila["parada"], fila["llegada"], fila["salida"]))
+    cambio = None
+    if grafo is not None:
+        cambio = {e.nombre: e.transbordo for e in grafo.obtener_estaciones()}
+    return Horario.desde_viajes(
+        ((id_viaje, [parada[1:] for parada in sorted(paradas)]) for id_viaje, paradas in viajes.items()),
+        cambio,
+    )
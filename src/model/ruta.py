@@ -10,17 +10,41 @@ class Ruta:
     Representa una ruta dirigida y ponderada entre dos estaciones.
     """
 
-    def __init__(self, origen: Estacion, dest: Estacion, peso: float = 1):
+    def __init__(self, origen: Estacion, dest: Estacion, peso: float = 1, modo: str = None):
         """
         Inicializa una ruta con origen, destino y peso (tiempo).
+        'peso_base' guarda el tiempo sin congestión; 'peso' es el tiempo vigente. Los cambios
+        permanentes (actualizar_peso_ruta) cambian ambos; las congestiones solo cambian 'peso' y
+        se calculan a partir de 'peso_base'.
+        'modo' es el medio de transporte de la ruta (p. ej. "metro", "bus", "caminata"); None si no se indica.
         """
         self.origen = origen
         self.dest = dest
-        self.peso = peso
+        self._peso = peso
+        self.peso_base = peso
+        self.modo = modo
+        self._grafo = None  # Grafo que contiene la ruta (lo fija Grafo al añadirla)
+
+    @property
+    def peso(self):
+        """
+        Tiempo vigente de la ruta.
+        """
+        return self._peso
+
+    @peso.setter
+    def peso(self, valor):
+        """
+        Cambia el tiempo vigente. Si la ruta está en un Grafo, registra el cambio en él (nueva
+        versión), así su instantánea CSR y las cachés por versión no siguen con el peso viejo.
+        """
+        self._peso = valor
+        if self._grafo is not None:
+            self._grafo.registrar_cambio()
 
     def __eq__(self, other):
         """
-        Compara dos rutas por origen, destino y peso.
+        Compara dos rutas por origen, destino, peso y modo.
         """
         if not isinstance(other, Ruta):
             return False
@@ -28,11 +52,12 @@ class Ruta:
             self.origen == other.origen
             and self.dest == other.dest
             and self.peso == other.peso
+            and self.modo == other.modo
         )
 
     def __hash__(self):
         """
         Permite usar Ruta como clave en diccionarios y sets.
         """
-        return hash((self.origen, self.dest, self.peso))
+        return hash((self.origen, self.dest, self.peso, self.modo))
 
@@ -0,0 +1,179 @@
+"""
+Módulo que implementa el formato binario de instantáneas de la red (lectura con mmap, sin copias).
+"""
+
+import mmap
+import os
+import struct
+import sys
+import tempfile
+import zlib
+from array import array
+from contextlib import contextmanager
+
+from src.model.grafo import Grafo
+from src.model.grafo_csr import GrafoCSR, entero_si_exacto
+
+# Formato del archivo (little-endian, todas las secciones alineadas a 8 bytes):
+#   encabezado de 64 bytes: magia, versión del formato, crc32 del contenido, V, E, bytes de nombres,
+#   cantidad de modos y bytes de la tabla de modos
+#   offsets (V+1 int64) | destinos (E int64) | pesos (E float64) | rango (V int64) | nombres (UTF-8, '\0')
+#   y, solo si hay modos: modos (E int64, -1 sin modo) | tabla de modos (UTF-8, '\0')
+# La versión 1 no tenía modos (esos campos del encabezado eran relleno en cero) y se sigue leyendo.
+MAGIA = b"REDCSR\x00\x01"
+VERSION_FORMATO = 2
+_ENCABEZADO = struct.Struct("<8sIIqqqqq")
+TAM_ENCABEZADO = 64
+
+
+def _relleno(tamano: int) -> int:
+    """
+    Devuelve los bytes de relleno necesarios para alinear 'tamano' a 8 bytes.
+    """
+    return -tamano % 8
+
+
+def guardar_snapshot(grafo, ruta_archivo):
+    """
+    Escribe la instantánea binaria de un Grafo o de un GrafoCSR.
+    """
+    if sys.byteorder != "little":
+        raise Exception("El formato de instantánea solo está soportado en arquitecturas little-endian")
+    csr = grafo if isinstance(grafo, GrafoCSR) else grafo.a_csr()
+    if any("\x00" in nombre for nombre in csr.nombres + csr.nombres_modos):
+        raise Exception("Los nombres de estación y de modo no pueden contener el carácter nulo")
+    nombres = "\x00".join(csr.nombres).encode("utf-8")
+    secciones = [
+        array("q", csr.offsets).tobytes(),
+        array("q", csr.destinos).tobytes(),
+        array("d", csr.pesos).tobytes(),
+        array("q", csr.rango).tobytes(),
+        nombres + b"\x00" * _relleno(len(nombres)),
+    ]
+    modos = b""
+    if csr.modos is not None:
+        modos = "\x00".join(csr.nombres_modos).encode("utf-8")
+        secciones.append(array("q", csr.modos).tobytes())
+        secciones.append(modos + b"\x00" * _relleno(len(modos)))
+    num_modos = len(csr.nombres_modos) if csr.modos is not None else 0
+    crc = 0
+    for seccion in secciones:
+        crc = zlib.crc32(seccion, crc)
+    encabezado = _ENCABEZADO.pack(MAGIA, VERSION_FORMATO, crc, csr.num_estaciones(), csr.num_rutas(), len(nombres),
+                                  num_modos, len(modos))
+    with open(ruta_archivo, "wb") as f:
+        f.write(encabezado.ljust(TAM_ENCABEZADO, b"\x00"))
+        for seccion in secciones:
+            f.write(seccion)
+
+
+def abrir_snapshot(ruta_archivo, verificar: bool = True) -> GrafoCSR:
+    """
+    Abre una instantánea binaria con mmap de solo lectura y devuelve un GrafoCSR cuyos arreglos son
+    vistas (memoryview) sobre las páginas mapeadas: no se copian, y varios procesos que abren el
+    mismo archivo comparten esas páginas en memoria. Solo se decodifica la tabla de nombres.
+    Con 'verificar' se comprueba el crc32 del contenido (recorre el archivo entero una vez).
+    """
+    if sys.byteorder != "little":
+        raise Exception("El formato de instantánea solo está soportado en arquitecturas little-endian")
+    with open(ruta_archivo, "rb") as f:
+        # mmap no acepta archivos vacíos: los archivos sin encabezado completo se rechazan antes
+        if os.fstat(f.fileno()).st_size < TAM_ENCABEZADO:
+            raise Exception(f"El archivo {ruta_archivo} no es una instantánea de la red")
+        mapa = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    magia, version, crc, n, m, bytes_nombres, num_modos, bytes_modos = _ENCABEZADO.unpack_from(mapa, 0)
+    if magia != MAGIA:
+        raise Exception(f"El archivo {ruta_archivo} no es una instantánea de la red")
+    if version not in (1, VERSION_FORMATO):
+        raise Exception(f"Versión de instantánea no soportada: {version}")
+    vista = memoryview(mapa)
+    posicion = TAM_ENCABEZADO
+    tamanos = [8 * (n + 1), 8 * m, 8 * m, 8 * n, bytes_nombres + _relleno(bytes_nombres)]
+    if num_modos:
+        tamanos += [8 * m, bytes_modos + _relleno(bytes_modos)]
+    if len(mapa) != posicion + sum(tamanos):
+        raise Exception(f"La instantánea {ruta_archivo} está truncada o dañada")
+    if verificar and zlib.crc32(vista[posicion:]) != crc:
+        raise Exception(f"La instantánea {ruta_archivo} no coincide con su checksum")
+    secciones = []
+    for tamano in tamanos:
+        secciones.append(vista[posicion:posicion + tamano])
+        posicion += tamano
+    offsets = secciones[0].cast("q")
+    destinos = secciones[1].cast("q")
+    pesos = secciones[2].cast("d")
+    rango = secciones[3].cast("q")
+    texto = bytes(secciones[4][:bytes_nombres]).decode("utf-8")
+    nombres = texto.split("\x00") if n else []
+    if not num_modos:
+        return GrafoCSR(nombres, offsets, destinos, pesos, rango)
+    nombres_modos = bytes(secciones[6][:bytes_modos]).decode("utf-8").split("\x00")
+    return GrafoCSR(nombres, offsets, destinos, pesos, rango, secciones[5].cast("q"), nombres_modos)
+
+
+@contextmanager
+def snapshot_temporal(grafo):
+    """
+    Escribe la instantánea de un Grafo o GrafoCSR en un archivo temporal y entrega su ruta,
+    p. ej. para que procesos trabajadores la abran con abrir_snapshot. El archivo se borra al salir.
+    """
+    descriptor, ruta = tempfile.mkstemp(suffix=".csr")
+    os.close(descriptor)
+    try:
+        guardar_snapshot(grafo, ruta)
+        yield ruta
+    finally:
+        os.remove(ruta)
+
+
+def csr_a_grafo(csr: GrafoCSR) -> Grafo:
+    """
+    Reconstruye un Grafo (objetos Estacion y Ruta, con su modo) a partir de una instantánea.
+    Los pesos enteros vuelven a ser int, como al cargarlos desde JSON.
+    """
+    from src.model.estacion import Estacion
+    from src.model.ruta import Ruta
+
+    grafo = Grafo()
+    estaciones = [Estacion(nombre) for nombre in csr.nombres]
+    for estacion in estaciones:
+        grafo.añadir_estacion(estacion)
+    offsets, destinos, pesos = csr.offsets, csr.destinos, csr.pesos
+    grafo.añadir_rutas(
+        Ruta(estaciones[u], estaciones[destinos[e]], entero_si_exacto(pesos[e]), csr.modo(e))
+        for u in range(csr.num_estaciones())
+        for e in range(offsets[u], offsets[u + 1])
+    )
+    return grafo
+
+
+def cargar_con_snapshot(ruta_json, ruta_snapshot):
+    """
+    Carga la red desde la instantánea binaria si existe y está al día con el archivo JSON (no es
+    más antigua), o desde el JSON en caso contrario. Con la instantánea devuelve el GrafoCSR
+    mapeado, sin reconstruir objetos Estacion ni Ruta (EstadoRed lo publica tal cual); con el JSON,
+    un Grafo.
+    """
+    if os.path.exists(ruta_snapshot) and os.path.getmtime(ruta_snapshot) >= os.path.getmtime(ruta_json):
+        return abrir_snapshot(ruta_snapshot)
+    from src.model.cargador import cargar_red
+
+    grafo, _ = cargar_red(ruta_json)
+    return grafo
+
+
+def json_a_snapshot(ruta_json, ruta_snapshot):
+    """
+    Convierte una red en el formato JSON del proyecto a una instantánea binaria.
+    """
+    from src.model.cargador import cargar_red_csr
+
+    csr, _ = cargar_red_csr(ruta_json, formato="json")
+    guardar_snapshot(csr, ruta_snapshot)
+
+
+def snapshot_a_json(ruta_snapshot, ruta_json):
+    """
+    Convierte una instantánea binaria al formato JSON del proyecto.
+    """
+    csr_a_grafo(abrir_snapshot(ruta_snapshot)).guardar_a_json(ruta_json)
@@ -3,11 +3,16 @@ Módulo que implementa la actualización dinámica de pesos en la red de transpo
 """
 
 from src.model.grafo import Grafo
+from src.model.grafo_csr import GrafoCSR
 import random
+import numpy as np
 
 def actualizar_peso_ruta(grafo: Grafo, origen_nombre: str, destino_nombre: str, nuevo_peso: float):
     """
     Actualiza el peso de una ruta específica entre dos estaciones.
+    Es un cambio permanente (p. ej. una obra o un nuevo trazado): cambia tanto el peso vigente como
+    el peso base, así que las congestiones por hora posteriores parten del peso nuevo. Las
+    congestiones (simular_congestion, aplicar_congestion_por_hora) solo cambian el peso vigente.
 
     :param grafo: El grafo que contiene las estaciones y rutas.
     :param origen_nombre: El nombre de la estación de origen.
@@ -17,11 +22,13 @@ def actualizar_peso_ruta(grafo: Grafo, origen_nombre: str, destino_nombre: str,
     """
     origen = grafo.encontrar_estacion(origen_nombre)
     destino = grafo.encontrar_estacion(destino_nombre)
-    for ruta in grafo.obtener_vecinos(origen):
-        if ruta.dest == destino:
-            ruta.peso = nuevo_peso
-            return True
-    return False  # No se encontró la ruta
+    ruta = grafo.obtener_ruta(origen, destino)
+    if ruta is None:
+        return False  # No se encontró la ruta
+    ruta.peso = nuevo_peso
+    ruta.peso_base = nuevo_peso
+    grafo.registrar_cambio()
+    return True
 
 def simular_congestion(grafo: Grafo, factor_min=1.2, factor_max=2.0, porcentaje=0.3):
     """
@@ -53,20 +60,71 @@ def simular_congestion(grafo: Grafo, factor_min=1.2, factor_max=2.0, porcentaje=
         ruta.peso = round(ruta.peso * factor, 2)
         # Agrega la información de la ruta afectada a la lista de rutas_afectadas
         rutas_afectadas.append((ruta.origen.nombre, ruta.dest.nombre, peso_anterior, ruta.peso))
+    grafo.registrar_cambio()
     # Retorna la lista de rutas que fueron afectadas por la simulación de congestión
     return rutas_afectadas
 
-def aplicar_congestion_por_hora(grafo: Grafo, hora: int):
+def simular_congestion_pesos(pesos, generador: np.random.Generator, factor_min=1.2, factor_max=2.0, porcentaje=0.3):
+    """
+    Versión vectorizada de simular_congestion sobre un arreglo de pesos (uno por ruta, p. ej. csr.pesos).
+    Elige las rutas afectadas, sortea los factores y los aplica con unas pocas operaciones de NumPy.
+    No modifica 'pesos'. Usar un generador con semilla (np.random.default_rng(semilla)) hace la
+    simulación reproducible.
+
+    :return: Una tupla (pesos_nuevos, indices, pesos_anteriores, pesos_afectados) de arreglos NumPy:
+             el vector completo de pesos nuevos y, para las rutas afectadas (ordenadas por índice),
+             sus índices, su peso anterior y su peso nuevo.
     """
-    Ajusta los pesos de las rutas según la hora del día.
+    pesos = np.asarray(pesos, dtype=np.float64)
+    m = len(pesos)
+    n_afectar = max(1, int(m * porcentaje)) if m else 0
+    indices = np.sort(generador.choice(m, size=n_afectar, replace=False)) if m else np.zeros(0, dtype=np.int64)
+    factores = generador.uniform(factor_min, factor_max, size=n_afectar)
+    anteriores = pesos[indices]
+    afectados = np.round(anteriores * factores, 2)
+    pesos_nuevos = pesos.copy()
+    pesos_nuevos[indices] = afectados
+    return pesos_nuevos, indices, anteriores, afectados
+
+def simular_congestion_csr(csr: GrafoCSR, generador: np.random.Generator, factor_min=1.2, factor_max=2.0, porcentaje=0.3):
+    """
+    Aplica simular_congestion_pesos a una instantánea y devuelve una tupla
+    (instantánea nueva con los pesos congestionados, indices, pesos_anteriores, pesos_afectados).
+    La instantánea original no cambia; la nueva comparte su topología.
+    """
+    pesos_nuevos, indices, anteriores, afectados = simular_congestion_pesos(
+        csr.pesos, generador, factor_min, factor_max, porcentaje
+    )
+    return csr.con_pesos(memoryview(pesos_nuevos)), indices, anteriores, afectados
+
+def factor_congestion(hora: int) -> float:
+    """
+    Devuelve el factor de congestión de la hora del día.
     - Hora pico: 6-9 y 17-20 (aumenta pesos 60%)
     - Hora valle: 0-5 y 21-23 (reduce pesos 20%)
     - Resto del día: pesos normales
     """
+    if 6 <= hora <= 9 or 17 <= hora <= 20:
+        return 1.6
+    if 0 <= hora <= 5 or 21 <= hora <= 23:
+        return 0.8
+    return 1.0
+
+def aplicar_congestion_por_hora(grafo: Grafo, hora: int):
+    """
+    Ajusta los pesos de las rutas según la hora del día (ver factor_congestion).
+    El factor se aplica sobre el peso base de cada ruta, no sobre el peso vigente: aplicar dos
+    horas seguidas no acumula los factores, y la hora normal devuelve los pesos base.
+    Retorna una lista de tuplas (origen, destino, peso_anterior, peso_nuevo) con las rutas modificadas,
+    con la misma forma que simular_congestion.
+    """
+    factor = factor_congestion(hora)
+    rutas_afectadas = []
     for estacion in grafo.obtener_estaciones():
         for ruta in grafo.obtener_vecinos(estacion):
-            if 6 <= hora <= 9 or 17 <= hora <= 20:
-                ruta.peso = round(ruta.peso * 1.6, 2)
-            elif 0 <= hora <= 5 or 21 <= hora <= 23:
-                ruta.peso = round(ruta.peso * 0.8, 2)
-            # Si es resto del día, no cambia el peso
+            peso_anterior = ruta.peso
+            ruta.peso = ruta.peso_base if factor == 1.0 else round(ruta.peso_base * factor, 2)
+            if ruta.peso != peso_anterior:
+                rutas_afectadas.append((ruta.origen.nombre, ruta.dest.nombre, peso_anterior, ruta.peso))
+    grafo.registrar_cambio()
+    return rutas_afectadas
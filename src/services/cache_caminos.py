@@ -0,0 +1,111 @@
+"""
+Módulo que implementa una caché LRU de árboles de caminos más cortos para la red de transporte urbano.
+"""
+
+import sys
+import threading
+from collections import OrderedDict
+
+from src.model.estacion import Estacion
+from src.model.grafo import Grafo
+from src.model.grafo_csr import entero_si_exacto
+from src.services.dijkstra import arbol_caminos_csr
+
+
+class CacheCaminos:
+    """
+    Guarda el árbol de caminos más cortos de cada origen consultado, con clave (versión del grafo, origen).
+    Como la versión cambia con cada modificación del grafo, un cambio de pesos invalida las entradas
+    viejas, que terminan saliendo por LRU. Así, tras un evento de congestión, las consultas repetidas
+    cuestan un Dijkstra por origen y no uno por consulta.
+    Es segura entre hilos: un lock protege solo la contabilidad de la caché, no los cálculos.
+    """
+
+    def __init__(self, max_entradas: int = 256, max_bytes: int = 64 * 1024 * 1024):
+        """
+        Inicializa la caché con un límite de entradas y un límite aproximado de memoria en bytes.
+        """
+        self.max_entradas = max_entradas
+        self.max_bytes = max_bytes
+        self._entradas = OrderedDict()  # (version, nombre_origen) -> (csr, distances, anterior, bytes)
+        self.bytes_usados = 0
+        self.aciertos = 0
+        self.fallos = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        """
+        Devuelve la cantidad de árboles guardados.
+        """
+        return len(self._entradas)
+
+    @staticmethod
+    def _tamano(distances, anterior) -> int:
+        """
+        Estima la memoria ocupada por un árbol (listas y números que contienen).
+        """
+        return sys.getsizeof(distances) + sys.getsizeof(anterior) + 24 * len(distances)
+
+    def arbol(self, grafo: Grafo, origen: Estacion):
+        """
+        Devuelve una tupla (csr, distances, anterior) con el árbol de caminos más cortos desde 'origen',
+        calculándolo solo si no está en la caché para la versión actual del grafo.
+        """
+        clave = (grafo.version, origen.nombre)
+        with self._lock:
+            entrada = self._entradas.get(clave)
+            if entrada is not None:
+                self.aciertos += 1
+                self._entradas.move_to_end(clave)
+                return entrada[:3]
+            self.fallos += 1
+        csr = grafo.a_csr()
+        distances, anterior = arbol_caminos_csr(csr, csr.id_de(origen.nombre))
+        tamano = self._tamano(distances, anterior)
+        with self._lock:
+            if clave not in self._entradas:  # Otro hilo pudo calcular el mismo árbol a la vez
+                self._entradas[clave] = (csr, distances, anterior, tamano)
+                self.bytes_usados += tamano
+            # Expulsa las entradas menos usadas recientemente hasta respetar los límites
+            while len(self._entradas) > 1 and (
+                len(self._entradas) > self.max_entradas or self.bytes_usados > self.max_bytes
+            ):
+                _, expulsada = self._entradas.popitem(last=False)
+                self.bytes_usados -= expulsada[3]
+        return csr, distances, anterior
+
+    def camino_corto(self, grafo: Grafo, inicio: Estacion, destino: Estacion):
+        """
+        Igual que dijkstra.camino_corto, pero reutilizando el árbol del origen si está en caché.
+        Devuelve una tupla (camino, tiempo_total); si no hay camino, retorna (None, float('inf')).
+        """
+        csr, distances, anterior = self.arbol(grafo, inicio)
+        d = csr.id_de(destino.nombre)
+        if distances[d] == float("inf"):
+            return None, float("inf")  # No hay camino
+        camino = []
+        actual = d
+        while actual != -1:
+            camino.append(grafo.encontrar_estacion(csr.nombres[actual]))
+            actual = anterior[actual]
+        camino.reverse()
+        return camino, entero_si_exacto(distances[d])
+
+    def limpiar(self):
+        """
+        Vacía la caché sin reiniciar los contadores.
+        """
+        with self._lock:
+            self._entradas.clear()
+            self.bytes_usados = 0
+
+    def estadisticas(self) -> dict:
+        """
+        Devuelve un diccionario con aciertos, fallos, entradas y bytes usados.
+        """
+        return {
+            "aciertos": self.aciertos,
+            "fallos": self.fallos,
+            "entradas": len(self._entradas),
+            "bytes": self.bytes_usados,
+        }
@@ -1,36 +1,211 @@
 """
-Módulo que implementa la detección de ciclos en la red de transporte urbano.
+Módulo que implementa la detección y enumeración de ciclos en la red de transporte urbano.
 """
 
 from src.model.grafo import Grafo
+from src.model.grafo_csr import GrafoCSR
+from src.services.conectividad import componentes_fuertemente_conexas
 
 def hay_ciclo(grafo: Grafo) -> bool:
     """
     Detecta ciclos en el grafo dirigido usando DFS (Depth-First Search).
     Retorna True si existe al menos un ciclo, False en caso contrario.
+    El recorrido es iterativo sobre la instantánea CSR, así que no depende del límite de recursión.
     """
-    visitados = set()  # Conjunto de estaciones ya visitadas
-    en_recursion = set()  # Conjunto de estaciones en el camino actual de DFS
-
-    def dfs(estacion):
-        visitados.add(estacion)
-        en_recursion.add(estacion)
-        # Recorre todos los vecinos de la estacion actual
-        for ruta in grafo.obtener_vecinos(estacion):
-            vecino = ruta.dest
-            # Si el vecino no ha sido visitado, se aplica DFS sobre el
-            if vecino not in visitados:
-                if dfs(vecino):
-                    return True
-            # Si el vecino esta en el camino actual, se ha encontrado un ciclo
-            elif vecino in en_recursion:
-                return True
-        en_recursion.remove(estacion)  # Se quita la estacion del camino actual
-        return False
-
-    # Se inicia el DFS desde cada estacion no visitada
-    for estacion in grafo.obtener_estaciones():
-        if estacion not in visitados:
-            if dfs(estacion):
-                return True
-    return False
+    return hay_ciclo_csr(grafo.a_csr())
+
+
+def hay_ciclo_csr(csr: GrafoCSR) -> bool:
+    """
+    Detecta ciclos sobre una instantánea GrafoCSR con un DFS iterativo sobre ids enteros.
+    """
+    return encontrar_ciclo_csr(csr) is not None
+
+
+def encontrar_ciclo_csr(csr: GrafoCSR):
+    """
+    Busca un ciclo con un DFS iterativo de tres colores: 0 = no visitado, 1 = en el camino actual,
+    2 = terminado. Retorna los ids del ciclo [v0, v1, ..., vk] (con la ruta vk -> v0 cerrándolo)
+    o None si el grafo es acíclico.
+    """
+    offsets, destinos = csr.offsets, csr.destinos
+    color = bytearray(csr.num_estaciones())
+    for raiz in range(csr.num_estaciones()):
+        if color[raiz]:
+            continue
+        color[raiz] = 1
+        # Cada entrada de la pila guarda el nodo y la siguiente ruta por explorar;
+        # los nodos de la pila son, en orden, el camino actual del DFS
+        pila = [(raiz, offsets[raiz])]
+        posicion = {raiz: 0}  # Nodo gris -> su posición en la pila
+        while pila:
+            u, e = pila[-1]
+            if e == offsets[u + 1]:
+                color[u] = 2  # Se quita el nodo del camino actual
+                del posicion[u]
+                pila.pop()
+                continue
+            pila[-1] = (u, e + 1)
+            v = destinos[e]
+            if color[v] == 1:
+                return [nodo for nodo, _ in pila[posicion[v]:]]
+            if color[v] == 0:
+                color[v] = 1
+                posicion[v] = len(pila)
+                pila.append((v, offsets[v]))
+    return None
+
+
+def encontrar_ciclo(grafo: Grafo):
+    """
+    Retorna un ciclo del grafo como lista de estaciones (la última tiene una ruta hacia la primera),
+    o None si no hay ciclos.
+    """
+    csr = grafo.a_csr()
+    ciclo = encontrar_ciclo_csr(csr)
+    if ciclo is None:
+        return None
+    return [grafo.encontrar_estacion(csr.nombres[i]) for i in ciclo]
+
+
+def _saltos_desde(csr: GrafoCSR, s: int, permitido, limite: int) -> dict:
+    """
+    BFS desde 's' que solo pasa por estaciones permitidas; devuelve estación -> cantidad mínima de
+    rutas desde 's', sin pasar de 'limite'. Sobre la instantánea inversa da las distancias hacia 's'.
+    """
+    offsets, destinos = csr.offsets, csr.destinos
+    saltos = {s: 0}
+    frontera = [s]
+    nivel = 0
+    while frontera and nivel < limite:
+        nivel += 1
+        siguiente = []
+        for u in frontera:
+            for e in range(offsets[u], offsets[u + 1]):
+                v = destinos[e]
+                if permitido[v] and v not in saltos:
+                    saltos[v] = nivel
+                    siguiente.append(v)
+        frontera = siguiente
+    return saltos
+
+
+def _circuitos_johnson(csr: GrafoCSR, s: int, bloque):
+    """
+    Circuitos elementales que empiezan en 's' dentro de 'bloque' (la componente fuerte de 's' entre
+    las estaciones de id >= s), con el bloqueo clásico de Johnson: una estación que no llevó a 's'
+    queda bloqueada hasta que se desbloquee alguna de sus sucesoras. Versión iterativa.
+    """
+    offsets, destinos = csr.offsets, csr.destinos
+    bloqueadas = {s}
+    dependientes = {}  # w -> estaciones que se desbloquean cuando se desbloquea w
+    camino = [s]
+    pila = [[s, offsets[s], False]]  # [estación, siguiente ruta, encontró algún ciclo]
+    while pila:
+        marco = pila[-1]
+        v, e = marco[0], marco[1]
+        if e < offsets[v + 1]:
+            marco[1] = e + 1
+            w = destinos[e]
+            if w not in bloque:
+                continue
+            if w == s:
+                yield list(camino)
+                marco[2] = True
+            elif w not in bloqueadas:
+                bloqueadas.add(w)
+                camino.append(w)
+                pila.append([w, offsets[w], False])
+            continue
+        pila.pop()
+        camino.pop()
+        if marco[2]:
+            por_desbloquear = [v]
+            while por_desbloquear:
+                x = por_desbloquear.pop()
+                if x in bloqueadas:
+                    bloqueadas.discard(x)
+                    por_desbloquear.extend(dependientes.pop(x, ()))
+            if pila:
+                pila[-1][2] = True
+        else:
+            for e in range(offsets[v], offsets[v + 1]):
+                w = destinos[e]
+                if w in bloque:
+                    dependientes.setdefault(w, set()).add(v)
+
+
+def _circuitos_acotados(csr: GrafoCSR, s: int, hacia: dict, longitud_max: int):
+    """
+    Circuitos elementales que empiezan en 's' con a lo sumo 'longitud_max' estaciones. Se extiende
+    el camino hacia w solo si la distancia mínima de w a 's' ('hacia') permite cerrar el ciclo a tiempo.
+    """
+    offsets, destinos = csr.offsets, csr.destinos
+    en_camino = {s}
+    camino = [s]
+    pila = [[s, offsets[s]]]
+    while pila:
+        marco = pila[-1]
+        v, e = marco
+        if e < offsets[v + 1]:
+            marco[1] = e + 1
+            w = destinos[e]
+            if w == s:
+                yield list(camino)
+            elif w not in en_camino and len(camino) + hacia.get(w, longitud_max) <= longitud_max:
+                en_camino.add(w)
+                camino.append(w)
+                pila.append([w, offsets[w]])
+            continue
+        pila.pop()
+        en_camino.discard(v)
+        camino.pop()
+
+
+def enumerar_ciclos_csr(csr: GrafoCSR, longitud_max: int = None):
+    """
+    Genera perezosamente todos los ciclos simples como listas de ids, cada uno una sola vez y
+    empezando por su estación de menor id (algoritmo de Johnson).
+    - Se trabaja dentro de cada componente fuertemente conexa, porque un ciclo no sale de ella.
+    - Sin 'longitud_max' se usa el bloqueo clásico de Johnson: O((V + E) * (C + 1)) para C ciclos.
+    - Con 'longitud_max' (cantidad de estaciones del ciclo) se poda con las distancias en saltos
+      hacia la estación inicial, calculadas con un BFS sobre la instantánea inversa.
+    La memoria usada no depende de la cantidad de ciclos generados.
+    """
+    if longitud_max is not None and longitud_max < 1:
+        return
+    n = csr.num_estaciones()
+    offsets, destinos = csr.offsets, csr.destinos
+    inversa = csr.inversa()
+    componentes = componentes_fuertemente_conexas(csr)
+    grupos = [[] for _ in range(len(componentes))]
+    for v in range(n):
+        grupos[componentes.componente[v]].append(v)
+    permitido = bytearray(n)
+    for grupo in sorted(grupos):
+        if len(grupo) == 1:
+            s = grupo[0]
+            if any(destinos[e] == s for e in range(offsets[s], offsets[s + 1])):
+                yield [s]  # Ruta de una estación a sí misma
+            continue
+        for v in grupo:
+            permitido[v] = 1
+        for s in grupo:
+            if longitud_max is None:
+                hacia = _saltos_desde(inversa, s, permitido, n)
+                desde = _saltos_desde(csr, s, permitido, n)
+                yield from _circuitos_johnson(csr, s, {v for v in desde if v in hacia})
+            else:
+                hacia = _saltos_desde(inversa, s, permitido, longitud_max - 1)
+                yield from _circuitos_acotados(csr, s, hacia, longitud_max)
+            permitido[s] = 0  # Los ciclos siguientes no pasan por estaciones de id menor
+
+
+def enumerar_ciclos(grafo: Grafo, longitud_max: int = None):
+    """
+    Genera perezosamente los ciclos simples del grafo como listas de estaciones, opcionalmente
+    solo los de a lo sumo 'longitud_max' estaciones.
+    """
+    csr = grafo.a_csr()
+    for ciclo in enumerar_ciclos_csr(csr, longitud_max):
+        yield [grafo.encontrar_estacion(csr.nombres[i]) for i in ciclo]
@@ -3,29 +3,151 @@ Módulo que implementa la verificación de conectividad fuerte en la red de tran
 """
 
 from src.model.grafo import Grafo
+from src.model.grafo_csr import GrafoCSR
+from array import array
 
-def _alcanzables_desde(grafo: Grafo, inicio):
+def es_fuertemente_conexo(grafo: Grafo) -> bool:
+    """
+    Determina si el grafo es fuertemente conexo.
+    Retorna True si desde cualquier estación se puede llegar a cualquier otra.
+    Usa un recorrido hacia adelante y uno sobre el grafo inverso: O(V + E).
+    """
+    return es_fuertemente_conexo_csr(grafo.a_csr())
+
+
+def _alcanzables_csr(csr: GrafoCSR, inicio: int) -> int:
     """
-    Retorna el conjunto de estaciones alcanzables desde 'inicio' usando DFS.
+    Retorna cuántas estaciones son alcanzables desde el id 'inicio' en la instantánea.
     """
-    visitados = set()
+    offsets, destinos = csr.offsets, csr.destinos
+    visitados = bytearray(csr.num_estaciones())
+    visitados[inicio] = 1
+    total = 1
     stack = [inicio]
     while stack:
         actual = stack.pop()
-        if actual not in visitados:
-            visitados.add(actual)
-            for ruta in grafo.obtener_vecinos(actual):
-                stack.append(ruta.dest)
-    return visitados
+        for e in range(offsets[actual], offsets[actual + 1]):
+            vecino = destinos[e]
+            if not visitados[vecino]:
+                visitados[vecino] = 1
+                total += 1
+                stack.append(vecino)
+    return total
 
-def es_fuertemente_conexo(grafo: Grafo) -> bool:
+def es_fuertemente_conexo_csr(csr: GrafoCSR) -> bool:
     """
-    Determina si el grafo es fuertemente conexo.
-    Retorna True si desde cualquier estación se puede llegar a cualquier otra.
+    Determina si la instantánea GrafoCSR es fuertemente conexa.
+    Basta con que una estación alcance a todas y sea alcanzada por todas (grafo inverso).
+    """
+    n = csr.num_estaciones()
+    if n == 0:
+        return True
+    return _alcanzables_csr(csr, 0) == n and _alcanzables_csr(csr.inversa(), 0) == n
+
+
+
+class ComponentesFuertes:
+    """
+    Descomposición de la red en componentes fuertemente conexas.
+    - componente[v]: índice de la componente de la estación con id v.
+    - miembros[c]: nombres de las estaciones de la componente c.
+    - condensacion[c]: componentes a las que llega alguna ruta que sale de c (grafo acíclico).
+    Las componentes se numeran en orden topológico inverso (una componente solo llega a otras de
+    índice menor), que es el orden en que las cierra Tarjan.
+    """
+
+    def __init__(self, componente, miembros, condensacion):
+        """
+        Inicializa la descomposición con sus tres tablas.
+        """
+        self.componente = componente
+        self.miembros = miembros
+        self.condensacion = condensacion
+
+    def __len__(self):
+        """
+        Devuelve la cantidad de componentes.
+        """
+        return len(self.miembros)
+
+    def histograma(self) -> dict:
+        """
+        Devuelve un diccionario tamaño -> cantidad de componentes con ese tamaño.
+        """
+        histograma = {}
+        for miembros in self.miembros:
+            histograma[len(miembros)] = histograma.get(len(miembros), 0) + 1
+        return dict(sorted(histograma.items()))
+
+    def sumideros(self):
+        """
+        Devuelve las componentes sin rutas de salida hacia otras, si hay más de una componente:
+        quien entra en ellas no puede volver al resto de la red.
+        """
+        if len(self.miembros) < 2:
+            return []
+        return [c for c in range(len(self.miembros)) if not self.condensacion[c]]
+
+
+def componentes_fuertemente_conexas(grafo) -> ComponentesFuertes:
+    """
+    Calcula las componentes fuertemente conexas con una sola pasada iterativa de Tarjan: O(V + E).
+    Acepta un Grafo o una instantánea GrafoCSR.
     """
-    estaciones = grafo.obtener_estaciones()
-    for estacion in estaciones:
-        alcanzados = _alcanzables_desde(grafo, estacion)
-        if len(alcanzados) != len(estaciones):
-            return False
-    return True
+    csr = grafo if isinstance(grafo, GrafoCSR) else grafo.a_csr()
+    n = csr.num_estaciones()
+    offsets, destinos = csr.offsets, csr.destinos
+    sin_visitar = -1
+    orden = array("q", [sin_visitar]) * n  # Orden de descubrimiento
+    bajo = array("q", [0]) * n  # Menor orden alcanzable desde el subárbol
+    componente = array("q", [sin_visitar]) * n
+    en_pila = bytearray(n)
+    pila_tarjan = []
+    miembros = []
+    contador = 0
+    for raiz in range(n):
+        if orden[raiz] != sin_visitar:
+            continue
+        orden[raiz] = bajo[raiz] = contador
+        contador += 1
+        pila_tarjan.append(raiz)
+        en_pila[raiz] = 1
+        # Cada entrada de la pila de DFS guarda el nodo y la siguiente ruta por explorar
+        pila = [(raiz, offsets[raiz])]
+        while pila:
+            u, e = pila[-1]
+            if e < offsets[u + 1]:
+                pila[-1] = (u, e + 1)
+                v = destinos[e]
+                if orden[v] == sin_visitar:
+                    orden[v] = bajo[v] = contador
+                    contador += 1
+                    pila_tarjan.append(v)
+                    en_pila[v] = 1
+                    pila.append((v, offsets[v]))
+                elif en_pila[v] and orden[v] < bajo[u]:
+                    bajo[u] = orden[v]
+                continue
+            pila.pop()
+            if pila:
+                padre = pila[-1][0]
+                if bajo[u] < bajo[padre]:
+                    bajo[padre] = bajo[u]
+            if bajo[u] == orden[u]:
+                # u es la raíz de una componente: se extraen sus miembros
+                c = len(miembros)
+                grupo = []
+                while True:
+                    w = pila_tarjan.pop()
+                    en_pila[w] = 0
+                    componente[w] = c
+                    grupo.append(csr.nombres[w])
+                    if w == u:
+                        break
+                miembros.append(grupo)
+    condensacion = [set() for _ in miembros]
+    for u in range(n):
+        for e in range(offsets[u], offsets[u + 1]):
+            if componente[u] != componente[destinos[e]]:
+                condensacion[componente[u]].add(componente[destinos[e]])
+    return ComponentesFuertes(componente, miembros, condensacion)
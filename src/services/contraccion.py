@@ -0,0 +1,253 @@
+"""
+Módulo que implementa Contraction Hierarchies personalizables (CCH) para consultas de ruta muy rápidas.
+"""
+
+import heapq
+from array import array
+
+from src.model.estacion import Estacion
+from src.model.grafo import Grafo
+
+
+def _orden_grado_minimo(adyacentes):
+    """
+    Orden de contracción por grado mínimo, simulando los atajos que agrega cada contracción.
+    """
+    n = len(adyacentes)
+    adyacentes = [set(vecinos) for vecinos in adyacentes]
+    orden = []
+    contraida = bytearray(n)
+    heap = [(len(adyacentes[v]), v) for v in range(n)]
+    heapq.heapify(heap)
+    while heap:
+        grado, v = heapq.heappop(heap)
+        if contraida[v] or grado != len(adyacentes[v]):
+            continue  # Entrada vieja del heap
+        contraida[v] = 1
+        orden.append(v)
+        for u in adyacentes[v]:
+            adyacentes[u] |= adyacentes[v]
+            adyacentes[u] -= {u, v}
+            heapq.heappush(heap, (len(adyacentes[u]), u))
+    return orden
+
+
+class JerarquiaContraccion:
+    """
+    Jerarquía de contracción en tres fases:
+    1. Preprocesamiento (independiente de los pesos): se ordenan las estaciones por grado mínimo y se
+       "contraen" en ese orden; los vecinos restantes de cada estación contraída quedan conectados
+       entre sí mediante atajos.
+    2. Personalización: se asignan los pesos actuales a las rutas y se calculan los de los atajos
+       recorriendo los triángulos de abajo hacia arriba. Puede repetirse tras cambios de peso
+       (p. ej. aplicar_congestion_por_hora) sin rehacer el orden ni los atajos.
+    3. Consulta: búsqueda bidireccional que solo sube en la jerarquía, seguida del desempaquetado
+       de atajos para recuperar el camino de estaciones.
+    Cada arco une una estación 'v' con una vecina 'u' de mayor rango y guarda dos pesos:
+    subida (v -> u) y bajada (u -> v), junto con la estación intermedia de cada uno si es atajo.
+    """
+
+    def __init__(self, grafo: Grafo):
+        """
+        Construye la jerarquía para la topología del grafo y la personaliza con sus pesos actuales.
+        """
+        csr = grafo.a_csr()
+        self.nombres = csr.nombres
+        self.indice = csr.indice
+        self.estaciones = grafo.obtener_estaciones()
+        n = csr.num_estaciones()
+        # Vecindad no dirigida (la jerarquía es la misma para ambos sentidos)
+        adyacentes = [set() for _ in range(n)]
+        for u in range(n):
+            for e in range(csr.offsets[u], csr.offsets[u + 1]):
+                v = csr.destinos[e]
+                if u != v:
+                    adyacentes[u].add(v)
+                    adyacentes[v].add(u)
+        orden = _orden_grado_minimo(adyacentes)
+        # Contracción en ese orden: los vecinos restantes de cada estación quedan
+        # conectados entre sí (atajos) y pasan a ser sus vecinas superiores
+        superiores = [None] * n
+        for v in orden:
+            vecinos = adyacentes[v]
+            superiores[v] = vecinos
+            for u in vecinos:
+                adyacentes[u] |= vecinos
+                adyacentes[u] -= {u, v}
+        self.orden = orden
+        self.rango = array("q", [0]) * n
+        for posicion, v in enumerate(orden):
+            self.rango[v] = posicion
+        # Arcos hacia arriba en formato CSR, ordenados por rango del extremo superior
+        self.offsets = array("q", [0])
+        self.superiores = array("q")
+        self.inferiores = array("q")
+        self.arco = {}
+        for v in range(n):
+            for u in sorted(superiores[v], key=self.rango.__getitem__):
+                self.arco[(v, u)] = len(self.superiores)
+                self.superiores.append(u)
+                self.inferiores.append(v)
+            self.offsets.append(len(self.superiores))
+        self.personalizar(grafo)
+
+    def num_atajos(self) -> int:
+        """
+        Devuelve la cantidad de arcos de la jerarquía que no son rutas del grafo original.
+        """
+        return sum(1 for a in range(len(self.superiores)) if self.medio_subida[a] != -1 or self.medio_bajada[a] != -1)
+
+    def personalizar(self, grafo: Grafo):
+        """
+        Recalcula los pesos de todos los arcos con los pesos actuales del grafo, sin cambiar el orden.
+        El grafo debe tener las mismas estaciones y no rutas nuevas entre estaciones antes no vecinas.
+        """
+        csr = grafo.a_csr()
+        m = len(self.superiores)
+        inf = float("inf")
+        subida = array("d", [inf]) * m
+        bajada = array("d", [inf]) * m
+        medio_subida = array("q", [-1]) * m
+        medio_bajada = array("q", [-1]) * m
+        rango, arco = self.rango, self.arco
+        for x in range(csr.num_estaciones()):
+            u = self.indice[csr.nombres[x]]
+            for e in range(csr.offsets[x], csr.offsets[x + 1]):
+                v = self.indice[csr.nombres[csr.destinos[e]]]
+                if u == v:
+                    continue
+                peso = csr.pesos[e]
+                if rango[u] < rango[v]:
+                    a = arco.get((u, v))
+                    if a is None:
+                        raise Exception("El grafo tiene rutas que no existen en la jerarquía; hay que reconstruirla")
+                    subida[a] = min(subida[a], peso)
+                else:
+                    a = arco.get((v, u))
+                    if a is None:
+                        raise Exception("El grafo tiene rutas que no existen en la jerarquía; hay que reconstruirla")
+                    bajada[a] = min(bajada[a], peso)
+        # Triángulos inferiores: para cada estación v (de menor a mayor rango) y cada par u, w de
+        # vecinas superiores, el camino u -> v -> w puede mejorar el arco entre u y w
+        offsets, superiores = self.offsets, self.superiores
+        for v in self.orden:
+            for i in range(offsets[v], offsets[v + 1]):
+                u = superiores[i]
+                for j in range(i + 1, offsets[v + 1]):
+                    w = superiores[j]  # rango[u] < rango[w]
+                    a = arco[(u, w)]
+                    por_v = bajada[i] + subida[j]  # u -> v -> w
+                    if por_v < subida[a]:
+                        subida[a] = por_v
+                        medio_subida[a] = v
+                    por_v = bajada[j] + subida[i]  # w -> v -> u
+                    if por_v < bajada[a]:
+                        bajada[a] = por_v
+                        medio_bajada[a] = v
+        # Un arco v -> w no hace falta en las búsquedas ascendentes si existe una vecina u entre ambos
+        # (rango[v] < rango[u] < rango[w]) tal que v -> u -> w no es más largo; lo mismo para bajada
+        util_subida = bytearray(b"\x01") * m
+        util_bajada = bytearray(b"\x01") * m
+        for v in self.orden:
+            for i in range(offsets[v], offsets[v + 1]):
+                u = superiores[i]
+                for j in range(i + 1, offsets[v + 1]):
+                    a = arco[(u, superiores[j])]
+                    if subida[i] + subida[a] <= subida[j]:
+                        util_subida[j] = 0
+                    if bajada[a] + bajada[i] <= bajada[j]:
+                        util_bajada[j] = 0
+        for a in range(m):
+            if subida[a] == inf:
+                util_subida[a] = 0
+            if bajada[a] == inf:
+                util_bajada[a] = 0
+        self.subida, self.bajada = subida, bajada
+        self.medio_subida, self.medio_bajada = medio_subida, medio_bajada
+        self.util_subida, self.util_bajada = util_subida, util_bajada
+
+    def _busqueda_bidireccional(self, s: int, t: int):
+        """
+        Búsqueda ascendente desde 's' (pesos de subida) y desde 't' (pesos de bajada), alternando lados.
+        Cada lado se detiene cuando su mínimo pendiente ya no puede mejorar el mejor encuentro.
+        Devuelve (mejor, encuentro, padres) con padres[lado][v] = arco por el que se llegó a v.
+        """
+        offsets, superiores = self.offsets, self.superiores
+        pesos = (self.subida, self.bajada)
+        utiles = (self.util_subida, self.util_bajada)
+        distances = ({s: 0}, {t: 0})
+        padres = ({s: -1}, {t: -1})
+        heaps = ([(0, s)], [(0, t)])
+        mejor, encuentro = (0, s) if s == t else (float("inf"), -1)
+        while heaps[0] or heaps[1]:
+            for lado in (0, 1):
+                heap = heaps[lado]
+                if not heap:
+                    continue
+                distancia, v = heapq.heappop(heap)
+                if distancia >= mejor:
+                    heap.clear()  # Este lado ya no puede mejorar el resultado
+                    continue
+                dist, otra, padre, peso, util = distances[lado], distances[1 - lado], padres[lado], pesos[lado], utiles[lado]
+                if distancia > dist[v]:
+                    continue  # Entrada vieja del heap
+                if v in otra and distancia + otra[v] < mejor:
+                    mejor, encuentro = distancia + otra[v], v
+                for a in range(offsets[v], offsets[v + 1]):
+                    if not util[a]:
+                        continue
+                    u = superiores[a]
+                    tentativa = distancia + peso[a]
+                    if tentativa < dist.get(u, float("inf")):
+                        dist[u] = tentativa
+                        padre[u] = a
+                        heapq.heappush(heap, (tentativa, u))
+        return mejor, encuentro, padres
+
+    def _desempaquetar(self, v: int, u: int, sube: bool, camino: list):
+        """
+        Agrega a 'camino' las estaciones originales del arco entre v (inferior) y u (superior),
+        en sentido v -> u si 'sube' y u -> v si no, sin incluir la estación inicial.
+        """
+        pila = [(v, u, sube)]
+        while pila:
+            v, u, sube = pila.pop()
+            a = self.arco[(v, u)]
+            medio = self.medio_subida[a] if sube else self.medio_bajada[a]
+            if medio == -1:
+                camino.append(u if sube else v)
+            elif sube:
+                # v -> medio (bajada del arco medio-v) y luego medio -> u (subida del arco medio-u)
+                pila.append((medio, u, True))
+                pila.append((medio, v, False))
+            else:
+                # u -> medio (bajada del arco medio-u) y luego medio -> v (subida del arco medio-v)
+                pila.append((medio, v, True))
+                pila.append((medio, u, False))
+
+    def camino_corto(self, inicio: Estacion, destino: Estacion):
+        """
+        Calcula la ruta más corta entre dos estaciones con la jerarquía.
+        Devuelve una tupla (camino, tiempo_total) con el mismo formato que dijkstra.camino_corto.
+        """
+        s, t = self.indice[inicio.nombre], self.indice[destino.nombre]
+        mejor, encuentro, (padre_adelante, padre_atras) = self._busqueda_bidireccional(s, t)
+        if encuentro == -1:
+            return None, float("inf")  # No hay camino
+        # Tramo ascendente s -> encuentro
+        subidas = []
+        v = encuentro
+        while padre_adelante[v] != -1:
+            inferior = self.inferiores[padre_adelante[v]]
+            subidas.append((inferior, v))
+            v = inferior
+        camino = [s]
+        for inferior, superior in reversed(subidas):
+            self._desempaquetar(inferior, superior, True, camino)
+        # Tramo descendente encuentro -> t
+        v = encuentro
+        while padre_atras[v] != -1:
+            inferior = self.inferiores[padre_atras[v]]
+            self._desempaquetar(inferior, v, False, camino)
+            v = inferior
+        return [self.estaciones[i] for i in camino], mejor
@@ -4,47 +4,503 @@ Módulo que implementa el algoritmo de Dijkstra para la red de transporte urbano
 
 from src.model.estacion import Estacion
 from src.model.grafo import Grafo
+from src.model.grafo_csr import GrafoCSR, entero_si_exacto
+from array import array
+from collections import OrderedDict
 import heapq
+import threading
 
+# Tablas de landmarks de las últimas versiones consultadas con modo="alt" sin tabla explícita
+LANDMARKS_EN_CACHE = 4
+_landmarks_por_version = OrderedDict()  # versión del grafo -> TablaLandmarks
+_landmarks_lock = threading.Lock()
 
-def camino_corto(grafo: Grafo, inicio: Estacion, destino: Estacion):
+
+def camino_corto(grafo: Grafo, inicio: Estacion, destino: Estacion, modo: str = "dijkstra", landmarks=None):
     """
     Calcula la ruta más corta entre dos estaciones usando Dijkstra.
     Devuelve una tupla (camino, tiempo_total).
     - camino: lista de estaciones desde inicio hasta destino (incluidos).
-    - tiempo_total: suma de los pesos de la ruta óptima.
+    - tiempo_total: suma de los pesos de la ruta óptima (int si es exacta, como al sumar pesos enteros).
     Si no hay camino, retorna (None, float('inf')).
+    Se consulta la instantánea CSR de la versión actual del grafo (asignar ruta.peso crea una versión nueva).
+
+    El parámetro 'modo' selecciona el motor de consulta (todos devuelven el mismo tiempo_total):
+    - "dijkstra": Dijkstra unidireccional con corte temprano sobre la instantánea CSR
+      (núcleo con buffers reutilizables, ver BuscadorCaminos).
+    - "bidireccional": Dijkstra desde ambos extremos sobre la instantánea CSR y su inversa.
+    - "alt": A* con cotas inferiores de landmarks; 'landmarks' es una TablaLandmarks de la
+      versión actual del grafo (si no se pasa, se usa landmarks_de(grafo), que la calcula una sola
+      vez por versión).
+    """
+    if modo == "bidireccional":
+        csr = grafo.a_csr()
+        ids, tiempo = camino_corto_bidireccional_csr(csr, csr.id_de(inicio.nombre), csr.id_de(destino.nombre))
+        return _ids_a_estaciones(grafo, csr, ids), entero_si_exacto(tiempo)
+    if modo == "alt":
+        csr = grafo.a_csr()
+        if landmarks is None:
+            landmarks = landmarks_de(grafo)
+        elif landmarks.csr is not csr:
+            raise Exception("La tabla de landmarks no corresponde a la versión actual del grafo")
+        ids, tiempo = camino_corto_alt_csr(landmarks, csr.id_de(inicio.nombre), csr.id_de(destino.nombre))
+        return _ids_a_estaciones(grafo, csr, ids), entero_si_exacto(tiempo)
+    if modo != "dijkstra":
+        raise Exception(f"Modo de consulta desconocido: {modo}")
+    csr = grafo.a_csr()
+    ids, tiempo = camino_corto_csr(csr, csr.id_de(inicio.nombre), csr.id_de(destino.nombre))
+    return _ids_a_estaciones(grafo, csr, ids), entero_si_exacto(tiempo)
+
+
+def arbol_caminos_csr(csr: GrafoCSR, inicio: int):
+    """
+    Dijkstra completo (sin corte temprano) desde 'inicio' sobre una instantánea GrafoCSR.
+    Devuelve una tupla (distances, anterior) de listas indexadas por id;
+    anterior[v] es -1 para el origen y para las estaciones inalcanzables.
     """
-    # Inicialización de distancias y predecesores
-    distances = {node: float("inf") for node in grafo.obtener_estaciones()}
-    anterior = {node: None for node in grafo.obtener_estaciones()}
+    n = csr.num_estaciones()
+    offsets, destinos, pesos, rango = csr.offsets, csr.destinos, csr.pesos, csr.rango
+    distances = [float("inf")] * n
+    anterior = [-1] * n
+    visitados = bytearray(n)
     distances[inicio] = 0
-    visitados = set()
-    # El heap ahora incluye el nombre como "tie-breaker"
-    heap = [(0, inicio.nombre, inicio)]
+    heap = [(0, rango[inicio], inicio)]
 
     while heap:
-        distancia_actual, _, current = heapq.heappop(heap)
-        if current in visitados:
+        _, _, current = heapq.heappop(heap)
+        if visitados[current]:
+            continue
+        visitados[current] = 1
+        base = distances[current]
+        for e in range(offsets[current], offsets[current + 1]):
+            nodo_vecino = destinos[e]
+            tentativa = base + pesos[e]
+            if tentativa < distances[nodo_vecino]:
+                distances[nodo_vecino] = tentativa
+                anterior[nodo_vecino] = current
+                heapq.heappush(heap, (tentativa, rango[nodo_vecino], nodo_vecino))
+    return distances, anterior
+
+
+class BuscadorCaminos:
+    """
+    Núcleo de Dijkstra punto a punto con buffers preasignados que se reutilizan entre consultas.
+    - distances y anterior tienen una entrada por estación y no se reinician en cada consulta:
+      cada consulta usa una generación nueva, y marca[v] / cerrado[v] dicen en qué generación se
+      tocó / cerró v. Una entrada de otra generación vale como "infinito, sin visitar".
+    - Así, una consulta cuesta lo que recorre (un viaje corto en una red grande no paga O(V)).
+    - El heap guarda (distancia, rango, id): los empates se resuelven comparando enteros.
+    Un buscador no es seguro entre hilos; camino_corto_csr usa uno por hilo.
+    """
+
+    def __init__(self, n: int):
+        """
+        Inicializa los buffers para redes de hasta n estaciones.
+        """
+        self.distances = [0.0] * n
+        self.anterior = [-1] * n
+        self.marca = [0] * n
+        self.cerrado = [0] * n
+        self.generacion = 0
+
+    def camino_corto(self, csr: GrafoCSR, inicio: int, destino: int):
+        """
+        Dijkstra con corte temprano en 'destino'. Devuelve (camino como lista de ids, tiempo_total),
+        o (None, float('inf')) si no hay camino.
+        """
+        if csr.num_estaciones() > len(self.distances):
+            raise Exception("La red tiene más estaciones que los buffers del buscador")
+        self.generacion += 1
+        generacion = self.generacion
+        offsets, destinos, pesos, rango = csr.offsets, csr.destinos, csr.pesos, csr.rango
+        distances, anterior, marca, cerrado = self.distances, self.anterior, self.marca, self.cerrado
+        distances[inicio] = 0
+        anterior[inicio] = -1
+        marca[inicio] = generacion
+        heap = [(0, rango[inicio], inicio)]
+        heappop, heappush = heapq.heappop, heapq.heappush
+
+        while heap:
+            base, _, current = heappop(heap)
+            if cerrado[current] == generacion:
+                continue
+            cerrado[current] = generacion
+            if current == destino:
+                break
+            for e in range(offsets[current], offsets[current + 1]):
+                nodo_vecino = destinos[e]
+                tentativa = base + pesos[e]
+                if marca[nodo_vecino] != generacion or tentativa < distances[nodo_vecino]:
+                    marca[nodo_vecino] = generacion
+                    distances[nodo_vecino] = tentativa
+                    anterior[nodo_vecino] = current
+                    heappush(heap, (tentativa, rango[nodo_vecino], nodo_vecino))
+
+        if cerrado[destino] != generacion:
+            return None, float("inf")  # No hay camino
+        # Reconstruir el camino óptimo
+        camino = []
+        actual = destino
+        while actual != -1:
+            camino.append(actual)
+            actual = anterior[actual]
+        camino.reverse()
+        return camino, distances[destino]
+
+    def alcanzables(self, csr: GrafoCSR, inicios, limite: float):
+        """
+        Dijkstra acotado desde varios orígenes a la vez (todos con tiempo 0): se detiene al superar
+        'limite', así que recorre solo la región alcanzable. Devuelve la lista de pares
+        (id, tiempo) de las estaciones alcanzadas en a lo sumo 'limite', en orden de tiempo.
+        """
+        if csr.num_estaciones() > len(self.distances):
+            raise Exception("La red tiene más estaciones que los buffers del buscador")
+        self.generacion += 1
+        generacion = self.generacion
+        offsets, destinos, pesos, rango = csr.offsets, csr.destinos, csr.pesos, csr.rango
+        distances, marca, cerrado = self.distances, self.marca, self.cerrado
+        heap = []
+        for inicio in inicios:
+            if marca[inicio] != generacion:
+                marca[inicio] = generacion
+                distances[inicio] = 0
+                heap.append((0, rango[inicio], inicio))
+        heapq.heapify(heap)
+        heappop, heappush = heapq.heappop, heapq.heappush
+        alcanzadas = []
+        while heap:
+            base, _, current = heappop(heap)
+            if base > limite:
+                break
+            if cerrado[current] == generacion:
+                continue
+            cerrado[current] = generacion
+            alcanzadas.append((current, base))
+            for e in range(offsets[current], offsets[current + 1]):
+                nodo_vecino = destinos[e]
+                tentativa = base + pesos[e]
+                if tentativa <= limite and (marca[nodo_vecino] != generacion or tentativa < distances[nodo_vecino]):
+                    marca[nodo_vecino] = generacion
+                    distances[nodo_vecino] = tentativa
+                    heappush(heap, (tentativa, rango[nodo_vecino], nodo_vecino))
+        return alcanzadas
+
+
+# Un buscador por hilo: sus buffers se reutilizan en todas las consultas de ese hilo
+_buscadores = threading.local()
+
+
+def buscador_del_hilo(n: int) -> BuscadorCaminos:
+    """
+    Devuelve el BuscadorCaminos del hilo actual con buffers para al menos n estaciones.
+    """
+    buscador = getattr(_buscadores, "buscador", None)
+    if buscador is None or len(buscador.distances) < n:
+        buscador = BuscadorCaminos(n)
+        _buscadores.buscador = buscador
+    return buscador
+
+
+def camino_corto_csr(csr: GrafoCSR, inicio: int, destino: int):
+    """
+    Dijkstra sobre una instantánea GrafoCSR usando ids enteros.
+    Devuelve una tupla (camino, tiempo_total) con el camino como lista de ids.
+    Desempata por nombre (vía csr.rango), igual que el resto de los motores de consulta.
+    Si no hay camino, retorna (None, float('inf')).
+    Usa el BuscadorCaminos del hilo actual (se agranda si la red tiene más estaciones).
+    """
+    return buscador_del_hilo(csr.num_estaciones()).camino_corto(csr, inicio, destino)
+
+
+def _ids_a_estaciones(grafo: Grafo, csr: GrafoCSR, ids):
+    """
+    Convierte un camino de ids de la instantánea en la lista de Estacion del grafo.
+    """
+    if ids is None:
+        return None
+    return [grafo.encontrar_estacion(csr.nombres[i]) for i in ids]
+
+
+def camino_corto_bidireccional_csr(csr: GrafoCSR, inicio: int, destino: int):
+    """
+    Dijkstra bidireccional: avanza alternadamente desde 'inicio' sobre la instantánea y desde
+    'destino' sobre su inversa, y se detiene cuando la suma de los mínimos de ambos heaps
+    ya no puede mejorar el mejor camino encontrado.
+    Devuelve una tupla (camino, tiempo_total) con el camino como lista de ids.
+    """
+    if inicio == destino:
+        return [inicio], 0
+    lados = (csr, csr.inversa())
+    n = csr.num_estaciones()
+    distances = ([float("inf")] * n, [float("inf")] * n)
+    anterior = ([-1] * n, [-1] * n)
+    visitados = (bytearray(n), bytearray(n))
+    distances[0][inicio] = 0
+    distances[1][destino] = 0
+    heaps = ([(0, inicio)], [(0, destino)])
+    mejor, encuentro = float("inf"), -1
+
+    while heaps[0] and heaps[1]:
+        if heaps[0][0][0] + heaps[1][0][0] >= mejor:
+            break
+        # Se expande el lado con menos candidatos pendientes
+        lado = 0 if len(heaps[0]) <= len(heaps[1]) else 1
+        g, dist, prev, vis, otra = lados[lado], distances[lado], anterior[lado], visitados[lado], distances[1 - lado]
+        distancia_actual, current = heapq.heappop(heaps[lado])
+        if vis[current]:
             continue
-        visitados.add(current)
+        vis[current] = 1
+        for e in range(g.offsets[current], g.offsets[current + 1]):
+            nodo_vecino = g.destinos[e]
+            tentativa = distancia_actual + g.pesos[e]
+            if tentativa < dist[nodo_vecino]:
+                dist[nodo_vecino] = tentativa
+                prev[nodo_vecino] = current
+                heapq.heappush(heaps[lado], (tentativa, nodo_vecino))
+            if tentativa + otra[nodo_vecino] < mejor:
+                mejor, encuentro = tentativa + otra[nodo_vecino], nodo_vecino
+
+    if encuentro == -1:
+        return None, float("inf")  # No hay camino
+    # Mitad hacia adelante (inicio -> encuentro) y mitad hacia atrás (encuentro -> destino)
+    camino = []
+    actual = encuentro
+    while actual != -1:
+        camino.append(actual)
+        actual = anterior[0][actual]
+    camino.reverse()
+    actual = anterior[1][encuentro]
+    while actual != -1:
+        camino.append(actual)
+        actual = anterior[1][actual]
+    return camino, mejor
+
+
+class TablaLandmarks:
+    """
+    Tabla de distancias precalculadas desde y hacia un conjunto de estaciones "landmark".
+    Por la desigualdad triangular, para cualquier landmark L:
+        d(v, t) >= d(L, t) - d(L, v)   y   d(v, t) >= d(v, L) - d(t, L)
+    lo que da cotas inferiores admisibles y consistentes para A* (ALT).
+    """
+
+    def __init__(self, csr: GrafoCSR, landmarks, desde, hacia):
+        """
+        Inicializa la tabla con la instantánea, los ids de los landmarks y sus distancias
+        desde cada landmark ('desde') y hacia cada landmark ('hacia').
+        """
+        self.csr = csr
+        self.landmarks = landmarks
+        self.desde = desde
+        self.hacia = hacia
+
+    def cota(self, v: int, t: int) -> float:
+        """
+        Devuelve una cota inferior de d(v, t); inf si se puede asegurar que no hay camino.
+        """
+        cota = 0.0
+        for desde, hacia in zip(self.desde, self.hacia):
+            # Las diferencias inf - inf no dan información y se descartan
+            if desde[t] != desde[v]:
+                cota = max(cota, desde[t] - desde[v])
+            if hacia[v] != hacia[t]:
+                cota = max(cota, hacia[v] - hacia[t])
+        return cota
+
+
+def calcular_landmarks(grafo, cantidad: int = 8) -> TablaLandmarks:
+    """
+    Elige landmarks por el criterio del más lejano (cada uno es la estación más alejada de los ya elegidos)
+    y precalcula sus distancias con un Dijkstra completo en cada sentido.
+    Acepta un Grafo o una instantánea GrafoCSR.
+    """
+    csr = grafo if isinstance(grafo, GrafoCSR) else grafo.a_csr()
+    n = csr.num_estaciones()
+    inversa = csr.inversa()
+    landmarks, desde, hacia = [], [], []
+    cercania = [float("inf")] * n  # Distancia de cada estación al landmark más cercano ya elegido
+    siguiente = 0
+    while n and len(landmarks) < min(cantidad, n):
+        landmarks.append(siguiente)
+        ida, _ = arbol_caminos_csr(csr, siguiente)
+        vuelta, _ = arbol_caminos_csr(inversa, siguiente)
+        desde.append(array("d", ida))
+        hacia.append(array("d", vuelta))
+        for v in range(n):
+            cercania[v] = min(cercania[v], ida[v] + vuelta[v])
+        # Las estaciones no conectadas con ningún landmark se prefieren como próximo landmark
+        siguiente = max(range(n), key=lambda v: (cercania[v] if v not in landmarks else -1.0))
+        if siguiente in landmarks:
+            break
+    return TablaLandmarks(csr, landmarks, desde, hacia)
+
+
+def landmarks_de(grafo) -> TablaLandmarks:
+    """
+    Devuelve la TablaLandmarks de la versión actual del grafo (Grafo o InstantaneaRed). Se calcula
+    la primera vez que se pide para esa versión y se guarda para las últimas LANDMARKS_EN_CACHE
+    versiones, así que las consultas ALT repetidas no vuelven a precalcularla.
+    """
+    csr = grafo.a_csr()
+    with _landmarks_lock:
+        tabla = _landmarks_por_version.get(grafo.version)
+        if tabla is not None and tabla.csr is csr:
+            _landmarks_por_version.move_to_end(grafo.version)
+            return tabla
+    # El cálculo se hace fuera del lock; si dos hilos lo hacen a la vez, queda uno de los dos
+    tabla = calcular_landmarks(csr)
+    with _landmarks_lock:
+        _landmarks_por_version[grafo.version] = tabla
+        _landmarks_por_version.move_to_end(grafo.version)
+        while len(_landmarks_por_version) > LANDMARKS_EN_CACHE:
+            _landmarks_por_version.popitem(last=False)
+    return tabla
+
+
+def camino_corto_alt_csr(tabla: TablaLandmarks, inicio: int, destino: int):
+    """
+    A* sobre la instantánea de la tabla usando las cotas de landmarks como heurística.
+    Devuelve una tupla (camino, tiempo_total) con el camino como lista de ids.
+    """
+    csr = tabla.csr
+    n = csr.num_estaciones()
+    offsets, destinos, pesos = csr.offsets, csr.destinos, csr.pesos
+    distances = [float("inf")] * n
+    anterior = [-1] * n
+    visitados = bytearray(n)
+    cotas = {}
+    distances[inicio] = 0
+    heap = [(tabla.cota(inicio, destino), inicio)]
+
+    while heap:
+        _, current = heapq.heappop(heap)
+        if visitados[current]:
+            continue
+        visitados[current] = 1
         if current == destino:
             break
-        for vecino in grafo.obtener_vecinos(current):
-            peso = vecino.peso
-            nodo_vecino = vecino.dest
-            tentativa = distances[current] + peso
+        base = distances[current]
+        for e in range(offsets[current], offsets[current + 1]):
+            nodo_vecino = destinos[e]
+            tentativa = base + pesos[e]
             if tentativa < distances[nodo_vecino]:
+                h = cotas.get(nodo_vecino)
+                if h is None:
+                    h = cotas[nodo_vecino] = tabla.cota(nodo_vecino, destino)
+                if h == float("inf"):
+                    continue  # Desde este vecino no se puede llegar al destino
                 distances[nodo_vecino] = tentativa
                 anterior[nodo_vecino] = current
-                heapq.heappush(heap, (tentativa, nodo_vecino.nombre, nodo_vecino))
+                heapq.heappush(heap, (tentativa + h, nodo_vecino))
 
-    # Reconstruir el camino óptimo
+    if distances[destino] == float("inf"):
+        return None, float("inf")  # No hay camino
     camino = []
     actual = destino
-    while actual is not None:
-        camino.insert(0, actual)
+    while actual != -1:
+        camino.append(actual)
         actual = anterior[actual]
-    if distances[destino] == float("inf"):
-        return None, float("inf")  # No hay camino
+    camino.reverse()
     return camino, distances[destino]
+
+
+def _filas_lote(csr: GrafoCSR, filas, destinos, con_caminos: bool):
+    """
+    Calcula un árbol completo por origen y devuelve, por cada uno, (fila, tiempos a los destinos, anterior).
+    'filas' es una lista de pares (índice de fila, id de origen).
+    """
+    resultado = []
+    for i, origen in filas:
+        distances, anterior = arbol_caminos_csr(csr, origen)
+        tiempos = array("d", [distances[v] for v in destinos])
+        resultado.append((i, tiempos, array("q", anterior) if con_caminos else None))
+    return resultado
+
+
+def filas_distancias_csr(csr: GrafoCSR, origenes, destinos, con_caminos: bool = False,
+                         procesos: int = 1, origenes_por_tarea: int = 8):
+    """
+    Consulta uno a muchos / muchos a muchos por ids: un solo Dijkstra completo por origen, en lugar
+    de uno por par. Es un generador que produce tuplas (fila, tiempos, anterior) a medida que cada
+    origen termina (con varios procesos, no necesariamente en orden):
+    - fila: posición del origen en 'origenes'.
+    - tiempos: arreglo con el tiempo a cada estación de 'destinos' (inf si no hay camino).
+    - anterior: el árbol del origen (anterior[v] = estación previa) si 'con_caminos', si no None.
+    Con procesos > 1 los orígenes se reparten entre procesos que abren la red como instantánea
+    binaria con mmap (src/model/snapshot.py), sin copiarla a cada tarea.
+    """
+    destinos = list(destinos)
+    filas = list(enumerate(origenes))
+    if procesos == 1:
+        for i, origen in filas:
+            yield _filas_lote(csr, [(i, origen)], destinos, con_caminos)[0]
+        return
+    from concurrent.futures import as_completed
+    from src.services.trabajadores import pool_de_red
+
+    tareas = [filas[i:i + origenes_por_tarea] for i in range(0, len(filas), origenes_por_tarea)]
+    with pool_de_red(csr, procesos) as enviar:
+        futuros = [enviar(_filas_lote, tarea, destinos, con_caminos) for tarea in tareas]
+        for futuro in as_completed(futuros):
+            yield from futuro.result()
+
+
+class ResultadoLote:
+    """
+    Resultado de una consulta por lotes: matriz densa de tiempos y, opcionalmente, los árboles de
+    cada origen para reconstruir caminos solo cuando se piden.
+    - tiempos[i][j]: tiempo de origenes[i] a destinos[j] (numpy, inf si no hay camino).
+    """
+
+    def __init__(self, csr: GrafoCSR, estaciones, origenes, destinos, tiempos, anteriores):
+        """
+        Inicializa el resultado con la instantánea usada, las Estacion por id, los ids consultados,
+        la matriz de tiempos y los árboles por fila (o None si no se pidieron caminos).
+        """
+        self.csr = csr
+        self.estaciones = estaciones
+        self.origenes = origenes
+        self.destinos = destinos
+        self.tiempos = tiempos
+        self.anteriores = anteriores
+
+    def tiempo(self, i: int, j: int) -> float:
+        """
+        Devuelve el tiempo de origenes[i] a destinos[j].
+        """
+        return float(self.tiempos[i, j])
+
+    def camino(self, i: int, j: int):
+        """
+        Reconstruye el camino de origenes[i] a destinos[j] como lista de Estacion, o None si no hay.
+        """
+        if self.anteriores is None:
+            raise Exception("La consulta se hizo sin caminos (con_caminos=False)")
+        if self.tiempos[i, j] == float("inf"):
+            return None
+        anterior = self.anteriores[i]
+        camino = [self.destinos[j]]
+        while anterior[camino[-1]] != -1:
+            camino.append(anterior[camino[-1]])
+        camino.reverse()
+        return [self.estaciones[v] for v in camino]
+
+
+def camino_corto_lote(grafo: Grafo, inicios, destinos, con_caminos: bool = False, procesos: int = 1) -> ResultadoLote:
+    """
+    Calcula los tiempos mínimos de cada estación de 'inicios' a cada una de 'destinos' con un
+    Dijkstra por origen (ver filas_distancias_csr). Devuelve un ResultadoLote con la matriz densa
+    len(inicios) x len(destinos); con 'con_caminos' guarda los árboles para pedir caminos después.
+    """
+    import numpy as np
+
+    csr = grafo.a_csr()
+    origenes = [csr.id_de(e.nombre) for e in inicios]
+    ids_destinos = [csr.id_de(e.nombre) for e in destinos]
+    tiempos = np.empty((len(origenes), len(ids_destinos)))
+    anteriores = [None] * len(origenes) if con_caminos else None
+    for i, fila, anterior in filas_distancias_csr(csr, origenes, ids_destinos, con_caminos, procesos):
+        tiempos[i] = fila
+        if con_caminos:
+            anteriores[i] = anterior
+    return ResultadoLote(csr, grafo.obtener_estaciones(), origenes, ids_destinos, tiempos, anteriores)
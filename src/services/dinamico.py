@@ -0,0 +1,189 @@
+"""
+Módulo que implementa la reparación incremental de caminos más cortos ante cambios de peso (SSSP dinámico).
+"""
+
+import heapq
+from array import array
+
+from src.model.estacion import Estacion
+from src.model.grafo import Grafo
+
+
+class CaminosDinamicos:
+    """
+    Mantiene los árboles de caminos más cortos de varios orígenes y los repara tras cambios de peso,
+    en el estilo de Ramalingam–Reps: solo se recalculan los subárboles afectados por los cambios.
+    Trabaja sobre una copia de la topología del grafo (ids enteros); no admite altas ni bajas de
+    estaciones o rutas, para eso hay que construir una instancia nueva.
+    """
+
+    def __init__(self, grafo: Grafo, origenes=()):
+        """
+        Inicializa la estructura a partir del grafo y calcula los árboles de los orígenes dados (por nombre).
+        """
+        csr = grafo.a_csr()
+        self.nombres = csr.nombres
+        self.indice = csr.indice
+        self.offsets = csr.offsets
+        self.destinos = csr.destinos
+        self.pesos = array("d", csr.pesos)  # Copia propia: los pesos cambian con cada lote
+        n, m = csr.num_estaciones(), csr.num_rutas()
+        # Origen de cada ruta y rutas entrantes de cada estación (como índices de ruta)
+        self.origen_ruta = array("q", [0]) * m
+        entrantes = [[] for _ in range(n)]
+        self._rutas_por_par = {}
+        for u in range(n):
+            for e in range(self.offsets[u], self.offsets[u + 1]):
+                v = self.destinos[e]
+                self.origen_ruta[e] = u
+                entrantes[v].append(e)
+                self._rutas_por_par.setdefault((u, v), []).append(e)
+        self.entrantes = entrantes
+        # origen -> [distances, ruta_padre]; ruta_padre[v] es el índice de la ruta del árbol que llega a v
+        self.arboles = {}
+        for nombre in origenes:
+            self.agregar_origen(nombre)
+
+    def agregar_origen(self, nombre: str):
+        """
+        Calcula desde cero el árbol de caminos más cortos del origen dado y lo pasa a mantener.
+        """
+        s = self.indice[nombre]
+        n = len(self.nombres)
+        distances = [float("inf")] * n
+        ruta_padre = [-1] * n
+        distances[s] = 0
+        self._propagar(distances, ruta_padre, [(0, s)])
+        self.arboles[s] = [distances, ruta_padre]
+
+    def _propagar(self, distances, ruta_padre, heap) -> int:
+        """
+        Propaga las mejoras desde las estaciones del heap (Dijkstra con etiquetas ya inicializadas).
+        Retorna la cantidad de estaciones asentadas, como medida del trabajo hecho.
+        """
+        offsets, destinos, pesos = self.offsets, self.destinos, self.pesos
+        heapq.heapify(heap)
+        asentadas = 0
+        while heap:
+            distancia, u = heapq.heappop(heap)
+            if distancia > distances[u]:
+                continue  # Entrada vieja del heap
+            asentadas += 1
+            for e in range(offsets[u], offsets[u + 1]):
+                v = destinos[e]
+                tentativa = distancia + pesos[e]
+                if tentativa < distances[v]:
+                    distances[v] = tentativa
+                    ruta_padre[v] = e
+                    heapq.heappush(heap, (tentativa, v))
+        return asentadas
+
+    def _buscar_ruta(self, origen: str, destino: str, peso_anterior: float) -> int:
+        """
+        Devuelve el índice de la ruta origen -> destino; si hay varias, la que tenía 'peso_anterior'.
+        """
+        rutas = self._rutas_por_par[(self.indice[origen], self.indice[destino])]
+        for e in rutas:
+            if self.pesos[e] == peso_anterior:
+                return e
+        return rutas[0]
+
+    def aplicar_cambios(self, cambios) -> int:
+        """
+        Aplica un lote de cambios de peso y repara todos los árboles mantenidos.
+        'cambios' es una lista de tuplas (origen, destino, peso_anterior, peso_nuevo), como la que
+        retornan simular_congestion y aplicar_congestion_por_hora.
+        Retorna la cantidad total de estaciones reasentadas (trabajo de la reparación).
+        """
+        indices, pesos_nuevos = [], []
+        for origen, destino, peso_anterior, peso_nuevo in cambios:
+            indices.append(self._buscar_ruta(origen, destino, peso_anterior))
+            pesos_nuevos.append(peso_nuevo)
+        return self.aplicar_cambios_por_indice(indices, pesos_nuevos)
+
+    def aplicar_cambios_por_indice(self, indices, pesos_nuevos) -> int:
+        """
+        Igual que aplicar_cambios, con las rutas dadas por su índice en la instantánea CSR del grafo
+        (p. ej. los arreglos que retorna simular_congestion_csr) en lugar de nombres.
+        """
+        aumentos, disminuciones = [], []
+        for e, peso_nuevo in zip(indices, pesos_nuevos):
+            e, peso_nuevo = int(e), float(peso_nuevo)
+            if peso_nuevo > self.pesos[e]:
+                aumentos.append(e)
+            elif peso_nuevo < self.pesos[e]:
+                disminuciones.append(e)
+            self.pesos[e] = peso_nuevo
+        trabajo = 0
+        for distances, ruta_padre in self.arboles.values():
+            trabajo += self._reparar(distances, ruta_padre, aumentos, disminuciones)
+        return trabajo
+
+    def _reparar(self, distances, ruta_padre, aumentos, disminuciones) -> int:
+        """
+        Repara un árbol tras el lote de cambios (los pesos ya están actualizados).
+        1. Las estaciones cuyo camino en el árbol usa una ruta que aumentó quedan afectadas.
+        2. Cada afectada toma la mejor etiqueta ofrecida por sus vecinas entrantes no afectadas.
+        3. Cada ruta que disminuyó ofrece una etiqueta nueva a su destino.
+        4. Se propagan las etiquetas con Dijkstra, limitado a la zona que realmente cambia.
+        """
+        offsets, destinos, pesos, origen_ruta = self.offsets, self.destinos, self.pesos, self.origen_ruta
+        # 1. Subárboles colgados de rutas del árbol que aumentaron
+        afectadas = set()
+        pila = [self.destinos[e] for e in aumentos if ruta_padre[self.destinos[e]] == e]
+        while pila:
+            u = pila.pop()
+            if u in afectadas:
+                continue
+            afectadas.add(u)
+            for e in range(offsets[u], offsets[u + 1]):
+                if ruta_padre[destinos[e]] == e:
+                    pila.append(destinos[e])
+        for v in afectadas:
+            distances[v] = float("inf")
+            ruta_padre[v] = -1
+        heap = []
+        # 2. Mejor etiqueta desde vecinas no afectadas
+        for v in afectadas:
+            for e in self.entrantes[v]:
+                u = origen_ruta[e]
+                if u not in afectadas and distances[u] + pesos[e] < distances[v]:
+                    distances[v] = distances[u] + pesos[e]
+                    ruta_padre[v] = e
+            if distances[v] < float("inf"):
+                heap.append((distances[v], v))
+        # 3. Rutas que ahora son más rápidas
+        for e in disminuciones:
+            u, v = origen_ruta[e], destinos[e]
+            if distances[u] + pesos[e] < distances[v]:
+                distances[v] = distances[u] + pesos[e]
+                ruta_padre[v] = e
+                heap.append((distances[v], v))
+        # 4. Propagación
+        return self._propagar(distances, ruta_padre, heap)
+
+    def distancia(self, origen: str, destino: str) -> float:
+        """
+        Devuelve el tiempo mínimo actual entre dos estaciones; el origen debe estar mantenido.
+        """
+        return self.arboles[self.indice[origen]][0][self.indice[destino]]
+
+    def camino(self, origen: str, destino: str):
+        """
+        Devuelve una tupla (camino, tiempo_total) con el camino como lista de Estacion.
+        Si no hay camino, retorna (None, float('inf')).
+        """
+        distances, ruta_padre = self.arboles[self.indice[origen]]
+        d = self.indice[destino]
+        if distances[d] == float("inf"):
+            return None, float("inf")
+        camino = []
+        actual = d
+        while True:
+            camino.append(Estacion(self.nombres[actual]))
+            e = ruta_padre[actual]
+            if e == -1:
+                break
+            actual = self.origen_ruta[e]
+        camino.reverse()
+        return camino, distances[d]
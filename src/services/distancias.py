@@ -0,0 +1,170 @@
+"""
+Módulo que implementa la matriz de distancias entre todos los pares de estaciones (APSP).
+"""
+
+import numpy as np
+
+from src.model.grafo_csr import GrafoCSR
+from src.services.dijkstra import arbol_caminos_csr
+
+
+class MatrizDistancias:
+    """
+    Tiempos mínimos entre todos los pares de estaciones.
+    d[i][j] es el tiempo de la estación con id i a la de id j (inf si no hay camino);
+    los ids son los de la instantánea GrafoCSR de la que se calculó.
+    """
+
+    def __init__(self, nombres, d):
+        """
+        Inicializa la matriz con la tabla de nombres y el arreglo VxV de distancias.
+        """
+        self.nombres = nombres
+        self.indice = {nombre: i for i, nombre in enumerate(nombres)}
+        self.d = d
+
+    def tiempo(self, origen: str, destino: str) -> float:
+        """
+        Devuelve el tiempo mínimo entre dos estaciones dadas por nombre.
+        """
+        return float(self.d[self.indice[origen], self.indice[destino]])
+
+    def tiempo_promedio(self) -> float:
+        """
+        Devuelve el tiempo promedio entre pares distintos de estaciones conectadas.
+        Retorna inf si no hay ningún par conectado.
+        """
+        n = len(self.nombres)
+        conectados = np.isfinite(self.d)
+        total = int(conectados.sum()) - n  # Se descuenta la diagonal
+        if total <= 0:
+            return float("inf")
+        return float(self.d[conectados].sum() / total)
+
+
+def _floyd_warshall(csr: GrafoCSR):
+    """
+    Floyd–Warshall vectorizado: una actualización VxV de NumPy por estación intermedia.
+    """
+    n = csr.num_estaciones()
+    d = np.full((n, n), np.inf)
+    for u in range(n):
+        for e in range(csr.offsets[u], csr.offsets[u + 1]):
+            v = csr.destinos[e]
+            if csr.pesos[e] < d[u, v]:
+                d[u, v] = csr.pesos[e]
+    np.fill_diagonal(d, 0)
+    for k in range(n):
+        np.minimum(d, d[:, k, None] + d[None, k, :], out=d)
+    return d
+
+
+def _dijkstra_por_origen(csr: GrafoCSR):
+    """
+    Un Dijkstra completo desde cada estación.
+    """
+    n = csr.num_estaciones()
+    d = np.empty((n, n))
+    for origen in range(n):
+        distances, _ = arbol_caminos_csr(csr, origen)
+        d[origen] = distances
+    return d
+
+
+def calcular_matriz_distancias(grafo, metodo: str = "auto") -> MatrizDistancias:
+    """
+    Calcula la matriz de distancias de un Grafo o de una instantánea GrafoCSR.
+    - metodo "dijkstra": un Dijkstra por origen, O(V·E log V); conviene en redes dispersas.
+    - metodo "floyd": Floyd–Warshall vectorizado, O(V³) en NumPy; conviene en redes densas.
+    - metodo "auto": elige "floyd" si hay al menos V²/8 rutas.
+    """
+    csr = grafo if isinstance(grafo, GrafoCSR) else grafo.a_csr()
+    n = csr.num_estaciones()
+    if metodo == "auto":
+        metodo = "floyd" if csr.num_rutas() * 8 >= n * n else "dijkstra"
+    if metodo == "floyd":
+        d = _floyd_warshall(csr)
+    elif metodo == "dijkstra":
+        d = _dijkstra_por_origen(csr)
+    else:
+        raise Exception(f"Método de cálculo desconocido: {metodo}")
+    return MatrizDistancias(csr.nombres, d)
+
+
+def beneficio_conexion(matriz: MatrizDistancias, u: int, v: int, peso: float):
+    """
+    Evalúa, sin modificar el grafo, el efecto de añadir la ruta u -> v con el peso dado.
+    El nuevo tiempo de cada par es min(d[i][j], d[i][u] + peso + d[v][j]).
+    Retorna una tupla (pares_conectados, ahorro):
+    - pares_conectados: pares sin camino que pasarían a estar conectados.
+    - ahorro: suma de minutos ahorrados en los pares que ya estaban conectados.
+    """
+    d = matriz.d
+    # Solo pueden mejorar los orígenes que llegan antes a v pasando por u,
+    # y los destinos a los que se llega antes desde u pasando por v
+    filas = np.flatnonzero(d[:, u] + peso < d[:, v])
+    columnas = np.flatnonzero(peso + d[v, :] < d[u, :])
+    if len(filas) == 0 or len(columnas) == 0:
+        return 0, 0.0
+    # Las filas y columnas elegidas tienen d[i][u] y d[v][j] finitos, así que el nuevo tiempo es finito
+    # y todo par inalcanzable del bloque pasa a estar conectado (se opera en el lugar sobre la copia)
+    ahorro = d[filas][:, columnas]
+    ahorro -= (d[filas, u] + peso)[:, None]
+    ahorro -= d[v, columnas][None, :]
+    inalcanzables = np.isinf(ahorro)
+    pares_conectados = int(np.count_nonzero(inalcanzables))
+    if pares_conectados:
+        ahorro[inalcanzables] = 0
+    np.maximum(ahorro, 0, out=ahorro)
+    return pares_conectados, float(ahorro.sum())
+
+
+def estimar_beneficios(matriz: MatrizDistancias, us, vs, pesos, muestra: int = 64,
+                       elementos_por_lote: int = 4_000_000):
+    """
+    Estima a la vez el beneficio_conexion de muchos candidatos (us, vs y pesos son arreglos alineados,
+    un candidato u -> v con su peso por posición) midiendo solo los pares entre 'muestra' estaciones
+    fijas (elegidas con semilla); si la red tiene a lo sumo 'muestra' estaciones, se usan todas y el
+    resultado es exacto. Cada candidato cuesta O(muestra²) en NumPy, en lugar de O(V²).
+    Devuelve dos arreglos (pares_conectados, ahorro) medidos sobre los pares de la muestra: sirven
+    para ordenar candidatos, no están escalados a toda la red.
+    """
+    d = matriz.d
+    n = d.shape[0]
+    if n <= muestra:
+        estaciones = np.arange(n)
+    else:
+        estaciones = np.sort(np.random.default_rng(0).choice(n, size=muestra, replace=False))
+    s = len(estaciones)
+    entre = d[np.ix_(estaciones, estaciones)]
+    sin_camino = np.isinf(entre)
+    hacia = np.ascontiguousarray(d[estaciones].T)  # hacia[u] = d[i][u] para las i de la muestra
+    desde = d[:, estaciones]  # desde[v] = d[v][j] para las j de la muestra
+    us, vs = np.asarray(us, dtype=np.int64), np.asarray(vs, dtype=np.int64)
+    pesos = np.asarray(pesos, dtype=np.float64)
+    conectados = np.zeros(len(us), dtype=np.int64)
+    ahorro = np.zeros(len(us))
+    tamano = max(1, elementos_por_lote // max(s * s, 1))
+    with np.errstate(invalid="ignore"):
+        for inicio in range(0, len(us), tamano):
+            lote = slice(inicio, inicio + tamano)
+            # nuevo[c, i, j] = d[i][u] + peso + d[v][j] para el candidato c
+            nuevo = (hacia[us[lote]] + pesos[lote, None])[:, :, None] + desde[vs[lote]][:, None, :]
+            mejora = nuevo < entre
+            conectados[lote] = (mejora & sin_camino).sum(axis=(1, 2))
+            ahorro[lote] = np.subtract(entre, nuevo, out=np.zeros_like(nuevo), where=mejora & ~sin_camino).sum(axis=(1, 2))
+    return conectados, ahorro
+
+
+def aplicar_conexion(matriz: MatrizDistancias, u: int, v: int, peso: float):
+    """
+    Actualiza la matriz en sitio como si se añadiera la ruta u -> v con el peso dado.
+    Es una actualización incremental O(V²) que evita recalcular todos los pares.
+    """
+    d = matriz.d
+    filas = np.flatnonzero(d[:, u] + peso < d[:, v])
+    columnas = np.flatnonzero(peso + d[v, :] < d[u, :])
+    if len(filas) == 0 or len(columnas) == 0:
+        return
+    bloque = np.ix_(filas, columnas)
+    d[bloque] = np.minimum(d[bloque], d[filas, u][:, None] + peso + d[v, columnas][None, :])
@@ -0,0 +1,121 @@
+"""
+Módulo que implementa la simulación Monte Carlo de escenarios de congestión en paralelo.
+"""
+
+import os
+from concurrent.futures import as_completed
+
+import numpy as np
+
+from src.model.grafo_csr import GrafoCSR
+from src.model.snapshot import abrir_snapshot
+from src.services.actualizacion import simular_congestion_pesos
+from src.services.dijkstra import arbol_caminos_csr
+from src.services.trabajadores import pool_de_red
+
+
+def _simular_lote(csr: GrafoCSR, escenarios, semilla: int, pares, parametros):
+    """
+    Simula los escenarios dados sobre la instantánea base y mide el tiempo de cada par.
+    El generador de cada escenario depende solo de (semilla, número de escenario), así que el
+    resultado no cambia con la cantidad de procesos ni con el reparto de escenarios.
+    Devuelve (escenarios, arreglo len(escenarios) x len(pares) de tiempos, inf si no hay camino).
+    """
+    factor_min, factor_max, porcentaje = parametros
+    por_origen = {}
+    for j, (u, v) in enumerate(pares):
+        por_origen.setdefault(u, []).append((j, v))
+    tiempos = np.empty((len(escenarios), len(pares)))
+    for fila, escenario in enumerate(escenarios):
+        generador = np.random.default_rng([semilla, escenario])
+        pesos, _, _, _ = simular_congestion_pesos(csr.pesos, generador, factor_min, factor_max, porcentaje)
+        congestionado = csr.con_pesos(memoryview(pesos))
+        for u, destinos in por_origen.items():
+            distances, _ = arbol_caminos_csr(congestionado, u)
+            for j, v in destinos:
+                tiempos[fila, j] = distances[v]
+    return escenarios, tiempos
+
+
+class ResultadosMonteCarlo:
+    """
+    Tiempos de viaje de cada par origen-destino en los escenarios simulados hasta el momento.
+    tiempos[i][j] es el tiempo del par j en el escenario i (NaN si el escenario aún no terminó).
+    """
+
+    def __init__(self, pares, n_escenarios: int):
+        """
+        Inicializa los resultados vacíos para los pares (nombres) y la cantidad de escenarios.
+        """
+        self.pares = pares
+        self.tiempos = np.full((n_escenarios, len(pares)), np.nan)
+        self.completados = 0
+
+    def agregar(self, escenarios, tiempos):
+        """
+        Incorpora los tiempos de un lote de escenarios terminados.
+        """
+        self.tiempos[list(escenarios)] = tiempos
+        self.completados += len(escenarios)
+
+    def resumen(self) -> dict:
+        """
+        Devuelve un diccionario (origen, destino) -> estadísticas de los escenarios terminados:
+        media (de los escenarios con camino), p50, p95, p99, sin_camino y escenarios.
+        Los percentiles toman valores observados, así que son inf si más de ese porcentaje de
+        escenarios dejó al par sin camino.
+        """
+        terminados = self.tiempos[~np.isnan(self.tiempos).any(axis=1)]
+        resumen = {}
+        for j, par in enumerate(self.pares):
+            columna = terminados[:, j]
+            finitos = columna[np.isfinite(columna)]
+            if len(columna):
+                p50, p95, p99 = np.quantile(columna, [0.5, 0.95, 0.99], method="inverted_cdf")
+            else:
+                p50 = p95 = p99 = float("nan")
+            resumen[par] = {
+                "media": float(finitos.mean()) if len(finitos) else float("inf"),
+                "p50": float(p50),
+                "p95": float(p95),
+                "p99": float(p99),
+                "sin_camino": int(len(columna) - len(finitos)),
+                "escenarios": int(len(columna)),
+            }
+        return resumen
+
+
+def simular_escenarios(red, pares, n_escenarios: int, semilla: int = 0, factor_min=1.2, factor_max=2.0,
+                       porcentaje=0.3, procesos: int = None, escenarios_por_tarea: int = 16):
+    """
+    Simula 'n_escenarios' sorteos de congestión (simular_congestion_pesos) y mide el camino más corto
+    de cada par (origen, destino) dado por nombres.
+    - 'red' puede ser un Grafo, un GrafoCSR o la ruta de una instantánea binaria (.csr).
+    - Los procesos trabajadores abren la red base como instantánea con mmap: comparten las páginas
+      en memoria y no se envía el grafo serializado a cada tarea. Si 'red' no es un archivo, se
+      escribe una instantánea temporal que se borra al terminar.
+    - procesos=1 simula en el proceso actual; None usa tantos procesos como CPUs.
+    Es un generador: produce el mismo objeto ResultadosMonteCarlo cada vez que termina una tarea,
+    para poder mostrar resultados parciales; el último corresponde a todos los escenarios.
+    """
+    if isinstance(red, (str, os.PathLike)):
+        ruta_snapshot = os.fspath(red)
+        csr = abrir_snapshot(ruta_snapshot)
+    else:
+        csr = red if isinstance(red, GrafoCSR) else red.a_csr()
+        ruta_snapshot = None
+    pares_ids = [(csr.id_de(origen), csr.id_de(destino)) for origen, destino in pares]
+    parametros = (factor_min, factor_max, porcentaje)
+    lotes = [list(range(i, min(i + escenarios_por_tarea, n_escenarios)))
+             for i in range(0, n_escenarios, escenarios_por_tarea)]
+    resultados = ResultadosMonteCarlo(list(pares), n_escenarios)
+    if procesos == 1:
+        for lote in lotes:
+            resultados.agregar(*_simular_lote(csr, lote, semilla, pares_ids, parametros))
+            yield resultados
+        return
+    with pool_de_red(csr, procesos, ruta_snapshot=ruta_snapshot) as enviar:
+        futuros = [enviar(_simular_lote, lote, semilla, pares_ids, parametros) for lote in lotes]
+        for futuro in as_completed(futuros):
+            resultados.agregar(*futuro.result())
+            yield resultados
@@ -0,0 +1,45 @@
+"""
+Módulo que implementa las isócronas: qué estaciones se alcanzan desde una o varias en un tiempo dado.
+"""
+
+from src.model.grafo import Grafo
+from src.model.grafo_csr import GrafoCSR
+from src.services.dijkstra import buscador_del_hilo
+
+
+def isocrona_csr(csr: GrafoCSR, inicios, minutos: float):
+    """
+    Estaciones alcanzables en a lo sumo 'minutos' desde cualquiera de los ids de 'inicios' (una
+    sola pasada de Dijkstra acotado, con los buffers reutilizables del hilo: el costo depende del
+    tamaño de la región alcanzada, no de la red). Devuelve una lista de (id, tiempo) por tiempo.
+    """
+    if minutos < 0:
+        raise Exception("El tiempo de la isócrona no puede ser negativo")
+    return buscador_del_hilo(csr.num_estaciones()).alcanzables(csr, inicios, minutos)
+
+
+def isocrona(grafo: Grafo, inicios, minutos: float) -> dict:
+    """
+    Estaciones alcanzables en a lo sumo 'minutos' desde una estación o desde varias a la vez
+    (p. ej. todas las de una línea: el tiempo es el del origen más cercano).
+    Devuelve un diccionario Estacion -> tiempo, ordenado de menor a mayor tiempo.
+    """
+    if not isinstance(inicios, (list, tuple, set)):
+        inicios = [inicios]
+    csr = grafo.a_csr()
+    alcanzadas = isocrona_csr(csr, [csr.id_de(e.nombre) for e in inicios], minutos)
+    return {grafo.encontrar_estacion(csr.nombres[i]): tiempo for i, tiempo in alcanzadas}
+
+
+def estaciones_de_modo(grafo: Grafo, modo: str):
+    """
+    Devuelve las estaciones que tienen alguna ruta (saliente o entrante) del modo dado, para usarlas
+    como orígenes de una isócrona de toda una línea o modo.
+    """
+    estaciones = {}
+    for estacion in grafo.obtener_estaciones():
+        for ruta in grafo.obtener_vecinos(estacion):
+            if ruta.modo == modo:
+                estaciones[ruta.origen] = None
+                estaciones[ruta.dest] = None
+    return list(estaciones)
@@ -0,0 +1,117 @@
+"""
+Módulo que implementa la búsqueda de los k caminos más rápidos (algoritmo de Yen) en la red de transporte urbano.
+"""
+
+import heapq
+from itertools import count
+
+from src.model.estacion import Estacion
+from src.model.grafo import Grafo
+from src.model.grafo_csr import GrafoCSR
+
+
+def _dijkstra_con_mascaras(csr: GrafoCSR, inicio: int, destino: int, nodos_prohibidos, aristas_prohibidas):
+    """
+    Dijkstra sobre la instantánea que ignora las estaciones marcadas en 'nodos_prohibidos' (bytearray)
+    y las rutas cuyo índice está en 'aristas_prohibidas' (set), sin copiar ni modificar el grafo.
+    Devuelve una tupla (nodos, aristas, costo) o None si no hay camino.
+    """
+    offsets, destinos, pesos, rango = csr.offsets, csr.destinos, csr.pesos, csr.rango
+    distances = {inicio: 0}
+    padre = {inicio: (-1, -1)}  # estación -> (estación anterior, ruta usada)
+    visitados = set()
+    heap = [(0, rango[inicio], inicio)]
+    while heap:
+        distancia, _, current = heapq.heappop(heap)
+        if current in visitados:
+            continue
+        visitados.add(current)
+        if current == destino:
+            break
+        for e in range(offsets[current], offsets[current + 1]):
+            nodo_vecino = destinos[e]
+            if nodos_prohibidos[nodo_vecino] or e in aristas_prohibidas:
+                continue
+            tentativa = distancia + pesos[e]
+            if tentativa < distances.get(nodo_vecino, float("inf")):
+                distances[nodo_vecino] = tentativa
+                padre[nodo_vecino] = (current, e)
+                heapq.heappush(heap, (tentativa, rango[nodo_vecino], nodo_vecino))
+    if destino not in visitados:
+        return None
+    nodos, aristas = [destino], []
+    while padre[nodos[-1]][0] != -1:
+        anterior, e = padre[nodos[-1]]
+        aristas.append(e)
+        nodos.append(anterior)
+    nodos.reverse()
+    aristas.reverse()
+    return nodos, aristas, distances[destino]
+
+
+def k_caminos_csr(csr: GrafoCSR, inicio: int, destino: int, k: int = 3):
+    """
+    Algoritmo de Yen (con la mejora de Lawler) sobre una instantánea GrafoCSR.
+    - Las desviaciones se calculan con máscaras de estaciones y rutas prohibidas, sin copiar el grafo.
+    - Los candidatos se guardan en un heap por costo y se descartan duplicados con un set de caminos.
+    - Cada camino solo se desvía a partir del punto donde se separó de su camino padre (Lawler),
+      porque las desviaciones anteriores ya se generaron al procesar al padre.
+    Devuelve una lista de hasta k tuplas (nodos, costo) ordenada por costo, con los caminos como ids.
+    """
+    primero = _dijkstra_con_mascaras(csr, inicio, destino, bytearray(csr.num_estaciones()), set())
+    if primero is None or len(primero[0]) < 2:
+        return []
+    nodos, aristas, costo = primero
+    caminos = [(nodos, aristas, costo, 0)]  # (nodos, aristas, costo, índice de desviación)
+    vistos = {tuple(nodos)}
+    candidatos = []
+    desempate = count()
+    prohibidos = bytearray(csr.num_estaciones())
+    while len(caminos) < k:
+        nodos, aristas, _, desviacion = caminos[-1]
+        # Costo acumulado de la raíz hasta cada estación del último camino
+        acumulado = [0]
+        for e in aristas:
+            acumulado.append(acumulado[-1] + csr.pesos[e])
+        for i in range(desviacion, len(nodos) - 1):
+            spur_node = nodos[i]
+            root_path = nodos[:i + 1]
+            # Prohíbe las rutas que siguen a la misma raíz en los caminos ya aceptados
+            aristas_prohibidas = set()
+            for camino_prev, _, _, _ in caminos:
+                if len(camino_prev) > i + 1 and camino_prev[:i + 1] == root_path:
+                    siguiente = camino_prev[i + 1]
+                    for e in range(csr.offsets[spur_node], csr.offsets[spur_node + 1]):
+                        if csr.destinos[e] == siguiente:
+                            aristas_prohibidas.add(e)
+            # Prohíbe las estaciones de la raíz excepto spur_node
+            for nodo in root_path[:-1]:
+                prohibidos[nodo] = 1
+            spur = _dijkstra_con_mascaras(csr, spur_node, destino, prohibidos, aristas_prohibidas)
+            for nodo in root_path[:-1]:
+                prohibidos[nodo] = 0
+            if spur is None:
+                continue
+            spur_path, spur_aristas, spur_cost = spur
+            total_path = root_path[:-1] + spur_path
+            clave = tuple(total_path)
+            if clave in vistos:
+                continue
+            vistos.add(clave)
+            heapq.heappush(candidatos, (acumulado[i] + spur_cost, next(desempate),
+                                        total_path, aristas[:i] + spur_aristas, i))
+        if not candidatos:
+            break
+        costo, _, total_path, total_aristas, desviacion = heapq.heappop(candidatos)
+        caminos.append((total_path, total_aristas, costo, desviacion))
+    return [(nodos, costo) for nodos, _, costo, _ in caminos]
+
+
+def k_caminos_mas_rapidos(grafo: Grafo, origen: Estacion, destino: Estacion, k: int = 3):
+    """
+    Devuelve hasta k caminos más cortos (por tiempo) entre origen y destino.
+    Cada elemento es una tupla (camino, costo) con el camino como lista de estaciones.
+    """
+    csr = grafo.a_csr()
+    resultado = k_caminos_csr(csr, csr.id_de(origen.nombre), csr.id_de(destino.nombre), k)
+    return [([grafo.encontrar_estacion(csr.nombres[i]) for i in nodos], costo) for nodos, costo in resultado]
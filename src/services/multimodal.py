@@ -0,0 +1,223 @@
+"""
+Módulo que implementa la búsqueda de caminos multimodal (modos de transporte y transbordos).
+"""
+
+import heapq
+import threading
+from array import array
+from collections import OrderedDict
+
+from src.model.estacion import Estacion
+from src.model.grafo import Grafo
+
+INDICES_EN_CACHE = 4
+_indices_por_version = OrderedDict()  # versión del grafo -> IndiceMultimodal
+_indices_lock = threading.Lock()
+
+
+def _orden_modo(modo):
+    """
+    Clave para ordenar modos: primero las rutas sin modo (None), luego por nombre.
+    """
+    return (modo is not None, modo or "")
+
+
+class IndiceMultimodal:
+    """
+    Grafo expandido de estados (estación, modo), construido una vez por versión del grafo:
+    - Cada estación tiene un estado por cada modo de las rutas que salen o llegan a ella.
+    - Una ruta u -> v de modo m une (u, m) con (v, m); en cada estación, (u, a) -> (u, b) es un
+      transbordo que cuesta Estacion.tiempo_transbordo(a, b) minutos.
+    - Los estados de una estación son consecutivos y las aristas se guardan en formato CSR
+      (offsets, destinos, pesos), así que una consulta es un Dijkstra normal sobre enteros.
+    Como Grafo admite una sola ruta por par (origen, destino), dos modos que unen las mismas
+    estaciones se modelan con estaciones distintas (p. ej. el andén de metro y la parada de bus)
+    unidas por transbordos.
+    """
+
+    def __init__(self, grafo: Grafo):
+        """
+        Construye el índice a partir de las rutas (con su modo) y las estaciones (con sus transbordos).
+        """
+        csr = grafo.a_csr()
+        estaciones = grafo.obtener_estaciones()
+        n = len(estaciones)
+        self.version = grafo.version
+        self.csr = csr
+        self.estaciones = estaciones
+        self.indice = csr.indice
+        salientes = [[] for _ in range(n)]  # u -> [(v, modo, peso)]
+        modos_estacion = [set() for _ in range(n)]
+        for u, estacion in enumerate(estaciones):
+            for ruta in grafo.obtener_vecinos(estacion):
+                v = csr.indice[ruta.dest.nombre]
+                salientes[u].append((v, ruta.modo, ruta.peso))
+                modos_estacion[u].add(ruta.modo)
+                modos_estacion[v].add(ruta.modo)
+        self.modos = sorted(set().union(*modos_estacion), key=_orden_modo) or [None]
+        id_modo = {modo: i for i, modo in enumerate(self.modos)}
+        n_modos = len(self.modos)
+
+        # Estados: los de la estación u ocupan primer_estado[u]:primer_estado[u + 1]
+        self.primer_estado = array("q", [0])
+        self.estado_estacion = array("q")
+        self.estado_modo = array("q")
+        self.rango = array("q")  # Desempate: por nombre de estación y luego por modo
+        estado_de = {}
+        for u in range(n):
+            modos_u = sorted(id_modo[m] for m in modos_estacion[u]) or [0]
+            for m in modos_u:
+                estado_de[(u, m)] = len(self.estado_estacion)
+                self.estado_estacion.append(u)
+                self.estado_modo.append(m)
+                self.rango.append(csr.rango[u] * n_modos + m)
+            self.primer_estado.append(len(self.estado_estacion))
+
+        # Aristas: rutas del mismo modo y transbordos dentro de cada estación
+        self.offsets = array("q", [0])
+        self.destinos = array("q")
+        self.pesos = array("d")
+        for s in range(len(self.estado_estacion)):
+            u, m = self.estado_estacion[s], self.estado_modo[s]
+            modo = self.modos[m]
+            for v, modo_ruta, peso in salientes[u]:
+                if modo_ruta == modo:
+                    self.destinos.append(estado_de[(v, m)])
+                    self.pesos.append(peso)
+            for t in range(self.primer_estado[u], self.primer_estado[u + 1]):
+                if t != s:
+                    self.destinos.append(t)
+                    self.pesos.append(estaciones[u].tiempo_transbordo(modo, self.modos[self.estado_modo[t]]))
+            self.offsets.append(len(self.destinos))
+        self._buffers = threading.local()
+
+    def num_estados(self) -> int:
+        """
+        Devuelve la cantidad de estados (estación, modo) del índice.
+        """
+        return len(self.estado_estacion)
+
+    def _modos_permitidos(self, permitidos, prohibidos) -> bytearray:
+        """
+        Devuelve una tabla id de modo -> 1 si el modo se puede usar en la consulta.
+        """
+        permitidos = None if permitidos is None else set(permitidos)
+        prohibidos = set(prohibidos or ())
+        return bytearray(
+            (permitidos is None or modo in permitidos) and modo not in prohibidos
+            for modo in self.modos
+        )
+
+    def _buffers_hilo(self):
+        """
+        Devuelve los buffers de la consulta del hilo actual (distancias, anterior, marca, cerrado,
+        generación): se reutilizan entre consultas con marcas de generación, como BuscadorCaminos.
+        """
+        buffers = getattr(self._buffers, "valor", None)
+        if buffers is None:
+            m = self.num_estados()
+            buffers = [[0.0] * m, [-1] * m, [0] * m, [0] * m, 0]
+            self._buffers.valor = buffers
+        return buffers
+
+    def camino_corto_ids(self, inicio: int, destino: int, permitidos=None, prohibidos=None):
+        """
+        Dijkstra sobre los estados desde todos los estados de 'inicio' con modo permitido (sin
+        transbordo al salir) hasta el primer estado de 'destino' que se cierra.
+        Devuelve (estados del camino o None, tiempo_total).
+        """
+        permitido = self._modos_permitidos(permitidos, prohibidos)
+        buffers = self._buffers_hilo()
+        buffers[4] += 1
+        distances, anterior, marca, cerrado, generacion = buffers
+        offsets, destinos, pesos, rango = self.offsets, self.destinos, self.pesos, self.rango
+        estado_estacion, estado_modo = self.estado_estacion, self.estado_modo
+        heap = []
+        for s in range(self.primer_estado[inicio], self.primer_estado[inicio + 1]):
+            if permitido[estado_modo[s]]:
+                distances[s] = 0
+                anterior[s] = -1
+                marca[s] = generacion
+                heap.append((0, rango[s], s))
+        heapq.heapify(heap)
+        heappop, heappush = heapq.heappop, heapq.heappush
+        final = -1
+        while heap:
+            base, _, current = heappop(heap)
+            if cerrado[current] == generacion:
+                continue
+            cerrado[current] = generacion
+            if estado_estacion[current] == destino:
+                final = current
+                break
+            for e in range(offsets[current], offsets[current + 1]):
+                v = destinos[e]
+                if not permitido[estado_modo[v]]:
+                    continue
+                tentativa = base + pesos[e]
+                if marca[v] != generacion or tentativa < distances[v]:
+                    marca[v] = generacion
+                    distances[v] = tentativa
+                    anterior[v] = current
+                    heappush(heap, (tentativa, rango[v], v))
+        if final == -1:
+            return None, float("inf")
+        camino = []
+        actual = final
+        while actual != -1:
+            camino.append(actual)
+            actual = anterior[actual]
+        camino.reverse()
+        return camino, distances[final]
+
+
+def indice_multimodal_de(grafo) -> IndiceMultimodal:
+    """
+    Devuelve el IndiceMultimodal de la versión actual del grafo (Grafo o InstantaneaRed). Se construye
+    la primera vez que se pide para esa versión y se guarda para las últimas INDICES_EN_CACHE
+    versiones, así que las consultas no vuelven a expandir los estados.
+    Los minutos de transbordo se leen al construir el índice: si se cambian en una Estacion, hay que
+    registrar el cambio en el grafo (grafo.registrar_cambio()) para que se construya uno nuevo.
+    """
+    csr = grafo.a_csr()
+    with _indices_lock:
+        indice = _indices_por_version.get(grafo.version)
+        if indice is not None and indice.csr is csr:
+            _indices_por_version.move_to_end(grafo.version)
+            return indice
+    # La construcción se hace fuera del lock; si dos hilos la hacen a la vez, queda uno de los dos
+    indice = IndiceMultimodal(grafo)
+    with _indices_lock:
+        _indices_por_version[grafo.version] = indice
+        _indices_por_version.move_to_end(grafo.version)
+        while len(_indices_por_version) > INDICES_EN_CACHE:
+            _indices_por_version.popitem(last=False)
+    return indice
+
+
+def camino_multimodal(grafo: Grafo, inicio: Estacion, destino: Estacion, permitidos=None, prohibidos=None,
+                      indice: IndiceMultimodal = None):
+    """
+    Calcula el viaje más rápido puerta a puerta teniendo en cuenta el modo de cada ruta y los
+    minutos de transbordo al cambiar de modo en una estación.
+    - permitidos / prohibidos: modos que se pueden / no se pueden usar (p. ej. prohibidos={"bus"}).
+    - indice: IndiceMultimodal de la versión actual del grafo (si no se pasa, el de indice_multimodal_de).
+    Devuelve una tupla (camino, modos, tiempo_total): el camino como lista de Estacion, el modo de
+    cada tramo (len(camino) - 1) y el tiempo con transbordos. Si no hay camino, (None, None, inf).
+    """
+    if indice is None:
+        indice = indice_multimodal_de(grafo)
+    elif indice.version != grafo.version:
+        raise Exception("El índice multimodal no corresponde a la versión actual del grafo")
+    estados, tiempo = indice.camino_corto_ids(indice.indice[inicio.nombre], indice.indice[destino.nombre],
+                                              permitidos, prohibidos)
+    if estados is None:
+        return None, None, tiempo
+    camino = [indice.estaciones[indice.estado_estacion[estados[0]]]]
+    modos = []
+    for anterior, s in zip(estados, estados[1:]):
+        u = indice.estado_estacion[s]
+        if u != indice.estado_estacion[anterior]:  # Los transbordos no agregan estaciones
+            camino.append(indice.estaciones[u])
+            modos.append(indice.modos[indice.estado_modo[s]])
+    return camino, modos, tiempo
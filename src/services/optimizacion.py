@@ -0,0 +1,106 @@
+"""
+Módulo que implementa el diseño voraz de un conjunto de nuevas conexiones para la red de transporte urbano.
+"""
+
+import numpy as np
+
+from src.model.grafo import Grafo
+from src.services.distancias import MatrizDistancias, aplicar_conexion, beneficio_conexion, calcular_matriz_distancias, estimar_beneficios
+
+# Candidatos por defecto como máximo: con más, estimar todos en cada ronda deja de ser rápido
+MAX_CANDIDATOS = 20000
+# Estaciones de la muestra con que se estiman los candidatos, y candidatos evaluados exactamente por ronda
+MUESTRA = 64
+EVALUADOS_POR_RONDA = 16
+
+def _candidatos_por_defecto(grafo: Grafo, matriz: MatrizDistancias, tiempo_conexion: float, max_candidatos: int):
+    """
+    Genera como candidatos los pares sin ruta directa cuyo tiempo actual supera 'tiempo_conexion'.
+    Si son más de 'max_candidatos', se quedan los de mayor tiempo actual (primero los pares sin
+    camino): son los que más ahorran con una conexión directa.
+    Devuelve tres arreglos alineados (ids de origen, ids de destino, pesos) con los ids de la matriz.
+    """
+    d = matriz.d
+    n = d.shape[0]
+    posibles = d > tiempo_conexion
+    np.fill_diagonal(posibles, False)
+    csr = grafo.a_csr()
+    ids = np.array([matriz.indice[nombre] for nombre in csr.nombres], dtype=np.int64)
+    origenes = np.repeat(np.arange(csr.num_estaciones()), np.diff(np.asarray(csr.offsets)))
+    posibles[ids[origenes], ids[np.asarray(csr.destinos, dtype=np.int64)]] = False  # Rutas directas
+    cantidad = int(posibles.sum())
+    if cantidad <= max_candidatos:
+        elegidos = np.flatnonzero(posibles)
+    else:
+        claves = np.where(posibles, d, -np.inf).ravel()
+        elegidos = np.sort(np.argpartition(claves, -max_candidatos)[-max_candidatos:])
+    us, vs = np.divmod(elegidos, n)
+    return us, vs, np.full(len(elegidos), float(tiempo_conexion))
+
+def disenar_conexiones(grafo: Grafo, k: int, presupuesto_total: float, tiempo_conexion: float = None,
+                       candidatos=None, matriz: MatrizDistancias = None, max_candidatos: int = MAX_CANDIDATOS,
+                       muestra: int = MUESTRA, evaluados_por_ronda: int = EVALUADOS_POR_RONDA):
+    """
+    Elige de forma voraz hasta k nuevas conexiones que juntas reduzcan el tiempo promedio entre estaciones,
+    sin que la suma de sus tiempos supere 'presupuesto_total' (en minutos).
+
+    :param grafo: El grafo de la red actual (no se modifica).
+    :param k: Cantidad máxima de conexiones a elegir.
+    :param presupuesto_total: Suma máxima de los tiempos de las conexiones elegidas.
+    :param tiempo_conexion: Tiempo de cada conexión candidata cuando no se pasan 'candidatos'.
+    :param candidatos: Lista opcional de tuplas (origen_nombre, destino_nombre, peso). Por defecto son
+        los pares sin ruta directa más lejanos que 'tiempo_conexion', hasta 'max_candidatos' (en redes
+        chicas, todos).
+    :param matriz: Matriz de distancias ya calculada (no se modifica).
+    :param max_candidatos: Cantidad máxima de candidatos por defecto.
+    :param muestra: Cada ronda estima en NumPy el beneficio de todos los candidatos sobre los pares
+        entre 'muestra' estaciones (estimar_beneficios) y evalúa exactamente solo los
+        'evaluados_por_ronda' mejores estimados; elige el mejor de esos. En redes de a lo sumo
+        'muestra' estaciones la estimación es exacta y la elección también.
+    :param evaluados_por_ronda: Candidatos que se evalúan exactamente en cada ronda.
+    :return: Lista de tuplas (origen, destino, peso, pares_conectados, reduccion_promedio) en el orden
+        elegido, donde las dos últimas son la ganancia marginal de esa conexión.
+    """
+    if max_candidatos < 1 or muestra < 1 or evaluados_por_ronda < 1:
+        raise Exception("'max_candidatos', 'muestra' y 'evaluados_por_ronda' deben ser al menos 1")
+    if matriz is None:
+        matriz = calcular_matriz_distancias(grafo)
+    if candidatos is None:
+        if tiempo_conexion is None:
+            raise Exception("Se requiere 'tiempo_conexion' o una lista de candidatos")
+        us, vs, pesos = _candidatos_por_defecto(grafo, matriz, tiempo_conexion, max_candidatos)
+    else:
+        us = np.array([matriz.indice[o] for o, _, _ in candidatos], dtype=np.int64)
+        vs = np.array([matriz.indice[d] for _, d, _ in candidatos], dtype=np.int64)
+        pesos = np.array([peso for _, _, peso in candidatos], dtype=np.float64)
+    # Se trabaja sobre una copia para no alterar la matriz recibida
+    actual = MatrizDistancias(matriz.nombres, matriz.d.copy())
+    n = len(actual.nombres)
+    restante = presupuesto_total
+    elegidas = []
+    while len(elegidas) < k and len(us):
+        # Una conexión no mejora nada si ya existe un camino igual o más rápido entre sus extremos
+        vigentes = (pesos <= restante) & (actual.d[us, vs] > pesos)
+        us, vs, pesos = us[vigentes], vs[vigentes], pesos[vigentes]
+        # Solo se evalúan exactamente los candidatos con mejor beneficio estimado
+        conectados, ahorros = estimar_beneficios(actual, us, vs, pesos, muestra)
+        mejor, mejor_clave = None, (0, 0.0)
+        for i in np.lexsort((-ahorros, -conectados))[:evaluados_por_ronda]:
+            candidato = (int(us[i]), int(vs[i]), float(pesos[i]))
+            clave = beneficio_conexion(actual, *candidato)
+            if clave > mejor_clave:
+                mejor, mejor_clave = candidato, clave
+        if mejor is None:
+            break
+        u, v, peso = mejor
+        aplicar_conexion(actual, u, v, peso)
+        restante -= peso
+        pares_conectados, ahorro = mejor_clave
+        elegidas.append((
+            grafo.encontrar_estacion(actual.nombres[u]),
+            grafo.encontrar_estacion(actual.nombres[v]),
+            peso,
+            pares_conectados,
+            ahorro / (n * (n - 1)),
+        ))
+    return elegidas
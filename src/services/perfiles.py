@@ -0,0 +1,148 @@
+"""
+Módulo que implementa los perfiles horarios de congestión y la búsqueda de caminos dependiente del tiempo.
+"""
+
+import heapq
+from array import array
+
+from src.model.grafo import Grafo
+from src.model.grafo_csr import GrafoCSR
+from src.services.actualizacion import factor_congestion
+
+MINUTOS_DIA = 24 * 60
+
+
+class PerfilesHorarios:
+    """
+    Perfil de congestión por ruta a lo largo del día, sobre una instantánea CSR con los pesos base.
+    - El día se divide en 'franjas' intervalos iguales (24 = por hora, 96 = cada 15 minutos).
+    - factores[e * franjas + f] es el multiplicador del peso base de la ruta e en la franja f,
+      guardado en un arreglo compacto de float32.
+    - El vector de pesos de cada franja se calcula una sola vez y se guarda: cambiar de franja
+      activa es tomar otra referencia, O(1), en lugar de recorrer y modificar todas las rutas.
+    """
+
+    def __init__(self, csr: GrafoCSR, franjas: int = 24, factores=None):
+        """
+        Inicializa los perfiles con la instantánea de pesos base y, opcionalmente, los factores.
+        Sin factores, todas las rutas usan factor_congestion según la hora de cada franja.
+        """
+        if franjas <= 0 or MINUTOS_DIA % franjas:
+            raise Exception("La cantidad de franjas debe dividir los minutos del día")
+        self.csr = csr
+        self.franjas = franjas
+        self.minutos_franja = MINUTOS_DIA // franjas
+        if factores is None:
+            por_franja = [factor_congestion(f * 24 // franjas) for f in range(franjas)]
+            factores = array("f", por_franja) * csr.num_rutas()
+        elif len(factores) != franjas * csr.num_rutas():
+            raise Exception("La cantidad de factores no coincide con rutas x franjas")
+        self.factores = factores
+        self._instantaneas = {}  # franja -> GrafoCSR con los pesos de esa franja
+
+    @classmethod
+    def desde_grafo(cls, grafo: Grafo, franjas: int = 24):
+        """
+        Crea los perfiles tomando como base el peso base (sin congestión) de cada ruta del grafo.
+        """
+        csr = grafo.a_csr()
+        base = array("d")
+        for estacion in grafo.obtener_estaciones():
+            base.extend(ruta.peso_base for ruta in grafo.obtener_vecinos(estacion))
+        return cls(csr.con_pesos(base), franjas)
+
+    def franja(self, minuto: float) -> int:
+        """
+        Devuelve la franja del día que contiene el minuto dado (contado desde la medianoche).
+        """
+        return int(minuto % MINUTOS_DIA) // self.minutos_franja
+
+    def establecer_perfil(self, e: int, factores):
+        """
+        Reemplaza los factores de la ruta e (uno por franja) e invalida los vectores guardados.
+        """
+        if len(factores) != self.franjas:
+            raise Exception(f"Se esperaban {self.franjas} factores")
+        inicio = e * self.franjas
+        self.factores[inicio:inicio + self.franjas] = array("f", factores)
+        self._instantaneas.clear()
+
+    def instantanea(self, franja: int) -> GrafoCSR:
+        """
+        Devuelve la instantánea con los pesos de la franja (peso base x factor), calculándola
+        solo la primera vez. Las llamadas siguientes devuelven el mismo objeto.
+        """
+        csr = self._instantaneas.get(franja)
+        if csr is None:
+            base, factores, franjas = self.csr.pesos, self.factores, self.franjas
+            pesos = array("d", (round(base[e] * factores[e * franjas + franja], 2) for e in range(len(base))))
+            csr = self.csr.con_pesos(pesos)
+            self._instantaneas[franja] = csr
+        return csr
+
+    def instantanea_hora(self, hora: int) -> GrafoCSR:
+        """
+        Devuelve la instantánea de la franja que empieza a la hora dada.
+        """
+        return self.instantanea(hora * self.franjas // 24)
+
+    def tiempo_viaje(self, e: int, salida: float) -> float:
+        """
+        Tiempo de la ruta e saliendo en el minuto 'salida'. El factor se interpola linealmente entre
+        los centros de franjas vecinas (el día es circular), así el tiempo es continuo y cumple FIFO
+        (salir más tarde nunca hace llegar antes) si entre franjas vecinas cambia menos que su duración.
+        """
+        posicion = (salida % MINUTOS_DIA) / self.minutos_franja - 0.5
+        anterior = int(posicion // 1)
+        fraccion = posicion - anterior
+        inicio = e * self.franjas
+        f0 = self.factores[inicio + anterior % self.franjas]
+        f1 = self.factores[inicio + (anterior + 1) % self.franjas]
+        return self.csr.pesos[e] * (f0 + (f1 - f0) * fraccion)
+
+
+def llegada_mas_temprana_csr(perfiles: PerfilesHorarios, inicio: int, destino: int, salida: float):
+    """
+    Dijkstra dependiente del tiempo (FIFO): las etiquetas son horas de llegada y cada ruta se evalúa
+    con su tiempo a la hora en que se toma. Devuelve (ids del camino o None, minuto de llegada).
+    """
+    csr = perfiles.csr
+    offsets, destinos, rango = csr.offsets, csr.destinos, csr.rango
+    tiempo_viaje = perfiles.tiempo_viaje
+    llegada = {inicio: salida}
+    anterior = {inicio: -1}
+    visitados = set()
+    heap = [(salida, rango[inicio], inicio)]
+    while heap:
+        hora, _, u = heapq.heappop(heap)
+        if u in visitados:
+            continue
+        visitados.add(u)
+        if u == destino:
+            break
+        for e in range(offsets[u], offsets[u + 1]):
+            v = destinos[e]
+            tentativa = hora + tiempo_viaje(e, hora)
+            if tentativa < llegada.get(v, float("inf")):
+                llegada[v] = tentativa
+                anterior[v] = u
+                heapq.heappush(heap, (tentativa, rango[v], v))
+    if destino not in visitados:
+        return None, float("inf")
+    camino = [destino]
+    while anterior[camino[-1]] != -1:
+        camino.append(anterior[camino[-1]])
+    camino.reverse()
+    return camino, llegada[destino]
+
+
+def llegada_mas_temprana(grafo: Grafo, perfiles: PerfilesHorarios, inicio, destino, salida: float):
+    """
+    Igual que llegada_mas_temprana_csr, con estaciones del grafo. 'salida' es el minuto del día
+    (p. ej. 8 * 60 para las 8:00). Devuelve (camino como lista de Estacion o None, minuto de llegada).
+    """
+    csr = perfiles.csr
+    ids, llegada = llegada_mas_temprana_csr(perfiles, csr.id_de(inicio.nombre), csr.id_de(destino.nombre), salida)
+    if ids is None:
+        return None, llegada
+    return [grafo.encontrar_estacion(csr.nombres[i]) for i in ids], llegada
@@ -0,0 +1,210 @@
+"""
+Módulo que implementa la planificación de viajes sobre horarios (Connection Scan Algorithm).
+"""
+
+from bisect import bisect_left, bisect_right
+
+from src.model.estacion import Estacion
+from src.model.grafo import Grafo
+from src.model.horario import Horario, minutos
+
+
+def _tramo(horario: Horario, inicio: int, fin: int):
+    """
+    Tramo de un viaje desde la conexión 'inicio' hasta la conexión 'fin' (del mismo viaje):
+    tupla (id de viaje, ids de las paradas recorridas, minuto de salida, minuto de llegada).
+    """
+    t = horario.viaje[fin]
+    paradas = horario.paradas_entre(t, horario.posicion[inicio], horario.posicion[fin] + 1)
+    return horario.viajes[t], paradas, horario.salida[inicio], horario.llegada[fin]
+
+
+def llegada_mas_temprana_horario(horario: Horario, origen: int, destino: int, salida: float):
+    """
+    Connection Scan Algorithm: recorre una sola vez las conexiones que salen desde 'salida' (en
+    orden de salida) y se detiene cuando ya no pueden mejorar la llegada a 'destino'.
+    Subir a un viaje exige estar en la parada 'cambio' minutos antes (salvo en el origen); seguir
+    en el mismo viaje no. Devuelve (tramos, minuto de llegada) o (None, inf) si no hay viaje.
+    """
+    infinito = float("inf")
+    llegada_a = [infinito] * len(horario.nombres)
+    llego_por = [-1] * len(horario.nombres)
+    llegada_a[origen] = salida
+    subido = {}  # viaje -> conexión en la que se subió
+    salidas, llegadas, desde, hacia, viaje, cambio = (horario.salida, horario.llegada, horario.desde,
+                                                      horario.hacia, horario.viaje, horario.cambio)
+    if origen == destino:
+        return [], salida
+    for c in range(bisect_left(salidas, salida), len(salidas)):
+        hora = salidas[c]
+        if hora >= llegada_a[destino]:
+            break
+        t = viaje[c]
+        if t not in subido:
+            u = desde[c]
+            listo = llegada_a[u] if u == origen else llegada_a[u] + cambio[u]
+            if listo > hora:
+                continue
+            subido[t] = c
+        v = hacia[c]
+        if llegadas[c] < llegada_a[v]:
+            llegada_a[v] = llegadas[c]
+            llego_por[v] = c
+    if llegada_a[destino] == infinito:
+        return None, infinito
+    tramos = []
+    s = destino
+    while s != origen:
+        fin = llego_por[s]
+        inicio = subido[viaje[fin]]
+        tramos.append(_tramo(horario, inicio, fin))
+        s = desde[inicio]
+    tramos.reverse()
+    return tramos, llegada_a[destino]
+
+
+def viajes_pareto_horario(horario: Horario, origen: int, destino: int, salida: float, max_viajes: int = 5):
+    """
+    Viajes Pareto-óptimos en (hora de llegada, cantidad de viajes usados): CSA por rondas, donde
+    la ronda k solo sube a viajes desde paradas alcanzadas con k - 1 viajes.
+    Devuelve una lista de (cantidad de viajes, minuto de llegada, tramos) con llegadas
+    estrictamente decrecientes: cada opción con más transbordos llega antes que las anteriores.
+    """
+    infinito = float("inf")
+    n = len(horario.nombres)
+    salidas, llegadas, desde, hacia, viaje, cambio = (horario.salida, horario.llegada, horario.desde,
+                                                      horario.hacia, horario.viaje, horario.cambio)
+    primera = bisect_left(salidas, salida)
+    llegada_a = [[infinito] * n]
+    llegada_a[0][origen] = salida
+    llego_por = [[None] * n]  # ronda -> parada -> (ronda, conexión)
+    subido = [{}]  # ronda -> viaje -> conexión
+    resultado = []
+    for k in range(1, max_viajes + 1):
+        previa = llegada_a[k - 1]
+        actual = list(previa)
+        punteros = list(llego_por[k - 1])
+        subido_k = {}
+        mejoro = False
+        for c in range(primera, len(salidas)):
+            hora = salidas[c]
+            if hora >= actual[destino]:
+                break
+            t = viaje[c]
+            if t not in subido_k:
+                u = desde[c]
+                listo = previa[u] if u == origen else previa[u] + cambio[u]
+                if listo > hora:
+                    continue
+                subido_k[t] = c
+            v = hacia[c]
+            if llegadas[c] < actual[v]:
+                actual[v] = llegadas[c]
+                punteros[v] = (k, c)
+                mejoro = True
+        llegada_a.append(actual)
+        llego_por.append(punteros)
+        subido.append(subido_k)
+        if actual[destino] < previa[destino]:
+            tramos = []
+            s, ronda = destino, k
+            while s != origen:
+                ronda, fin = llego_por[ronda][s]
+                inicio = subido[ronda][viaje[fin]]
+                tramos.append(_tramo(horario, inicio, fin))
+                s, ronda = desde[inicio], ronda - 1
+            tramos.reverse()
+            resultado.append((k, actual[destino], tramos))
+        if not mejoro:
+            break
+    return resultado
+
+
+def perfil_horario(horario: Horario, origen: int, destino: int, desde_minuto: float, hasta_minuto: float):
+    """
+    Perfil de viaje entre dos paradas: para cada salida desde 'origen' en [desde_minuto, hasta_minuto]
+    calcula la llegada más temprana y deja solo las opciones útiles (no hay otra que salga más tarde
+    y llegue igual o antes).
+    Es un CSA de perfiles: un solo barrido de las conexiones de la última a la primera que mantiene,
+    por viaje, la mejor llegada quedándose en él y, por parada, las opciones (salida, llegada) no
+    dominadas; cuesta una consulta más ese barrido, acotado a la ventana y a la llegada de su
+    última salida, en lugar de una consulta por salida.
+    Devuelve una lista de (minuto de salida, minuto de llegada) ordenada por salida.
+    """
+    infinito = float("inf")
+    salidas, llegadas, desde, hacia, viaje, cambio = (horario.salida, horario.llegada, horario.desde,
+                                                      horario.hacia, horario.viaje, horario.cambio)
+    primera = bisect_left(salidas, desde_minuto)
+    if origen == destino:
+        return [(salida, salida) for salida in sorted({salidas[c] for c in range(primera, len(salidas))
+                                                       if desde[c] == origen and salidas[c] <= hasta_minuto})]
+    # Ninguna opción útil llega después que la de la última salida de la ventana: las conexiones
+    # que salen más tarde no hace falta recorrerlas
+    ultima = bisect_right(salidas, hasta_minuto, lo=primera) - 1
+    while ultima >= primera and desde[ultima] != origen:
+        ultima -= 1
+    if ultima < primera:
+        return []
+    _, cota = llegada_mas_temprana_horario(horario, origen, destino, salidas[ultima])
+    en_viaje = [infinito] * len(horario.viajes)  # Mejor llegada quedándose en el viaje
+    # Por parada, opciones con salida decreciente y llegada estrictamente decreciente; las salidas
+    # se guardan negadas para buscarlas con bisect
+    salidas_opciones = [[] for _ in horario.nombres]
+    llegadas_opciones = [[] for _ in horario.nombres]
+    perfil = []
+    mejor_origen = infinito
+    for c in range(bisect_right(salidas, cota, lo=primera) - 1, primera - 1, -1):
+        if llegadas[c] > cota:
+            continue
+        t, v = viaje[c], hacia[c]
+        llegada = en_viaje[t]
+        if v == destino:
+            llegada = min(llegada, llegadas[c])
+        else:
+            # Bajarse en v y subir a la primera opción que sale después del cambio
+            opciones = salidas_opciones[v]
+            i = bisect_right(opciones, -(llegadas[c] + cambio[v])) - 1
+            if i >= 0:
+                llegada = min(llegada, llegadas_opciones[v][i])
+        u, hora = desde[c], salidas[c]
+        if llegada < infinito:
+            en_viaje[t] = llegada
+            opciones, llegadas_u = salidas_opciones[u], llegadas_opciones[u]
+            if not llegadas_u or llegada < llegadas_u[-1]:
+                if opciones and opciones[-1] == -hora:
+                    llegadas_u[-1] = llegada
+                else:
+                    opciones.append(-hora)
+                    llegadas_u.append(llegada)
+        if u == origen:
+            # Saliendo a esta hora también sirven las conexiones posteriores desde el origen
+            mejor_origen = min(mejor_origen, llegada)
+            if hora <= hasta_minuto and mejor_origen < (perfil[-1][1] if perfil else infinito):
+                if perfil and perfil[-1][0] == hora:
+                    perfil[-1] = (hora, mejor_origen)
+                else:
+                    perfil.append((hora, mejor_origen))
+    perfil.reverse()
+    return perfil
+
+
+def camino_horario(grafo: Grafo, horario: Horario, inicio: Estacion, destino: Estacion, salida):
+    """
+    Adaptador al estilo de camino_corto: viaje que llega antes saliendo de 'inicio' a la hora
+    'salida' (minutos o "HH:MM"). Devuelve (camino, tiempo_total) con el camino como lista de
+    Estacion del grafo (las paradas que no están en él se crean) y el tiempo total de viaje
+    incluidas las esperas. Si no hay viaje, retorna (None, float('inf')).
+    """
+    salida = minutos(salida)
+    tramos, llegada = llegada_mas_temprana_horario(horario, horario.indice[inicio.nombre],
+                                                   horario.indice[destino.nombre], salida)
+    if tramos is None:
+        return None, llegada
+    ids = [horario.indice[inicio.nombre]]
+    for _, paradas, _, _ in tramos:
+        ids.extend(paradas[1:])
+    camino = []
+    for i in ids:
+        nombre = horario.nombres[i]
+        camino.append(grafo.encontrar_estacion(nombre) if nombre in grafo.nombre_a_estacion else Estacion(nombre))
+    return camino, llegada - salida
@@ -0,0 +1,238 @@
+"""
+Módulo que implementa el análisis de resiliencia: qué estación o ruta perjudica más a la red si se cierra.
+"""
+
+import heapq
+from array import array
+from collections import deque
+
+import numpy as np
+
+from src.model.grafo_csr import GrafoCSR
+from src.services.dijkstra import arbol_caminos_csr
+from src.services.trabajadores import pool_de_red
+
+
+def _entrantes(csr: GrafoCSR):
+    """
+    Índice de rutas entrantes por estación: las rutas que llegan a v son los ids de ruta
+    arcos[offsets[v]:offsets[v + 1]], y origenes[e] es la estación de la que sale la ruta e.
+    """
+    n, m = csr.num_estaciones(), csr.num_rutas()
+    origenes = array("q", [0]) * m
+    conteo = array("q", [0]) * (n + 1)
+    for u in range(n):
+        for e in range(csr.offsets[u], csr.offsets[u + 1]):
+            origenes[e] = u
+            conteo[csr.destinos[e] + 1] += 1
+    for v in range(n):
+        conteo[v + 1] += conteo[v]
+    offsets = array("q", conteo)
+    arcos = array("q", [0]) * m
+    for e in range(m):
+        v = csr.destinos[e]
+        arcos[conteo[v]] = e
+        conteo[v] += 1
+    return offsets, arcos, origenes
+
+
+def _recorrido(inicio: int, anterior):
+    """
+    Recorrido en preorden del árbol de caminos más cortos de 'inicio' (anterior[v] es el padre de v):
+    el subárbol de v son las estaciones recorrido[entrada[v]:salida[v]].
+    Las estaciones que el origen no alcanza tienen entrada == salida == 0.
+    """
+    n = len(anterior)
+    hijos = [[] for _ in range(n)]
+    for v, padre in enumerate(anterior):
+        if padre >= 0:
+            hijos[padre].append(v)
+    recorrido, entrada, salida = [], [0] * n, [0] * n
+    pila = [(inicio, False)]
+    while pila:
+        v, cerrar = pila.pop()
+        if cerrar:
+            salida[v] = len(recorrido)
+            continue
+        entrada[v] = len(recorrido)
+        recorrido.append(v)
+        pila.append((v, True))
+        pila.extend((hijo, False) for hijo in hijos[v])
+    return recorrido, entrada, salida
+
+
+def _reparar_subarbol(csr: GrafoCSR, entrantes, distancias, subarbol, rutas_caidas, estaciones_caidas):
+    """
+    Recalcula los tiempos de las estaciones de 'subarbol' (las que colgaban del elemento caído en el
+    árbol de un origen); las demás conservan su tiempo de 'distancias' (el árbol base del origen).
+    Cada estación del subárbol empieza con su mejor ruta entrante desde fuera de él, y luego un
+    Dijkstra recorre solo el subárbol.
+    Las rutas con rutas_caidas[e] y las estaciones con estaciones_caidas[v] no se usan (máscaras de
+    bytes: el grafo no se modifica). Devuelve un diccionario estación -> nuevo tiempo (inf si ya no
+    se alcanza).
+    """
+    offsets, destinos, pesos, rango = csr.offsets, csr.destinos, csr.pesos, csr.rango
+    offsets_entrantes, arcos, origenes = entrantes
+    infinito = float("inf")
+    nuevas = dict.fromkeys(subarbol, infinito)
+    heap = []
+    for w in subarbol:
+        mejor = infinito
+        for i in range(offsets_entrantes[w], offsets_entrantes[w + 1]):
+            e = arcos[i]
+            p = origenes[e]
+            if p in nuevas or rutas_caidas[e] or estaciones_caidas[p]:
+                continue
+            tentativa = distancias[p] + pesos[e]
+            if tentativa < mejor:
+                mejor = tentativa
+        if mejor < infinito:
+            nuevas[w] = mejor
+            heap.append((mejor, rango[w], w))
+    heapq.heapify(heap)
+    cerradas = set()
+    while heap:
+        base, _, current = heapq.heappop(heap)
+        if current in cerradas:
+            continue
+        cerradas.add(current)
+        for e in range(offsets[current], offsets[current + 1]):
+            nodo_vecino = destinos[e]
+            if nodo_vecino not in nuevas or nodo_vecino in cerradas or rutas_caidas[e]:
+                continue
+            tentativa = base + pesos[e]
+            if tentativa < nuevas[nodo_vecino]:
+                nuevas[nodo_vecino] = tentativa
+                heapq.heappush(heap, (tentativa, rango[nodo_vecino], nodo_vecino))
+    return nuevas
+
+
+def _evaluar_origenes(csr: GrafoCSR, origenes, estaciones: bool, rutas: bool):
+    """
+    Calcula el árbol de caminos más cortos de cada origen de 'origenes' y simula en él cada falla
+    que lo afecta (las estaciones y rutas del árbol), reparando solo el subárbol que colgaba del
+    elemento caído: cada falla cuesta según el tamaño de ese subárbol, no de la red. Solo guarda un
+    árbol a la vez, así que la memoria es O(V + E) y no depende de la cantidad de orígenes.
+    Las fallas se numeran con las estaciones primero (si 'estaciones') y luego las rutas (si 'rutas').
+    Devuelve (aumento, desconectados, llegadas, alcanzados): por falla, los minutos de aumento
+    sumados sobre los pares que siguen conectados y los pares que quedan desconectados; por
+    estación, cuántos de estos orígenes llegan a ella; y por origen, a cuántas estaciones llega.
+    """
+    n = csr.num_estaciones()
+    offsets, destinos = csr.offsets, csr.destinos
+    primera_ruta = n if estaciones else 0
+    total_fallas = primera_ruta + (csr.num_rutas() if rutas else 0)
+    entrantes = _entrantes(csr)
+    rutas_caidas = bytearray(csr.num_rutas())
+    estaciones_caidas = bytearray(n)
+    aumento = array("d", [0.0]) * total_fallas
+    desconectados = array("q", [0]) * total_fallas
+    llegadas = array("q", [0]) * n
+    alcanzados = []
+    infinito = float("inf")
+
+    def acumular(numero, distancias, subarbol):
+        for w, tiempo in _reparar_subarbol(csr, entrantes, distancias, subarbol,
+                                           rutas_caidas, estaciones_caidas).items():
+            if tiempo == infinito:
+                desconectados[numero] += 1
+            else:
+                aumento[numero] += tiempo - distancias[w]
+
+    for s in origenes:
+        distancias, anterior = arbol_caminos_csr(csr, s)
+        recorrido, entrada, salida = _recorrido(s, anterior)
+        alcanzados.append(len(recorrido) - 1)
+        for v in recorrido:
+            llegadas[v] += 1
+        if estaciones:
+            for x in recorrido[1:]:
+                # Solo afecta si x tiene descendientes; sin la propia estación, que deja de contar
+                if salida[x] - entrada[x] > 1:
+                    estaciones_caidas[x] = 1
+                    acumular(x, distancias, recorrido[entrada[x] + 1:salida[x]])
+                    estaciones_caidas[x] = 0
+        if rutas:
+            for v in recorrido[1:]:
+                u = anterior[v]
+                e = next(e for e in range(offsets[u], offsets[u + 1]) if destinos[e] == v)
+                rutas_caidas[e] = 1
+                acumular(primera_ruta + e, distancias, recorrido[entrada[v]:salida[v]])
+                rutas_caidas[e] = 0
+    return aumento, desconectados, llegadas, alcanzados
+
+
+def ranking_resiliencia(red, estaciones: bool = True, rutas: bool = True, procesos: int = 1,
+                        origenes_por_tarea: int = 64):
+    """
+    Ordena las estaciones y rutas según cuánto empeora la red si se cierra cada una (por separado).
+    - Por cada origen se calcula su árbol de caminos más cortos. Cerrar una ruta u -> v solo cambia
+      los tiempos de los orígenes cuyo árbol la usa, y dentro de cada uno solo los del subárbol que
+      colgaba de v (igual al cerrar una estación); solo esos se recalculan, con máscaras sobre la
+      instantánea (el Grafo no se modifica).
+    - Los orígenes se procesan por lotes de 'origenes_por_tarea' y cada lote acumula sus resultados
+      por falla, así que no se guarda ninguna matriz n x n: la memoria es O(V + E) por lote más un
+      acumulador por falla (con procesos > 1, uno por tarea en curso).
+    - Al cerrar una estación no se cuentan los pares que empiezan o terminan en ella.
+    - 'red' puede ser un Grafo o un GrafoCSR. Con procesos > 1 los lotes de orígenes se reparten
+      entre procesos que abren la red con mmap.
+    Devuelve una lista de (elemento, aumento_promedio, pares_desconectados), de mayor a menor
+    impacto (primero por pares desconectados y luego por aumento), donde elemento es el nombre
+    de la estación o la tupla (origen, destino) de la ruta y aumento_promedio son los minutos que
+    aumenta en promedio cada par que estaba conectado (los que se desconectan suman 0).
+    """
+    csr = red if isinstance(red, GrafoCSR) else red.a_csr()
+    n = csr.num_estaciones()
+    lotes = [range(i, min(i + origenes_por_tarea, n)) for i in range(0, n, origenes_por_tarea)]
+    if procesos == 1:
+        resultados = (_evaluar_origenes(csr, lote, estaciones, rutas) for lote in lotes)
+    else:
+        resultados = _resultados_en_procesos(csr, lotes, estaciones, rutas, procesos)
+    # Los lotes se suman en orden, así el resultado no depende de qué proceso termina primero
+    aumento = desconectados = None
+    por_destino = np.zeros(n, dtype=np.int64)
+    por_origen = []
+    for aumento_lote, desconectados_lote, llegadas, alcanzados in resultados:
+        if aumento is None:
+            aumento, desconectados = np.array(aumento_lote), np.array(desconectados_lote)
+        else:
+            aumento += aumento_lote
+            desconectados += desconectados_lote
+        por_destino += llegadas
+        por_origen.extend(alcanzados)
+    por_destino -= 1  # Cada estación cuenta su propio árbol
+    total = sum(por_origen)
+
+    elementos, pares_base = [], []
+    if estaciones:
+        for x in range(n):
+            elementos.append(csr.nombres[x])
+            pares_base.append(total - por_origen[x] - int(por_destino[x]))
+    if rutas:
+        for u in range(n):
+            for e in range(csr.offsets[u], csr.offsets[u + 1]):
+                elementos.append((csr.nombres[u], csr.nombres[csr.destinos[e]]))
+                pares_base.append(total)
+
+    ranking = [
+        (elemento, float(aumento[i]) / pares if pares else 0.0, int(desconectados[i]))
+        for i, (elemento, pares) in enumerate(zip(elementos, pares_base))
+    ]
+    ranking.sort(key=lambda impacto: (impacto[2], impacto[1]), reverse=True)
+    return ranking
+
+
+def _resultados_en_procesos(csr: GrafoCSR, lotes, estaciones: bool, rutas: bool, procesos: int):
+    """
+    Evalúa los lotes de orígenes en un pool de procesos y entrega sus resultados en el orden de los
+    lotes, enviando como mucho dos tareas por proceso a la vez (así solo hay unos pocos
+    acumuladores por falla en memoria).
+    """
+    with pool_de_red(csr, procesos) as enviar:
+        pendientes = deque()
+        for lote in lotes:
+            pendientes.append(enviar(_evaluar_origenes, lote, estaciones, rutas))
+            if len(pendientes) >= 2 * procesos:
+                yield pendientes.popleft().result()
+        while pendientes:
+            yield pendientes.popleft().result()
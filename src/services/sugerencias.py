@@ -3,32 +3,46 @@ Módulo que implementa la sugerencia de nuevas conexiones en la red de transport
 """
 
 from src.model.grafo import Grafo
-from src.services.dijkstra import camino_corto
-from src.model.ruta import Ruta
+from src.model.grafo_csr import entero_si_exacto
+from src.services.distancias import MatrizDistancias, beneficio_conexion, calcular_matriz_distancias
 
-def sugerir_conexiones(grafo: Grafo, presupuesto: float):
+def evaluar_conexiones(grafo: Grafo, presupuesto: float, matriz: MatrizDistancias = None):
     """
-    Sugiere nuevas conexiones directas entre pares de estaciones donde el tiempo actual excede el presupuesto.
-    Solo sugiere si la conexión directa reduciría el tiempo promedio entre estaciones.
-    Retorna una lista de tuplas (origen, destino, tiempo_actual).
+    Evalúa cada conexión directa candidata (pares sin ruta directa cuyo tiempo actual excede el presupuesto)
+    simulando una ruta nueva con peso igual al presupuesto, sin modificar el grafo.
+    Se puede pasar una matriz de distancias ya calculada para reutilizarla entre llamadas.
+    Retorna una lista de tuplas (origen, destino, tiempo_actual, pares_conectados, reduccion_promedio),
+    ordenada de mayor a menor beneficio: primero los pares que pasarían a estar conectados y luego
+    la reducción del tiempo promedio entre estaciones (en minutos por par).
     """
-    sugerencias = []
+    if matriz is None:
+        matriz = calcular_matriz_distancias(grafo)
     estaciones = grafo.obtener_estaciones()
-    for i, origen in enumerate(estaciones):
+    n = len(estaciones)
+    indice = matriz.indice
+    evaluaciones = []
+    for origen in estaciones:
+        u = indice[origen.nombre]
+        # Estaciones con ruta directa desde el origen
+        directos = {ruta.dest for ruta in grafo.obtener_vecinos(origen)}
         for destino in estaciones:
-            if origen == destino:
+            if origen == destino or destino in directos:
                 continue
-            # Verifica si ya existe una ruta directa
-            if any(ruta.dest == destino for ruta in grafo.obtener_vecinos(origen)):
-                continue
-            camino, tiempo_actual = camino_corto(grafo, origen, destino)
+            v = indice[destino.nombre]
+            tiempo_actual = entero_si_exacto(float(matriz.d[u, v]))
             if tiempo_actual > presupuesto:
-                # Simula agregar una conexión directa con peso igual al presupuesto
-                grafo.añadir_ruta(Ruta(origen, destino, presupuesto))
-                nuevo_camino, tiempo_nuevo = camino_corto(grafo, origen, destino)
-                # Solo sugiere si el tiempo mejora
-                if tiempo_nuevo < tiempo_actual:
-                    sugerencias.append((origen, destino, tiempo_actual))
-                # Quita la ruta simulada
-                grafo.eliminar_ruta(Ruta(origen, destino, presupuesto))
-    return sugerencias
+                pares_conectados, ahorro = beneficio_conexion(matriz, u, v, presupuesto)
+                evaluaciones.append((origen, destino, tiempo_actual, pares_conectados, ahorro / (n * (n - 1))))
+    evaluaciones.sort(key=lambda x: (-x[3], -x[4]))
+    return evaluaciones
+
+def sugerir_conexiones(grafo: Grafo, presupuesto: float, matriz: MatrizDistancias = None):
+    """
+    Sugiere nuevas conexiones directas entre pares de estaciones donde el tiempo actual excede el presupuesto.
+    Las sugerencias vienen ordenadas por cuánto reducen el tiempo promedio entre estaciones.
+    Retorna una lista de tuplas (origen, destino, tiempo_actual).
+    """
+    return [
+        (origen, destino, tiempo_actual)
+        for origen, destino, tiempo_actual, _, _ in evaluar_conexiones(grafo, presupuesto, matriz)
+    ]
@@ -0,0 +1,48 @@
+"""
+Módulo que implementa los pools de procesos que comparten la red como instantánea binaria (mmap).
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager, nullcontext
+
+from src.model.grafo_csr import GrafoCSR
+from src.model.snapshot import abrir_snapshot, snapshot_temporal
+
+# Instantánea de cada proceso trabajador (abierta con mmap una sola vez por proceso)
+_csr_trabajador = None
+
+
+def _iniciar_trabajador(ruta_snapshot: str):
+    """
+    Inicializador de los procesos: abre la instantánea sin copiarla.
+    """
+    global _csr_trabajador
+    _csr_trabajador = abrir_snapshot(ruta_snapshot, verificar=False)
+
+
+def _ejecutar(funcion, *args):
+    """
+    Tarea de un proceso trabajador: funcion(instantánea, *args).
+    """
+    return funcion(_csr_trabajador, *args)
+
+
+@contextmanager
+def pool_de_red(csr: GrafoCSR, procesos: int, ruta_snapshot: str = None):
+    """
+    Pool de procesos que abren la red una sola vez por proceso como instantánea binaria con mmap,
+    en lugar de recibirla serializada en cada tarea.
+    Si 'ruta_snapshot' es la instantánea de 'csr' ya escrita, se usa esa; si no, se escribe una temporal.
+    Entrega una función enviar(funcion, *args) que ejecuta funcion(csr, *args) en un proceso
+    trabajador y devuelve su Future ('funcion' debe estar definida a nivel de módulo).
+    Al salir se cancelan las tareas pendientes (p. ej. si se deja de iterar un generador) y se
+    borra la instantánea temporal.
+    """
+    instantanea = snapshot_temporal(csr) if ruta_snapshot is None else nullcontext(ruta_snapshot)
+    with instantanea as ruta:
+        with ProcessPoolExecutor(max_workers=procesos, initializer=_iniciar_trabajador,
+                                 initargs=(ruta,)) as ejecutor:
+            try:
+                yield lambda funcion, *args: ejecutor.submit(_ejecutar, funcion, *args)
+            finally:
+                ejecutor.shutdown(cancel_futures=True)
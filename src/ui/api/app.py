@@ -0,0 +1,380 @@
+"""
+Módulo que implementa la API JSON (ASGI) de la red de transporte urbano.
+
+Se sirve con un servidor ASGI, p. ej.: uvicorn src.ui.api.app:app
+Los algoritmos se ejecutan en un pool de procesos para no bloquear el bucle de eventos: cada
+versión publicada de la red se escribe una vez como instantánea binaria y los procesos la abren
+con mmap (src/model/snapshot.py), en lugar de recibir el grafo serializado en cada consulta.
+"""
+
+import asyncio
+import multiprocessing
+import os
+import shutil
+import tempfile
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import asynccontextmanager
+
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+from src.model.estado import EstadoRed, InstantaneaRed
+from src.model.snapshot import abrir_snapshot, cargar_con_snapshot, guardar_snapshot
+from src.services.actualizacion import simular_congestion
+from src.services.cache_caminos import CacheCaminos
+from src.services.ciclos import enumerar_ciclos
+from src.services.conectividad import componentes_fuertemente_conexas
+from src.services.k_caminos import k_caminos_mas_rapidos
+from src.services.sugerencias import sugerir_conexiones
+
+RUTA_DATOS = "data/red_ejemplo.json"
+RUTA_SNAPSHOT = "data/red_ejemplo.csr"
+# Límites de las consultas costosas
+K_MAX = 50
+CICLOS_MAX = 1000
+# Instantáneas de versiones anteriores que se conservan para consultas que aún las usan
+VERSIONES_EN_DISCO = 8
+
+# Estado de cada proceso trabajador: la última versión abierta y su caché de árboles
+_red_trabajador = None
+_cache_trabajador = CacheCaminos()
+
+
+def cargar_grafo():
+    """
+    Carga la red de ejemplo (desde la instantánea binaria si está al día con el JSON).
+    """
+    return cargar_con_snapshot(RUTA_DATOS, RUTA_SNAPSHOT)
+
+
+def _abrir_version(ruta_snapshot: str, version: int) -> InstantaneaRed:
+    """
+    Devuelve la versión pedida de la red en el proceso trabajador, abriéndola solo si cambió.
+    """
+    global _red_trabajador
+    red = _red_trabajador
+    if red is None or red.version != version:
+        csr = abrir_snapshot(ruta_snapshot, verificar=False)
+        red = InstantaneaRed(csr, [csr.estacion(i) for i in range(csr.num_estaciones())], version)
+        _red_trabajador = red
+    return red
+
+
+def _tarea_trabajador(tarea, ruta_snapshot: str, version: int, *args):
+    """
+    Ejecuta una tarea en un proceso trabajador sobre la versión indicada de la red.
+    """
+    return tarea(_abrir_version(ruta_snapshot, version), *args)
+
+
+def _nombres(camino):
+    """
+    Convierte un camino (lista de Estacion) en la lista de sus nombres.
+    """
+    return [estacion.nombre for estacion in camino]
+
+
+def _tiempo(tiempo):
+    """
+    Convierte un tiempo a un valor JSON (null si no hay camino).
+    """
+    return None if tiempo == float("inf") else tiempo
+
+
+def _tarea_camino(red, origen: str, destino: str) -> dict:
+    """
+    Camino más corto entre dos estaciones (con la caché de árboles del proceso).
+    """
+    camino, tiempo = _cache_trabajador.camino_corto(red, red.encontrar_estacion(origen), red.encontrar_estacion(destino))
+    return {"camino": _nombres(camino) if camino else None, "tiempo": _tiempo(tiempo)}
+
+
+def _tarea_k_caminos(red, origen: str, destino: str, k: int) -> dict:
+    """
+    Hasta k caminos más rápidos entre dos estaciones.
+    """
+    caminos = k_caminos_mas_rapidos(red, red.encontrar_estacion(origen), red.encontrar_estacion(destino), k)
+    return {"caminos": [{"camino": _nombres(camino), "tiempo": tiempo} for camino, tiempo in caminos]}
+
+
+def _tarea_componentes(red) -> dict:
+    """
+    Componentes fuertemente conexas y sus sumideros.
+    """
+    componentes = componentes_fuertemente_conexas(red)
+    return {
+        "fuertemente_conexa": len(componentes) == 1,
+        "componentes": componentes.miembros,
+        "sumideros": componentes.sumideros(),
+    }
+
+
+def _tarea_ciclos(red, longitud_max, limite: int) -> dict:
+    """
+    Hasta 'limite' ciclos simples (de longitud acotada si se indica).
+    """
+    ciclos = []
+    for ciclo in enumerar_ciclos(red, longitud_max):
+        if len(ciclos) >= limite:
+            return {"ciclos": ciclos, "completo": False}
+        ciclos.append(_nombres(ciclo))
+    return {"ciclos": ciclos, "completo": True}
+
+
+def _tarea_sugerencias(red, presupuesto: float) -> dict:
+    """
+    Conexiones sugeridas para el presupuesto de tiempo dado.
+    """
+    return {"sugerencias": [
+        {"origen": origen.nombre, "destino": destino.nombre, "tiempo_actual": tiempo}
+        for origen, destino, tiempo in sugerir_conexiones(red, presupuesto)
+    ]}
+
+
+class ServicioRed:
+    """
+    Estado de la API: la red compartida (EstadoRed) y el pool que ejecuta las consultas.
+    - procesos=None usa tantos procesos como CPUs; procesos=0 ejecuta las consultas en hilos del
+      propio proceso (útil para pruebas y redes pequeñas).
+    """
+
+    def __init__(self, cargar=cargar_grafo, procesos: int = None):
+        """
+        Inicializa el servicio con la función que carga la red y la cantidad de procesos.
+        """
+        self.estado = EstadoRed(cargar)
+        self.procesos = procesos
+        self._pool = None
+        self._directorio = None
+        self._archivos = OrderedDict()  # versión -> ruta de su instantánea, de menos a más usada
+        self._en_uso = {}  # versión -> tareas en curso que usan su instantánea
+        self._lock_archivos = threading.Lock()
+
+    def iniciar(self):
+        """
+        Crea el pool de procesos y el directorio de instantáneas.
+        """
+        if self.procesos != 0:
+            self._directorio = tempfile.mkdtemp(prefix="red_api_")
+            # "spawn": el servidor ya tiene hilos, así que no se hace fork del proceso
+            self._pool = ProcessPoolExecutor(max_workers=self.procesos, mp_context=multiprocessing.get_context("spawn"))
+
+    def cerrar(self):
+        """
+        Detiene el pool y borra las instantáneas escritas.
+        """
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True)
+            self._pool = None
+        if self._directorio is not None:
+            shutil.rmtree(self._directorio, ignore_errors=True)
+            self._directorio = None
+            self._archivos = OrderedDict()
+            self._en_uso = {}
+
+    def _adquirir_archivo(self, red: InstantaneaRed) -> str:
+        """
+        Devuelve la ruta de la instantánea de la versión, escribiéndola la primera vez, y la marca
+        en uso hasta que se llame a _liberar_archivo: mientras tanto no se borra.
+        """
+        with self._lock_archivos:
+            ruta = self._archivos.get(red.version)
+            if ruta is None:
+                ruta = os.path.join(self._directorio, f"{red.version}.csr")
+                guardar_snapshot(red.a_csr(), ruta)
+                self._archivos[red.version] = ruta
+            else:
+                self._archivos.move_to_end(red.version)
+            self._en_uso[red.version] = self._en_uso.get(red.version, 0) + 1
+            self._depurar_archivos()
+            return ruta
+
+    def _liberar_archivo(self, version: int):
+        """
+        Indica que terminó una tarea que usaba la instantánea de la versión.
+        """
+        with self._lock_archivos:
+            self._en_uso[version] -= 1
+            if not self._en_uso[version]:
+                del self._en_uso[version]
+            self._depurar_archivos()
+
+    def _depurar_archivos(self):
+        """
+        Mientras haya más de VERSIONES_EN_DISCO instantáneas, borra las usadas hace más tiempo que no
+        tengan tareas en curso (una versión reutilizada, como la de una franja horaria, cuenta como
+        usada recientemente aunque su número sea viejo). Requiere el lock.
+        """
+        sobrantes = len(self._archivos) - VERSIONES_EN_DISCO
+        for version in list(self._archivos):
+            if sobrantes <= 0:
+                break
+            if version not in self._en_uso:
+                os.remove(self._archivos.pop(version))
+                sobrantes -= 1
+
+    async def ejecutar(self, tarea, *args):
+        """
+        Ejecuta tarea(red, *args) sobre la versión actual de la red fuera del bucle de eventos.
+        """
+        red = self.estado.actual()
+        if self._pool is None:
+            return await asyncio.to_thread(tarea, red, *args)
+        ruta = await asyncio.to_thread(self._adquirir_archivo, red)
+        try:
+            bucle = asyncio.get_running_loop()
+            return await bucle.run_in_executor(self._pool, _tarea_trabajador, tarea, ruta, red.version, *args)
+        finally:
+            self._liberar_archivo(red.version)
+
+
+def _error(mensaje: str, estado: int = 400) -> JSONResponse:
+    """
+    Respuesta JSON de error.
+    """
+    return JSONResponse({"error": mensaje}, status_code=estado)
+
+
+def _estaciones_validas(red, *nombres):
+    """
+    Devuelve una respuesta de error si falta alguna estación o no existe en la red, si no None.
+    """
+    if not all(nombres):
+        return _error("Se requieren los parámetros 'origen' y 'destino'")
+    desconocidas = [nombre for nombre in nombres if nombre not in red.a_csr().indice]
+    if desconocidas:
+        return _error(f"Estaciones desconocidas: {', '.join(desconocidas)}", 404)
+    return None
+
+
+def _numero(parametros, nombre: str, tipo, defecto):
+    """
+    Lee un parámetro numérico de la consulta; lanza ValueError si no es válido.
+    """
+    valor = parametros.get(nombre)
+    return defecto if valor in (None, "") else tipo(valor)
+
+
+def crear_app(cargar=cargar_grafo, procesos: int = None) -> Starlette:
+    """
+    Crea la aplicación ASGI con sus rutas. El pool de procesos vive mientras vive la aplicación.
+    """
+    servicio = ServicioRed(cargar, procesos)
+
+    @asynccontextmanager
+    async def ciclo_de_vida(app):
+        servicio.iniciar()
+        try:
+            yield
+        finally:
+            servicio.cerrar()
+
+    async def camino(request):
+        origen, destino = request.query_params.get("origen"), request.query_params.get("destino")
+        error = _estaciones_validas(servicio.estado.actual(), origen, destino)
+        if error:
+            return error
+        return JSONResponse(await servicio.ejecutar(_tarea_camino, origen, destino))
+
+    async def k_caminos(request):
+        origen, destino = request.query_params.get("origen"), request.query_params.get("destino")
+        error = _estaciones_validas(servicio.estado.actual(), origen, destino)
+        if error:
+            return error
+        try:
+            k = _numero(request.query_params, "k", int, 3)
+        except ValueError:
+            return _error("'k' debe ser un entero")
+        if not 1 <= k <= K_MAX:
+            return _error(f"'k' debe estar entre 1 y {K_MAX}")
+        return JSONResponse(await servicio.ejecutar(_tarea_k_caminos, origen, destino, k))
+
+    async def componentes(request):
+        return JSONResponse(await servicio.ejecutar(_tarea_componentes))
+
+    async def ciclos(request):
+        try:
+            longitud_max = _numero(request.query_params, "longitud_max", int, None)
+            limite = min(_numero(request.query_params, "limite", int, 100), CICLOS_MAX)
+        except ValueError:
+            return _error("'longitud_max' y 'limite' deben ser enteros")
+        if limite < 1:
+            return _error("'limite' debe ser al menos 1")
+        if longitud_max is not None and longitud_max < 1:
+            return _error("'longitud_max' debe ser al menos 1")
+        return JSONResponse(await servicio.ejecutar(_tarea_ciclos, longitud_max, limite))
+
+    async def sugerencias(request):
+        try:
+            presupuesto = _numero(request.query_params, "presupuesto", float, 12)
+        except ValueError:
+            return _error("'presupuesto' debe ser un número")
+        return JSONResponse(await servicio.ejecutar(_tarea_sugerencias, presupuesto))
+
+    async def congestion(request):
+        try:
+            datos = await request.json()
+        except ValueError:
+            datos = {}
+        if not isinstance(datos, dict):
+            return _error("El cuerpo debe ser un objeto JSON")
+        if "hora" in datos:
+            hora = datos["hora"]
+            if not isinstance(hora, int) or not 0 <= hora < 24:
+                return _error("'hora' debe ser un entero entre 0 y 23")
+            actual = await asyncio.to_thread(servicio.estado.activar_hora, hora)
+            return JSONResponse({"version": actual.version, "hora": hora})
+        try:
+            porcentaje = float(datos.get("porcentaje", 0.3))
+            factor_min = float(datos.get("factor_min", 1.2))
+            factor_max = float(datos.get("factor_max", 2.0))
+        except (TypeError, ValueError):
+            return _error("'porcentaje', 'factor_min' y 'factor_max' deben ser números")
+        if not 0 < porcentaje <= 1 or factor_min > factor_max:
+            return _error("Parámetros de congestión inválidos")
+        afectadas = await asyncio.to_thread(
+            servicio.estado.modificar_pesos,
+            lambda grafo: simular_congestion(grafo, factor_min, factor_max, porcentaje),
+        )
+        return JSONResponse({
+            "version": servicio.estado.actual().version,
+            "afectadas": [
+                {"origen": origen, "destino": destino, "peso_anterior": anterior, "peso": nuevo}
+                for origen, destino, anterior, nuevo in afectadas
+            ],
+        })
+
+    async def reiniciar(request):
+        await asyncio.to_thread(servicio.estado.reiniciar)
+        return JSONResponse({"version": servicio.estado.actual().version})
+
+    async def red(request):
+        actual = servicio.estado.actual()
+        csr = actual.a_csr()
+        rutas = [
+            {"origen": csr.nombres[u], "destino": csr.nombres[csr.destinos[e]], "peso": csr.pesos[e]}
+            for u in range(csr.num_estaciones())
+            for e in range(csr.offsets[u], csr.offsets[u + 1])
+        ]
+        return JSONResponse({"version": actual.version, "estaciones": list(csr.nombres), "rutas": rutas})
+
+    rutas = [
+        Route("/api/camino", camino),
+        Route("/api/k_caminos", k_caminos),
+        Route("/api/componentes", componentes),
+        Route("/api/ciclos", ciclos),
+        Route("/api/sugerencias", sugerencias),
+        Route("/api/congestion", congestion, methods=["POST"]),
+        Route("/api/reiniciar", reiniciar, methods=["POST"]),
+        Route("/api/red", red),
+    ]
+    app = Starlette(routes=rutas, lifespan=ciclo_de_vida)
+    app.state.servicio = servicio
+    return app
+
+
+# La cantidad de procesos se puede fijar con la variable de entorno RED_API_PROCESOS (0 = hilos)
+app = crear_app(procesos=int(os.environ["RED_API_PROCESOS"]) if os.environ.get("RED_API_PROCESOS") else None)
@@ -6,153 +6,71 @@ ver los k caminos más rápidos y sugerir nuevas conexiones.
 
 # Importaciones de librerías y módulos necesarios
 from flask import Flask, Response, render_template_string, request
-import io
-import matplotlib.pyplot as plt
-import networkx as nx
 import json
+import os
+import networkx as nx
 from src.model.grafo import Grafo
-from src.model.estacion import Estacion
-from src.model.ruta import Ruta
-from src.services.dijkstra import camino_corto
-from src.services.actualizacion import simular_congestion, aplicar_congestion_por_hora
+from src.model.snapshot import cargar_con_snapshot
+from src.model.estado import EstadoRed
+from src.services.actualizacion import simular_congestion
 from src.services.sugerencias import sugerir_conexiones
-import heapq
-
-def k_caminos_mas_rapidos(grafo, origen, destino, k=3):
-    """
-    Devuelve hasta k caminos más cortos (por tiempo) entre origen y destino usando una variante de Yen's algorithm.
-    Cada camino es una lista de estaciones.
-
-    Explicación:
-    - Para cada camino encontrado previamente, se exploran "desviaciones" (spur paths) en cada nodo intermedio.
-    - 'spur_node' es el nodo donde se fuerza la desviación respecto a los caminos anteriores.
-    - 'root_path' es la parte inicial del camino hasta 'spur_node' (inclusive).
-    - Se eliminan temporalmente aristas y nodos para forzar nuevas rutas alternativas desde 'spur_node' a destino.
-    - Así se generan candidatos a nuevos caminos, que luego se ordenan por costo.
-    """
-    import copy
-    from collections import deque
-
-    def dijkstra_path(grafo, inicio, fin):
-        """
-        Algoritmo de Dijkstra para obtener el camino más corto y su costo.
-        """
-        distances = {node: float("inf") for node in grafo.obtener_estaciones()}
-        anterior = {node: None for node in grafo.obtener_estaciones()}
-        distances[inicio] = 0
-        heap = [(0, inicio)]
-        while heap:
-            distancia_actual, current = heapq.heappop(heap)
-            if current == fin:
-                break
-            for vecino in grafo.obtener_vecinos(current):
-                peso = vecino.peso
-                nodo_vecino = vecino.dest
-                tentativa = distances[current] + peso
-                if tentativa < distances[nodo_vecino]:
-                    distances[nodo_vecino] = tentativa
-                    anterior[nodo_vecino] = current
-                    heapq.heappush(heap, (tentativa, nodo_vecino))
-        # reconstruir camino
-        camino = []
-        actual = fin
-        while actual is not None:
-            camino.insert(0, actual)
-            actual = anterior[actual]
-        if distances[fin] == float("inf"):
-            return None, float("inf")
-        return camino, distances[fin]
-
-    caminos = []
-    costos = []
-    # Primer camino más corto
-    primer_camino, primer_costo = dijkstra_path(grafo, origen, destino)
-    if not primer_camino or len(primer_camino) < 2:
-        return []
-    caminos.append(primer_camino)
-    costos.append(primer_costo)
-    candidatos = []
-    # Búsqueda de los siguientes k-1 caminos más cortos
-    for k_actual in range(1, k):
-        # Para cada nodo intermedio del último camino encontrado
-        for i in range(len(caminos[-1]) - 1):
-            grafo_temp = copy.deepcopy(grafo)
-            spur_node = caminos[-1][i]
-            root_path = caminos[-1][:i+1]
-            # Elimina aristas que ya están en los caminos previos con el mismo root_path
-            for camino_prev in caminos:
-                if len(camino_prev) > i and camino_prev[:i+1] == root_path:
-                    u = camino_prev[i]
-                    v = camino_prev[i+1]
-                    rutas_a_eliminar = [ruta for ruta in grafo_temp.obtener_vecinos(u) if ruta.dest == v]
-                    for ruta in rutas_a_eliminar:
-                        grafo_temp.eliminar_ruta(ruta)
-            # Elimina nodos del root_path excepto spur_node
-            for nodo in root_path[:-1]:
-                grafo_temp.eliminar_estacion(nodo)
-            spur_path, spur_cost = dijkstra_path(grafo_temp, spur_node, destino)
-            if spur_path and len(spur_path) > 1:
-                total_path = root_path[:-1] + spur_path
-                if total_path not in caminos and all([total_path != c for c, _ in candidatos]):
-                    total_cost = 0
-                    for j in range(len(total_path)-1):
-                        for ruta in grafo.obtener_vecinos(total_path[j]):
-                            if ruta.dest == total_path[j+1]:
-                                total_cost += ruta.peso
-                                break
-                    candidatos.append((total_path, total_cost))
-        if not candidatos:
-            break
-        candidatos.sort(key=lambda x: x[1])
-        caminos.append(candidatos[0][0])
-        costos.append(candidatos[0][1])
-        candidatos.pop(0)
-    return list(zip(caminos, costos))
+from src.services.cache_caminos import CacheCaminos
+from src.services.k_caminos import k_caminos_mas_rapidos
+from src.services.dijkstra import filas_distancias_csr
+from src.services.conectividad import componentes_fuertemente_conexas
+from src.services.isocronas import isocrona
+from src.ui.web_app.render import RenderizadorRed, color_isocrona
 
 # Inicializa la aplicación Flask
 app = Flask(__name__)
 
-# --- GRAFO GLOBAL PARA MANTENER EL ESTADO ENTRE PETICIONES ---
-grafo_global = None
+# Caché de árboles de caminos más cortos, invalidada por la versión del grafo
+cache_caminos = CacheCaminos()
+# Máximo de caminos alternativos que se pueden pedir desde la interfaz
+K_MAX = 50
+# Máximo de procesos que puede pedir una consulta por lotes (/api/distancias)
+PROCESOS_MAX = os.cpu_count() or 1
+# Posiciones fijas de las estaciones en la imagen de la red
+POSICIONES = {
+    "Estacion Central": (0, 0),
+    "Plaza Norte": (0.2, 1.5),
+    "Terminal Sur": (1, -0.6),
+    "Estacion Este": (1.5, 2),
+    "Estacion Oeste": (0.3, -2),
+    "Intercambiador": (3.2, -2),
+    "Parque Central": (3, 0),
+    "Universidad": (4, 2),
+    "Hospital": (4, 0),
+    "Aeropuerto": (5, 1)
+}
+# Imágenes de la red en caché por versión y camino resaltado
+renderizador_red = RenderizadorRed(POSICIONES)
+# Datos de la red; si existe la instantánea binaria actualizada se usa en lugar del JSON
+RUTA_DATOS = "data/red_ejemplo.json"
+RUTA_SNAPSHOT = "data/red_ejemplo.csr"
 
 def cargar_grafo():
     """
-    Carga el grafo desde el archivo JSON de ejemplo.
+    Carga el grafo desde la instantánea binaria (src/model/snapshot.py) si está al día con el
+    archivo JSON de ejemplo, o desde el JSON en caso contrario.
     """
-    grafo = Grafo()
-    # Lee el archivo de datos de la red
-    with open("data/red_ejemplo.json") as archivo:
-        datos = json.load(archivo)
-        estaciones = [estacion for estacion in (datos["estaciones"])]
-        rutas = [ruta for ruta in datos["rutas"]]
-    # Agrega estaciones
-    for estacion in estaciones:
-        estacion_obj = Estacion(estacion)
-        grafo.añadir_estacion(estacion_obj)
-    # Agrega rutas
-    for ruta in rutas:
-        origen = grafo.nombre_a_estacion[ruta["origen"]]
-        destino = grafo.nombre_a_estacion[ruta["destino"]]
-        peso = ruta["peso"]
-        ruta_obj = Ruta(origen, destino, peso)
-        grafo.añadir_ruta(ruta_obj)
-    return grafo
+    return cargar_con_snapshot(RUTA_DATOS, RUTA_SNAPSHOT)
+
+# --- ESTADO DE LA RED COMPARTIDO ENTRE PETICIONES ---
+# Las peticiones leen la versión publicada sin bloqueos; los cambios de pesos publican una versión nueva
+estado_red = EstadoRed(cargar_grafo)
 
 def get_grafo():
     """
-    Devuelve el grafo global, cargándolo si es necesario.
+    Devuelve la versión actual (inmutable) de la red, cargándola si es necesario.
     """
-    global grafo_global
-    if grafo_global is None:
-        grafo_global = cargar_grafo()
-    return grafo_global
+    return estado_red.actual()
 
 def reset_grafo():
     """
-    Restablece el grafo global a su estado original desde el archivo.
+    Restablece la red a su estado original desde el archivo.
     """
-    global grafo_global
-    grafo_global = cargar_grafo()
+    estado_red.reiniciar()
 
 def grafo_a_networkx(grafo: Grafo):
     """
@@ -200,12 +118,18 @@ def index():
     k_sel = 1
     sugerencias = []
     presupuesto_sel = 12
+    componentes = None
+    isocrona_sel = None
+    minutos_sel = 15
+    error_isocrona = None
+    alcanzadas = None
 
     # Manejo de formularios POST
     if request.method == "POST":
         if "simular_congestion" in request.form:
             # Simula congestión aleatoria
-            rutas_afectadas = simular_congestion(grafo, porcentaje=0.5)
+            rutas_afectadas = estado_red.modificar_pesos(lambda g: simular_congestion(g, porcentaje=0.5))
+            grafo = get_grafo()
         elif "reset" in request.form:
             # Restablece el grafo original
             reset_grafo()
@@ -213,13 +137,14 @@ def index():
         elif "aplicar_hora" in request.form:
             # Aplica congestión según la hora seleccionada
             hora_sel = int(request.form.get("hora", 8))
-            aplicar_congestion_por_hora(grafo, hora_sel)
+            # Perfil horario sobre los pesos base: cambiar de hora no acumula factores
+            grafo = estado_red.activar_hora(hora_sel)
             mensaje_hora = f"<b>Congestión aplicada para la hora seleccionada:</b> <span style='color:#16a085'>{hora_sel:02d}:00</span>"
         elif "mostrar_k_caminos" in request.form:
             # Muestra los k caminos más rápidos
             origen_sel = request.form.get("origen")
             destino_sel = request.form.get("destino")
-            k_sel = int(request.form.get("k", 1))
+            k_sel = min(int(request.form.get("k", 1)), K_MAX)
             if origen_sel and destino_sel and origen_sel != destino_sel:
                 origen_obj = grafo.encontrar_estacion(origen_sel)
                 destino_obj = grafo.encontrar_estacion(destino_sel)
@@ -228,6 +153,23 @@ def index():
             # Sugerir nuevas conexiones según presupuesto
             presupuesto_sel = int(request.form.get("presupuesto", 12))
             sugerencias = sugerir_conexiones(grafo, presupuesto_sel)
+        elif "componentes" in request.form:
+            # Descomposición en componentes fuertemente conexas
+            componentes = componentes_fuertemente_conexas(grafo)
+        elif "isocrona" in request.form:
+            # Estaciones alcanzables desde un origen en un tiempo dado
+            isocrona_sel = request.form.get("origen_isocrona")
+            try:
+                minutos = float(request.form.get("minutos", 15))
+            except ValueError:
+                minutos = -1
+            # Mismas validaciones que /isocrona (también descarta NaN)
+            if isocrona_sel not in grafo.a_csr().indice or not minutos >= 0:
+                error_isocrona = "Se esperan una estación de origen conocida y minutos >= 0"
+                isocrona_sel = None
+            else:
+                minutos_sel = int(minutos) if minutos.is_integer() else minutos
+                alcanzadas = isocrona(grafo, grafo.encontrar_estacion(isocrona_sel), minutos_sel)
         else:
             # Camino más corto estándar
             origen_sel = request.form.get("origen")
@@ -235,7 +177,7 @@ def index():
             if origen_sel and destino_sel and origen_sel != destino_sel:
                 origen_obj = grafo.encontrar_estacion(origen_sel)
                 destino_obj = grafo.encontrar_estacion(destino_sel)
-                camino, tiempo = camino_corto(grafo, origen_obj, destino_obj)
+                camino, tiempo = cache_caminos.camino_corto(grafo, origen_obj, destino_obj)
                 if camino is None:
                     camino = []
                     tiempo = None
@@ -384,7 +326,7 @@ def index():
                     <input type="hidden" name="destino" value="{{ destino_sel or '' }}">
                     <label for="k">Ver los</label>
                     <select name="k" id="k">
-                        {% for i in range(1,4) %}
+                        {% for i in range(1, k_max + 1) %}
                             <option value="{{ i }}" {% if k_sel == i %}selected{% endif %}>{{ i }}</option>
                         {% endfor %}
                     </select>
@@ -415,6 +357,26 @@ def index():
                     </select>
                     <button type="submit" name="sugerir_conexiones" value="1" style="background:#2980b9; color:#fff; margin-left:10px;">Sugerir conexiones</button>
                 </form>
+                <form method="post" style="display:inline;">
+                    <button type="submit" name="componentes" value="1" style="background:#34495e; color:#fff; margin-left:20px;">Analizar conectividad</button>
+                </form>
+                <form method="post" style="display:inline;">
+                    <label for="origen_isocrona">Alcanzable desde:</label>
+                    <select name="origen_isocrona" id="origen_isocrona" required>
+                        <option value="">Seleccione</option>
+                        {% for estacion in estaciones %}
+                            <option value="{{ estacion }}" {% if estacion == isocrona_sel %}selected{% endif %}>{{ estacion }}</option>
+                        {% endfor %}
+                    </select>
+                    <label for="minutos">en</label>
+                    <select name="minutos" id="minutos">
+                        {% for m in range(5, 61, 5) %}
+                            <option value="{{ m }}" {% if minutos_sel == m %}selected{% endif %}>{{ m }}</option>
+                        {% endfor %}
+                    </select>
+                    <label>minutos</label>
+                    <button type="submit" name="isocrona" value="1" style="background:#27ae60; color:#fff; margin-left:10px;">Mostrar isócrona</button>
+                </form>
             </div>
             {% if mensaje_hora %}
                 <div class="shortest-path" style="background:#e0f7fa; border-left:5px solid #16a085;">
@@ -441,6 +403,21 @@ def index():
                     </ul>
                 </div>
             {% endif %}
+            {% if componentes %}
+                <div class="shortest-path" style="background:#ecf0f1; border-left:5px solid #34495e;">
+                    {% if componentes|length == 1 %}
+                        <b>La red es fuertemente conexa.</b>
+                    {% else %}
+                        <b>La red tiene {{ componentes|length }} componentes fuertemente conexas</b>
+                        (tamaño: cantidad {% for tamano, cantidad in componentes.histograma().items() %}{{ tamano }}: {{ cantidad }}{% if not loop.last %}, {% endif %}{% endfor %})
+                        <ul>
+                        {% for c in range(componentes|length) %}
+                            <li>{{ componentes.miembros[c]|join(", ") }}{% if c in componentes.sumideros() %} <b>(sin salida al resto de la red)</b>{% endif %}</li>
+                        {% endfor %}
+                        </ul>
+                    {% endif %}
+                </div>
+            {% endif %}
             {% if caminos_k %}
                 <div class="shortest-path" style="background:#f3e6ff; border-left:5px solid #8e44ad;">
                     <b>Caminos más rápidos:</b>
@@ -462,8 +439,27 @@ def index():
                     <b>No hay camino entre las estaciones seleccionadas.</b>
                 </div>
             {% endif %}
+            {% if error_isocrona %}
+                <div class="shortest-path" style="background:#fdecea; border-left:5px solid #c0392b;">
+                    <b>{{ error_isocrona }}</b>
+                </div>
+            {% endif %}
+            {% if alcanzadas is not none %}
+                <div class="shortest-path" style="background:#eafaf1; border-left:5px solid #27ae60;">
+                    <b>Estaciones alcanzables desde {{ isocrona_sel }} en {{ minutos_sel }} minutos:</b>
+                    <ul>
+                    {% for estacion, minutos in alcanzadas.items() %}
+                        <li>{{ estacion.nombre }} <span style="color:#888;">({{ minutos }} min)</span></li>
+                    {% endfor %}
+                    </ul>
+                </div>
+            {% endif %}
             <div class="img-container">
-                <img src="/grafo.png?origen={{ origen_sel }}&destino={{ destino_sel }}" alt="Grafo de la red">
+                {% if alcanzadas is not none %}
+                    <img src="/isocrona?origen={{ isocrona_sel|urlencode }}&minutos={{ minutos_sel }}" alt="Isócrona de la red">
+                {% else %}
+                    <img src="/grafo.png?origen={{ origen_sel }}&destino={{ destino_sel }}" alt="Grafo de la red">
+                {% endif %}
             </div>
             <h2>Estaciones</h2>
             <ul>
@@ -506,8 +502,14 @@ def index():
         mensaje_hora=mensaje_hora,
         caminos_k=caminos_k,
         k_sel=k_sel,
+        k_max=K_MAX,
         sugerencias=sugerencias,
-        presupuesto_sel=presupuesto_sel
+        presupuesto_sel=presupuesto_sel,
+        componentes=componentes,
+        isocrona_sel=isocrona_sel,
+        minutos_sel=minutos_sel,
+        error_isocrona=error_isocrona,
+        alcanzadas=alcanzadas
     )
 
 @app.route("/ayuda")
@@ -587,6 +589,14 @@ def ayuda():
                     <li style="color:red;">Rojo: rutas lentas (&gt; 12 min)</li>
                     <li style="color:blue;">Azul: camino más corto seleccionado</li>
                 </ul>
+                <b>Colores de las estaciones en una isócrona:</b>
+                <ul>
+                    <li style="color:deepskyblue;">Celeste: estaciones de origen</li>
+                    <li style="color:limegreen;">Verde: se llega en el primer tercio del tiempo</li>
+                    <li style="color:gold;">Amarillo: se llega en el segundo tercio</li>
+                    <li style="color:orange;">Naranja: se llega en el último tercio</li>
+                    <li style="color:lightgray;">Gris: no se llega en el tiempo indicado</li>
+                </ul>
             </div>
             <a href="/">← Volver al inicio</a>
         </div>
@@ -599,67 +609,115 @@ def ayuda():
 def mostrar_grafo():
     """
     Genera y retorna la imagen PNG del grafo actual, resaltando el camino más corto si corresponde.
+    La imagen sale de la caché de renderizador_red si ya se generó para esta versión y este camino,
+    y se responde 304 si el navegador ya la tiene (If-None-Match con el mismo ETag).
     """
-    grafo = get_grafo()  # Usar el grafo global, no cargar_grafo()
-    G = grafo_a_networkx(grafo)
-
-    # Posiciones fijas para las estaciones
-    pos = {
-        "Estacion Central": (0, 0),
-        "Plaza Norte": (0.2, 1.5),
-        "Terminal Sur": (1, -0.6),
-        "Estacion Este": (1.5, 2),
-        "Estacion Oeste": (0.3, -2),
-        "Intercambiador": (3.2, -2),
-        "Parque Central": (3, 0),
-        "Universidad": (4, 2),
-        "Hospital": (4, 0),
-        "Aeropuerto": (5, 1)
-    }
+    grafo = get_grafo()  # Versión publicada de la red, no cargar_grafo()
 
     # Obtener parámetros de la URL para resaltar el camino más corto
     origen = request.args.get("origen")
     destino = request.args.get("destino")
-    shortest_edges = []
-    if origen and destino and origen != destino and origen in G.nodes and destino in G.nodes:
-        # Usar el grafo global para buscar el camino más corto
-        origen_obj = grafo.encontrar_estacion(origen)
-        destino_obj = grafo.encontrar_estacion(destino)
-        camino, _ = camino_corto(grafo, origen_obj, destino_obj)
-        if camino and len(camino) > 1:
-            camino_nombres = [e.nombre for e in camino]
-            shortest_edges = [(camino_nombres[i], camino_nombres[i+1]) for i in range(len(camino_nombres)-1)]
+    nombres = grafo.a_csr().indice
+    if not (origen and destino and origen != destino and origen in nombres and destino in nombres):
+        origen = destino = None
 
-    # Dibuja el grafo usando networkx y matplotlib
-    plt.figure(figsize=(12, 9))
+    def camino():
+        # Solo se calcula si la imagen no está en caché
+        if origen is None:
+            return None
+        camino, _ = cache_caminos.camino_corto(grafo, grafo.encontrar_estacion(origen), grafo.encontrar_estacion(destino))
+        return camino
 
-    # Obtener pesos y asignar colores a las aristas
-    edges = G.edges(data=True)
-    edge_colors = []
-    for u, v, data in edges:
-        if (u, v) in shortest_edges:
-            edge_colors.append('blue')
-        else:
-            peso = data['weight']
-            if peso <= 7:
-                edge_colors.append('green')
-            elif peso <= 12:
-                edge_colors.append('orange')
-            else:
-                edge_colors.append('red')
+    png, etag = renderizador_red.imagen(grafo, camino, (origen, destino))
+    if request.if_none_match.contains(etag):
+        respuesta = Response(status=304)
+    else:
+        # Devuelve la imagen como respuesta HTTP
+        respuesta = Response(png, mimetype='image/png')
+    respuesta.set_etag(etag)
+    return respuesta
 
-    # Dibuja nodos y aristas
-    nx.draw(
-        G, pos, with_labels=True, node_color='lightblue', node_size=2000,
-        font_size=10, arrowsize=20, edge_color=edge_colors, width=2
-    )
-    # Dibuja etiquetas de los pesos
-    labels = nx.get_edge_attributes(G, 'weight')
-    nx.draw_networkx_edge_labels(G, pos, edge_labels=labels)
-    # Guarda la imagen en un buffer
-    buf = io.BytesIO()
-    plt.savefig(buf, format="png")
-    plt.close()
-    buf.seek(0)
-    # Devuelve la imagen como respuesta HTTP
-    return Response(buf.getvalue(), mimetype='image/png')
+@app.route("/isocrona")
+def mostrar_isocrona():
+    """
+    Isócrona: estaciones alcanzables en 'minutos' desde uno o varios 'origen' (se puede repetir el
+    parámetro, p. ej. todas las estaciones de una línea). Devuelve el PNG de la red con las
+    estaciones pintadas por tiempo de llegada (gris las que no se alcanzan), con caché y ETag como
+    /grafo.png, o con formato=json la lista de {"estacion", "minutos"} ordenada por tiempo.
+    """
+    grafo = get_grafo()
+    origenes = sorted(set(request.args.getlist("origen")))
+    nombres = grafo.a_csr().indice
+    desconocidas = [nombre for nombre in origenes if nombre not in nombres]
+    try:
+        minutos = float(request.args.get("minutos", 15))
+    except ValueError:
+        minutos = -1
+    if not origenes or desconocidas or not minutos >= 0:
+        return Response(json.dumps({"error": "Se esperan estaciones de origen conocidas y minutos >= 0"}),
+                        status=400, mimetype="application/json")
+
+    def alcanzadas():
+        return isocrona(grafo, [grafo.encontrar_estacion(nombre) for nombre in origenes], minutos)
+
+    if request.args.get("formato") == "json":
+        datos = [{"estacion": e.nombre, "minutos": t} for e, t in alcanzadas().items()]
+        return Response(json.dumps(datos, ensure_ascii=False), mimetype="application/json")
+
+    def colores():
+        # Solo se calcula si la imagen no está en caché
+        colores = {nombre: 'lightgray' for nombre in nombres}
+        colores.update((e.nombre, color_isocrona(t, minutos)) for e, t in alcanzadas().items())
+        return colores
+
+    png, etag = renderizador_red.imagen(grafo, clave=("isocrona", tuple(origenes), minutos), colores_nodos=colores)
+    if request.if_none_match.contains(etag):
+        respuesta = Response(status=304)
+    else:
+        respuesta = Response(png, mimetype='image/png')
+    respuesta.set_etag(etag)
+    return respuesta
+
+def es_lista_de_nombres(valor) -> bool:
+    """
+    Indica si un valor recibido en JSON es una lista de nombres (cadenas).
+    """
+    return isinstance(valor, list) and all(isinstance(nombre, str) for nombre in valor)
+
+@app.route("/api/distancias", methods=["POST"])
+def api_distancias():
+    """
+    Consulta por lotes: recibe {"origenes": [...], "destinos": [...], "procesos": n} (nombres de
+    estación; sin "destinos" se usan todas; "procesos", de 1 a PROCESOS_MAX, reparte los orígenes
+    entre procesos que abren la red con mmap) y responde en NDJSON una línea por origen, enviada en
+    cuanto su fila está calculada: {"origen": ..., "tiempos": {destino: tiempo o null si no hay camino}}.
+    Un cuerpo que no es un objeto JSON o campos con otro tipo responden 400.
+    """
+    datos = request.get_json(silent=True)
+    grafo = get_grafo()  # Todas las filas se calculan sobre la misma versión de la red
+    csr = grafo.a_csr()
+    if isinstance(datos, dict):
+        origenes = datos.get("origenes") or []
+        destinos = datos.get("destinos") or list(csr.nombres)
+        procesos = datos.get("procesos", 1)
+    if (not isinstance(datos, dict) or not es_lista_de_nombres(origenes) or not es_lista_de_nombres(destinos)
+            or type(procesos) is not int or not 1 <= procesos <= PROCESOS_MAX):
+        mensaje = ('Se espera un objeto {"origenes": [nombres], "destinos": [nombres], '
+                   f'"procesos": 1 a {PROCESOS_MAX}}}')
+        return Response(json.dumps({"error": mensaje}, ensure_ascii=False), status=400, mimetype="application/json")
+    desconocidas = [nombre for nombre in origenes + destinos if nombre not in csr.indice]
+    if desconocidas:
+        return Response(json.dumps({"error": f"Estaciones desconocidas: {', '.join(desconocidas)}"}),
+                        status=400, mimetype="application/json")
+
+    def filas():
+        ids_destinos = [csr.id_de(nombre) for nombre in destinos]
+        ids_origenes = [csr.id_de(nombre) for nombre in origenes]
+        for i, tiempos, _ in filas_distancias_csr(csr, ids_origenes, ids_destinos, procesos=procesos):
+            linea = {
+                "origen": origenes[i],
+                "tiempos": {destino: (t if t != float("inf") else None) for destino, t in zip(destinos, tiempos)},
+            }
+            yield json.dumps(linea, ensure_ascii=False) + "\n"
+
+    return Response(filas(), mimetype="application/x-ndjson")
@@ -0,0 +1,144 @@
+"""
+Módulo que implementa el dibujo en PNG de la red para la interfaz web, con caché de imágenes.
+"""
+
+import hashlib
+import io
+import threading
+from collections import OrderedDict
+
+import networkx as nx
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+
+def color_ruta(peso) -> str:
+    """
+    Devuelve el color de una ruta según su tiempo: verde (<= 7), naranja (<= 12) o rojo.
+    """
+    if peso <= 7:
+        return 'green'
+    if peso <= 12:
+        return 'orange'
+    return 'red'
+
+
+def color_isocrona(tiempo, limite) -> str:
+    """
+    Devuelve el color de una estación de una isócrona: azul cielo si es un origen, y verde, amarillo
+    o naranja si se llega en el primer, segundo o último tercio del tiempo límite.
+    """
+    if tiempo == 0:
+        return 'deepskyblue'
+    if tiempo <= limite / 3:
+        return 'limegreen'
+    if tiempo <= 2 * limite / 3:
+        return 'gold'
+    return 'orange'
+
+
+class _Lienzo:
+    """
+    Figura ya dibujada de una topología: nodos, etiquetas, flechas y etiquetas de peso.
+    Para otra versión de los pesos o del camino resaltado solo se cambian colores y textos.
+    """
+
+    def __init__(self, nombres, rutas, pos):
+        """
+        Dibuja la red una vez con los mismos parámetros que nx.draw en una figura propia
+        (sin pyplot, que guarda figuras en un estado global).
+        """
+        G = nx.DiGraph()
+        G.add_nodes_from(nombres)
+        G.add_edges_from((origen, destino, {"weight": peso}) for origen, destino, peso in rutas)
+        self.figura = Figure(figsize=(12, 9))
+        FigureCanvasAgg(self.figura)
+        self.figura.set_facecolor("w")
+        ax = self.figura.add_axes((0, 0, 1, 1))
+        self.nombres = list(nombres)
+        self.nodos = nx.draw_networkx_nodes(G, pos, ax=ax, node_color='lightblue', node_size=2000)
+        self.colores_nodos = self.nodos.get_facecolor().copy()
+        colores = [color_ruta(peso) for _, _, peso in rutas]
+        self.flechas = nx.draw_networkx_edges(G, pos, ax=ax, arrows=None, node_size=2000, arrowsize=20,
+                                              edge_color=colores, width=2)
+        nx.draw_networkx_labels(G, pos, ax=ax, font_size=10)
+        ax.set_axis_off()
+        self.etiquetas = nx.draw_networkx_edge_labels(G, pos, ax=ax, edge_labels=nx.get_edge_attributes(G, 'weight'))
+
+    def png(self, rutas, resaltadas, colores_nodos=None) -> bytes:
+        """
+        Actualiza colores y pesos de las rutas (en el orden de la topología) y los colores de las
+        estaciones (diccionario nombre -> color; las que faltan van en celeste) y codifica la imagen.
+        """
+        if colores_nodos:
+            self.nodos.set_facecolor([colores_nodos.get(nombre, 'lightblue') for nombre in self.nombres])
+        else:
+            self.nodos.set_facecolor(self.colores_nodos)
+        for flecha, (origen, destino, peso) in zip(self.flechas, rutas):
+            flecha.set_color('blue' if (origen, destino) in resaltadas else color_ruta(peso))
+            self.etiquetas[(origen, destino)].set_text(str(peso))
+        buf = io.BytesIO()
+        self.figura.savefig(buf, format="png")
+        return buf.getvalue()
+
+
+class RenderizadorRed:
+    """
+    Genera el PNG de la red con caché de imágenes por (versión del grafo, camino resaltado):
+    - La figura con la parte fija (nodos y etiquetas) se construye una vez por topología; para cada
+      versión solo se cambian los colores de las flechas, los pesos y el camino resaltado.
+    - Las imágenes ya generadas se guardan en una caché LRU junto con su ETag (hash del contenido),
+      para responder 304 a los navegadores que ya la tienen.
+    Es segura entre hilos: la figura compartida se dibuja con un lock.
+    """
+
+    def __init__(self, pos, max_imagenes: int = 64):
+        """
+        Inicializa el renderizador con las posiciones de las estaciones y el tamaño de la caché.
+        """
+        self.pos = pos
+        self.max_imagenes = max_imagenes
+        self._imagenes = OrderedDict()  # (versión, clave del resaltado) -> (png, etag)
+        self._lienzo = None
+        self._topologia = None
+        self._lock = threading.Lock()
+
+    def imagen(self, grafo, camino=None, clave=None, colores_nodos=None):
+        """
+        Devuelve (png, etag) de la versión actual del grafo, con 'camino' (lista de Estacion) resaltado
+        y las estaciones pintadas según 'colores_nodos' (diccionario nombre -> color).
+        'clave' identifica el resaltado (p. ej. (origen, destino)); si ya hay una imagen para
+        (versión, clave), no se llama a 'camino' ni a 'colores_nodos': pueden ser funciones que los
+        calculan solo si hace falta.
+        """
+        clave = (grafo.version, clave)
+        with self._lock:
+            guardada = self._imagenes.get(clave)
+            if guardada is not None:
+                self._imagenes.move_to_end(clave)
+                return guardada
+            if callable(camino):
+                camino = camino()
+            if callable(colores_nodos):
+                colores_nodos = colores_nodos()
+            resaltadas = set()
+            if camino and len(camino) > 1:
+                nombres = [e.nombre for e in camino]
+                resaltadas = set(zip(nombres, nombres[1:]))
+            estaciones = grafo.obtener_estaciones()
+            rutas = [
+                (ruta.origen.nombre, ruta.dest.nombre, ruta.peso)
+                for estacion in estaciones
+                for ruta in grafo.obtener_vecinos(estacion)
+            ]
+            nombres = [e.nombre for e in estaciones]
+            topologia = (nombres, [(origen, destino) for origen, destino, _ in rutas])
+            if topologia != self._topologia:
+                self._lienzo = _Lienzo(nombres, rutas, self.pos)
+                self._topologia = topologia
+            png = self._lienzo.png(rutas, resaltadas, colores_nodos)
+            guardada = (png, hashlib.sha1(png).hexdigest())
+            self._imagenes[clave] = guardada
+            if len(self._imagenes) > self.max_imagenes:
+                self._imagenes.popitem(last=False)
+            return guardada
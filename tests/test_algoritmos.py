@@ -57,6 +57,23 @@ def test_sugerir_conexiones(grafo_simple):
     assert ("A", "C") in nombres
     assert ("C", "A") in nombres
 
+def test_indice_de_rutas():
+    grafo = _grafo_aleatorio(30, 80, 16)
+    estaciones = grafo.obtener_estaciones()
+    a = estaciones[0]
+    ruta = grafo.obtener_vecinos(a)[0]
+    assert grafo.obtener_ruta(a, ruta.dest) is ruta
+    with pytest.raises(Exception):
+        grafo.añadir_ruta(Ruta(a, ruta.dest, ruta.peso + 1))  # Solo una ruta por par
+    grafo.eliminar_estacion(a)
+    for estacion in grafo.obtener_estaciones():
+        assert grafo.obtener_ruta(estacion, a) is None
+        assert all(r.dest != a for r in grafo.obtener_vecinos(estacion))
+        for r in grafo.obtener_vecinos(estacion):
+            assert r in grafo.obtener_entrantes(r.dest)
+    assert sum(len(grafo.obtener_entrantes(e)) for e in grafo.obtener_estaciones()) == \
+        sum(len(grafo.obtener_vecinos(e)) for e in grafo.obtener_estaciones())
+
 def test_eliminar_estacion_y_ruta():
     grafo = Grafo()
     a = Estacion("A")
@@ -116,3 +133,1223 @@ def test_ruta_inexistente():
     camino, tiempo = camino_corto(grafo, a, b)
     assert camino is None or camino == []
     assert tiempo == float("inf")
+
+def _grafo_aleatorio(n, m, semilla):
+    import random
+    rnd = random.Random(semilla)
+    grafo = Grafo()
+    estaciones = [Estacion(f"E{i:03d}") for i in range(n)]
+    for e in estaciones:
+        grafo.añadir_estacion(e)
+    while sum(len(grafo.obtener_vecinos(e)) for e in estaciones) < m:
+        a, b = rnd.sample(estaciones, 2)
+        if not any(r.dest == b for r in grafo.obtener_vecinos(a)):
+            grafo.añadir_ruta(Ruta(a, b, rnd.randint(1, 5)))
+    return grafo
+
+def _camino_corto_referencia(grafo, inicio, destino):
+    # Dijkstra sobre los objetos del Grafo (la implementación original), como referencia
+    import heapq
+    distances = {node: float("inf") for node in grafo.obtener_estaciones()}
+    anterior = {node: None for node in grafo.obtener_estaciones()}
+    distances[inicio] = 0
+    visitados = set()
+    heap = [(0, inicio.nombre, inicio)]
+    while heap:
+        _, _, current = heapq.heappop(heap)
+        if current in visitados:
+            continue
+        visitados.add(current)
+        if current == destino:
+            break
+        for vecino in grafo.obtener_vecinos(current):
+            tentativa = distances[current] + vecino.peso
+            if tentativa < distances[vecino.dest]:
+                distances[vecino.dest] = tentativa
+                anterior[vecino.dest] = current
+                heapq.heappush(heap, (tentativa, vecino.dest.nombre, vecino.dest))
+    if distances[destino] == float("inf"):
+        return None, float("inf")
+    camino, actual = [], destino
+    while actual is not None:
+        camino.insert(0, actual)
+        actual = anterior[actual]
+    return camino, distances[destino]
+
+def test_csr_resultados_identicos():
+    from src.services.ciclos import hay_ciclo_csr
+    from src.services.conectividad import es_fuertemente_conexo_csr
+    grafo = Grafo()
+    grafo.cargar_desde_json("data/red_ejemplo.json")
+    for g in (grafo, _grafo_aleatorio(40, 90, 1), _grafo_aleatorio(30, 29, 2)):
+        csr = g.a_csr()
+        assert csr.num_estaciones() == len(g.obtener_estaciones())
+        assert hay_ciclo_csr(csr) == hay_ciclo(g)
+        assert es_fuertemente_conexo_csr(csr) == es_fuertemente_conexo(g)
+        for origen in g.obtener_estaciones():
+            for destino in g.obtener_estaciones():
+                camino, tiempo = _camino_corto_referencia(g, origen, destino)
+                for modo in ("dijkstra", "bidireccional", "alt"):
+                    camino_csr, tiempo_csr = camino_corto(g, origen, destino, modo=modo)
+                    assert tiempo_csr == tiempo and type(tiempo_csr) is type(tiempo)
+                    if modo == "dijkstra":
+                        assert camino_csr == camino
+
+def test_asignar_peso_crea_version_nueva():
+    grafo = Grafo()
+    grafo.cargar_desde_json("data/red_ejemplo.json")
+    estaciones = grafo.obtener_estaciones()
+    origen, destino = estaciones[0], estaciones[-1]
+    camino, _ = camino_corto(grafo, origen, destino)
+    assert camino is not None and len(camino) > 1
+    version = grafo.version
+    ruta = grafo.obtener_ruta(camino[0], camino[1])
+    ruta.peso += 1000
+    assert grafo.version != version
+    assert camino_corto(grafo, origen, destino) == _camino_corto_referencia(grafo, origen, destino)
+    grafo.eliminar_ruta(ruta)
+    version = grafo.version
+    ruta.peso = 1  # Ya no está en el grafo
+    assert grafo.version == version
+
+def test_csr_es_instantanea(grafo_simple):
+    csr = grafo_simple.a_csr()
+    a = grafo_simple.encontrar_estacion("A")
+    c = grafo_simple.encontrar_estacion("C")
+    grafo_simple.añadir_ruta(Ruta(c, a, 2))
+    assert csr.num_rutas() == 2
+    assert csr.inversa().vecinos(csr.id_de("B")) == [(csr.id_de("A"), 5.0)]
+
+def test_matriz_distancias_metodos():
+    from src.services.distancias import calcular_matriz_distancias
+    grafo = _grafo_aleatorio(25, 60, 3)
+    floyd = calcular_matriz_distancias(grafo, metodo="floyd")
+    dijkstra = calcular_matriz_distancias(grafo, metodo="dijkstra")
+    assert (floyd.d == dijkstra.d).all()
+    for origen in grafo.obtener_estaciones():
+        for destino in grafo.obtener_estaciones():
+            _, tiempo = camino_corto(grafo, origen, destino)
+            assert floyd.tiempo(origen.nombre, destino.nombre) == tiempo
+
+def test_beneficio_conexion_coincide_con_recalculo():
+    from src.services.distancias import calcular_matriz_distancias, beneficio_conexion
+    import numpy as np
+    grafo = _grafo_aleatorio(20, 35, 4)
+    matriz = calcular_matriz_distancias(grafo)
+    estaciones = grafo.obtener_estaciones()
+    a, b = next((a, b) for a in estaciones[1:] for b in estaciones[7:]
+                if a != b and grafo.obtener_ruta(a, b) is None)
+    u, v = matriz.indice[a.nombre], matriz.indice[b.nombre]
+    conectados, ahorro = beneficio_conexion(matriz, u, v, 1)
+    grafo.añadir_ruta(Ruta(a, b, 1))
+    nueva = calcular_matriz_distancias(grafo)
+    antes_finito = np.isfinite(matriz.d)
+    assert conectados == int((~antes_finito & np.isfinite(nueva.d)).sum())
+    assert ahorro == pytest.approx(float((matriz.d[antes_finito] - nueva.d[antes_finito]).sum()))
+
+def test_sugerencias_ordenadas_por_beneficio():
+    from src.services.sugerencias import evaluar_conexiones
+    grafo = Grafo()
+    grafo.cargar_desde_json("data/red_ejemplo.json")
+    evaluaciones = evaluar_conexiones(grafo, 12)
+    claves = [(-conectados, -reduccion) for _, _, _, conectados, reduccion in evaluaciones]
+    assert claves == sorted(claves)
+    assert all(tiempo > 12 for _, _, tiempo, _, _ in evaluaciones)
+
+def test_aplicar_conexion_incremental():
+    from src.services.distancias import calcular_matriz_distancias, aplicar_conexion
+    grafo = _grafo_aleatorio(20, 35, 5)
+    matriz = calcular_matriz_distancias(grafo)
+    for o, d, peso in [("E002", "E010", 1), ("E015", "E000", 2)]:
+        aplicar_conexion(matriz, matriz.indice[o], matriz.indice[d], peso)
+        grafo.añadir_ruta(Ruta(grafo.encontrar_estacion(o), grafo.encontrar_estacion(d), peso))
+    assert (matriz.d == calcular_matriz_distancias(grafo).d).all()
+
+def test_disenar_conexiones_respeta_presupuesto():
+    from src.services.optimizacion import disenar_conexiones
+    from src.services.distancias import calcular_matriz_distancias
+    grafo = Grafo()
+    grafo.cargar_desde_json("data/red_ejemplo.json")
+    antes = calcular_matriz_distancias(grafo)
+    elegidas = disenar_conexiones(grafo, k=3, presupuesto_total=25, tiempo_conexion=10)
+    assert len(elegidas) == 2  # 2 * 10 <= 25 < 3 * 10
+    for origen, destino, peso, _, reduccion in elegidas:
+        assert reduccion > 0
+        grafo.añadir_ruta(Ruta(origen, destino, peso))
+    despues = calcular_matriz_distancias(grafo)
+    ganancia = sum(reduccion for *_, reduccion in elegidas)
+    n = len(antes.nombres)
+    assert ganancia == pytest.approx((antes.d - despues.d).sum() / (n * (n - 1)))
+
+def test_estimar_beneficios():
+    import numpy as np
+    from src.services.distancias import beneficio_conexion, calcular_matriz_distancias, estimar_beneficios
+    grafo = _grafo_aleatorio(20, 30, 7)  # Con pares sin camino
+    matriz = calcular_matriz_distancias(grafo)
+    us, vs = np.nonzero(~np.eye(20, dtype=bool))
+    pesos = (us + vs) % 4 + 1.0
+    # Con la muestra igual a toda la red, la estimación es exacta
+    conectados, ahorros = estimar_beneficios(matriz, us, vs, pesos, muestra=20, elementos_por_lote=1000)
+    for u, v, peso, c, a in zip(us, vs, pesos, conectados, ahorros):
+        assert (c, a) == pytest.approx(beneficio_conexion(matriz, u, v, peso))
+    # Con una muestra menor, cuenta solo una parte de los pares
+    conectados, ahorros = estimar_beneficios(matriz, us, vs, pesos, muestra=8)
+    for u, v, peso, c, a in zip(us, vs, pesos, conectados, ahorros):
+        exacto = beneficio_conexion(matriz, u, v, peso)
+        assert c <= exacto[0] and a <= exacto[1] + 1e-9
+
+def test_disenar_conexiones_con_candidatos_acotados():
+    from src.services.optimizacion import disenar_conexiones
+    from src.services.distancias import calcular_matriz_distancias
+    grafo = _grafo_aleatorio(30, 80, 8)
+    matriz = calcular_matriz_distancias(grafo)
+    todos = disenar_conexiones(grafo, k=3, presupuesto_total=30, tiempo_conexion=3, matriz=matriz)
+    # La versión por pares sigue dando las mismas conexiones con los candidatos explícitos
+    candidatos = [(o.nombre, d.nombre, 3) for o in grafo.obtener_estaciones() for d in grafo.obtener_estaciones()
+                  if o != d and grafo.obtener_ruta(o, d) is None and matriz.tiempo(o.nombre, d.nombre) > 3]
+    assert disenar_conexiones(grafo, k=3, presupuesto_total=30, candidatos=candidatos, matriz=matriz) == todos
+    # Con un tope de candidatos solo se consideran los pares más lejanos
+    lejanos = sorted(candidatos, key=lambda c: matriz.tiempo(c[0], c[1]))[-40:]
+    umbral = matriz.tiempo(lejanos[0][0], lejanos[0][1])
+    for origen, destino, *_ in disenar_conexiones(grafo, k=2, presupuesto_total=30, tiempo_conexion=3,
+                                                  matriz=matriz, max_candidatos=40):
+        assert matriz.tiempo(origen.nombre, destino.nombre) >= umbral
+
+def test_cache_caminos_invalida_por_version():
+    from src.services.cache_caminos import CacheCaminos
+    grafo = Grafo()
+    grafo.cargar_desde_json("data/red_ejemplo.json")
+    cache = CacheCaminos(max_entradas=2)
+    estaciones = grafo.obtener_estaciones()
+    for destino in estaciones:
+        assert cache.camino_corto(grafo, estaciones[0], destino) == camino_corto(grafo, estaciones[0], destino)
+    assert (cache.aciertos, cache.fallos) == (len(estaciones) - 1, 1)
+    actualizar_peso_ruta(grafo, "Estacion Central", "Plaza Norte", 20)
+    assert cache.camino_corto(grafo, estaciones[0], estaciones[2]) == camino_corto(grafo, estaciones[0], estaciones[2])
+    assert cache.fallos == 2
+    cache.camino_corto(grafo, estaciones[1], estaciones[2])
+    cache.camino_corto(grafo, estaciones[2], estaciones[3])
+    assert len(cache) == 2  # Expulsión LRU
+
+def test_version_cambia_con_mutaciones(grafo_simple):
+    from src.services.actualizacion import aplicar_congestion_por_hora
+    versiones = {grafo_simple.version}
+    a = grafo_simple.encontrar_estacion("A")
+    c = grafo_simple.encontrar_estacion("C")
+    grafo_simple.añadir_ruta(Ruta(c, a, 2))
+    versiones.add(grafo_simple.version)
+    aplicar_congestion_por_hora(grafo_simple, 8)
+    versiones.add(grafo_simple.version)
+    grafo_simple.eliminar_estacion(c)
+    versiones.add(grafo_simple.version)
+    assert len(versiones) == 4
+
+def test_caminos_dinamicos_reparan_como_recalculo():
+    import random
+    from src.services.dinamico import CaminosDinamicos
+    from src.services.actualizacion import simular_congestion, aplicar_congestion_por_hora
+    random.seed(7)
+    grafo = _grafo_aleatorio(40, 100, 8)
+    nombres = [e.nombre for e in grafo.obtener_estaciones()]
+    dinamico = CaminosDinamicos(grafo, nombres[:5])
+    lotes = [simular_congestion(grafo, porcentaje=0.2), aplicar_congestion_por_hora(grafo, 22)]
+    # Lote mixto con aumentos y disminuciones
+    mixto = []
+    for estacion in grafo.obtener_estaciones()[:15]:
+        for ruta in grafo.obtener_vecinos(estacion):
+            anterior = ruta.peso
+            ruta.peso = random.choice([0.5, 3, 9])
+            mixto.append((ruta.origen.nombre, ruta.dest.nombre, anterior, ruta.peso))
+    grafo.registrar_cambio()
+    lotes.append(mixto)
+    for lote in lotes:
+        dinamico.aplicar_cambios(lote)
+    for origen in nombres[:5]:
+        for destino in grafo.obtener_estaciones():
+            _, tiempo = camino_corto(grafo, grafo.encontrar_estacion(origen), destino)
+            camino, tiempo_dinamico = dinamico.camino(origen, destino.nombre)
+            assert tiempo_dinamico == pytest.approx(tiempo)
+            if camino:
+                assert camino[0].nombre == origen and camino[-1] == destino
+
+def _costo_camino(grafo, camino):
+    return sum(next(r.peso for r in grafo.obtener_vecinos(a) if r.dest == b) for a, b in zip(camino, camino[1:]))
+
+@pytest.mark.parametrize("semilla", [9, 10])
+def test_modos_de_consulta_coinciden(semilla):
+    from src.services.dijkstra import calcular_landmarks
+    grafo = _grafo_aleatorio(40, 80, semilla)
+    tabla = calcular_landmarks(grafo, cantidad=4)
+    for origen in grafo.obtener_estaciones():
+        for destino in grafo.obtener_estaciones():
+            _, tiempo = camino_corto(grafo, origen, destino)
+            for modo in ("bidireccional", "alt"):
+                camino, tiempo_modo = camino_corto(grafo, origen, destino, modo=modo, landmarks=tabla)
+                assert tiempo_modo == tiempo
+                if camino is not None:
+                    assert camino[0] == origen and camino[-1] == destino
+                    assert _costo_camino(grafo, camino) == tiempo
+
+def test_landmarks_de_otra_version(grafo_simple):
+    from src.services.dijkstra import calcular_landmarks
+    tabla = calcular_landmarks(grafo_simple)
+    a = grafo_simple.encontrar_estacion("A")
+    c = grafo_simple.encontrar_estacion("C")
+    grafo_simple.añadir_ruta(Ruta(c, a, 2))
+    assert grafo_simple.obtener_entrantes(a) == [Ruta(c, a, 2)]
+    with pytest.raises(Exception):
+        camino_corto(grafo_simple, a, c, modo="alt", landmarks=tabla)
+
+def test_landmarks_en_cache_por_version():
+    from src.services.dijkstra import landmarks_de
+    grafo = _grafo_aleatorio(30, 60, 12)
+    a, b = grafo.obtener_estaciones()[:2]
+    esperado = camino_corto(grafo, a, b)
+    assert camino_corto(grafo, a, b, modo="alt") == esperado
+    tabla = landmarks_de(grafo)
+    assert camino_corto(grafo, b, a, modo="alt")[1] == camino_corto(grafo, b, a)[1]
+    assert landmarks_de(grafo) is tabla  # Las consultas sin tabla no la recalculan
+    grafo.registrar_cambio()
+    nueva = landmarks_de(grafo)
+    assert nueva is not tabla and nueva.csr is grafo.a_csr()
+    assert camino_corto(grafo, a, b, modo="alt") == esperado
+
+def test_jerarquia_contraccion_y_personalizacion():
+    from src.services.contraccion import JerarquiaContraccion
+    from src.services.actualizacion import aplicar_congestion_por_hora, simular_congestion
+    grafo = _grafo_aleatorio(40, 90, 11)
+    jerarquia = JerarquiaContraccion(grafo)
+    for paso in range(3):
+        for origen in grafo.obtener_estaciones():
+            for destino in grafo.obtener_estaciones():
+                _, tiempo = camino_corto(grafo, origen, destino)
+                camino, tiempo_ch = jerarquia.camino_corto(origen, destino)
+                assert tiempo_ch == pytest.approx(tiempo)
+                if camino is not None:
+                    assert camino[0] == origen and camino[-1] == destino
+                    assert _costo_camino(grafo, camino) == pytest.approx(tiempo)
+        # Nuevos pesos sin rehacer el orden de contracción
+        if paso == 0:
+            aplicar_congestion_por_hora(grafo, 8)
+        else:
+            simular_congestion(grafo, porcentaje=0.5)
+        jerarquia.personalizar(grafo)
+
+def test_jerarquia_rechaza_rutas_nuevas():
+    from src.services.contraccion import JerarquiaContraccion
+    grafo = _grafo_aleatorio(12, 11, 12)
+    jerarquia = JerarquiaContraccion(grafo)
+    estaciones = grafo.obtener_estaciones()
+    # Un par de estaciones que la jerarquía no conecta ni con una ruta ni con un atajo
+    u, v = next((u, v) for u in range(12) for v in range(12)
+                if u != v and (u, v) not in jerarquia.arco and (v, u) not in jerarquia.arco)
+    grafo.añadir_ruta(Ruta(estaciones[u], estaciones[v], 1))
+    with pytest.raises(Exception):
+        jerarquia.personalizar(grafo)
+
+def _todos_los_caminos(grafo, origen, destino):
+    caminos = []
+    pila = [(origen, [origen], 0)]
+    while pila:
+        actual, camino, costo = pila.pop()
+        if actual == destino:
+            caminos.append((camino, costo))
+            continue
+        for ruta in grafo.obtener_vecinos(actual):
+            if ruta.dest not in camino:
+                pila.append((ruta.dest, camino + [ruta.dest], costo + ruta.peso))
+    return caminos
+
+def test_k_caminos_coincide_con_enumeracion():
+    from src.services.k_caminos import k_caminos_mas_rapidos
+    grafo = _grafo_aleatorio(9, 30, 13)
+    estaciones = grafo.obtener_estaciones()
+    for origen, destino in [(estaciones[0], estaciones[5]), (estaciones[3], estaciones[8])]:
+        todos = _todos_los_caminos(grafo, origen, destino)
+        caminos = k_caminos_mas_rapidos(grafo, origen, destino, k=50)
+        assert [c for _, c in caminos] == sorted(c for _, c in todos)[:50]
+        assert len({tuple(e.nombre for e in camino) for camino, _ in caminos}) == len(caminos)
+        for camino, costo in caminos:
+            assert camino[0] == origen and camino[-1] == destino
+            assert _costo_camino(grafo, camino) == costo
+
+def _grafo_cadena(n):
+    grafo = Grafo()
+    estaciones = [Estacion(f"C{i}") for i in range(n)]
+    for e in estaciones:
+        grafo.añadir_estacion(e)
+    for a, b in zip(estaciones, estaciones[1:]):
+        grafo.añadir_ruta(Ruta(a, b, 1))
+    return grafo
+
+def test_componentes_fuertemente_conexas():
+    from src.services.conectividad import componentes_fuertemente_conexas
+    grafo = _grafo_aleatorio(60, 90, 14)
+    componentes = componentes_fuertemente_conexas(grafo)
+    csr = grafo.a_csr()
+    # Dos estaciones están en la misma componente si y solo si se alcanzan mutuamente
+    alcanza = {}
+    for origen in grafo.obtener_estaciones():
+        for destino in grafo.obtener_estaciones():
+            alcanza[(origen.nombre, destino.nombre)] = camino_corto(grafo, origen, destino)[1] < float("inf")
+    for (a, b), ida in alcanza.items():
+        misma = componentes.componente[csr.id_de(a)] == componentes.componente[csr.id_de(b)]
+        assert misma == (ida and alcanza[(b, a)])
+    assert sum(t * c for t, c in componentes.histograma().items()) == 60
+    for c, salidas in enumerate(componentes.condensacion):
+        assert all(d < c for d in salidas)  # Orden topológico inverso
+    assert all(not componentes.condensacion[c] for c in componentes.sumideros())
+    assert len(componentes_fuertemente_conexas(_grafo_cadena(5000))) == 5000
+
+def test_encontrar_ciclo_sin_recursion():
+    from src.services.ciclos import encontrar_ciclo
+    grafo = _grafo_cadena(5000)
+    assert not hay_ciclo(grafo)
+    assert encontrar_ciclo(grafo) is None
+    estaciones = grafo.obtener_estaciones()
+    grafo.añadir_ruta(Ruta(estaciones[4999], estaciones[2000], 1))
+    ciclo = encontrar_ciclo(grafo)
+    assert hay_ciclo(grafo) and len(ciclo) == 3000
+    for a, b in zip(ciclo, ciclo[1:] + ciclo[:1]):
+        assert any(r.dest == b for r in grafo.obtener_vecinos(a))
+
+def _ciclos_por_fuerza_bruta(grafo):
+    ciclos = set()
+    for inicio in grafo.obtener_estaciones():
+        pila = [(inicio, [inicio])]
+        while pila:
+            actual, camino = pila.pop()
+            for ruta in grafo.obtener_vecinos(actual):
+                if ruta.dest == inicio:
+                    ciclos.add(tuple(e.nombre for e in camino))
+                elif ruta.dest.nombre > inicio.nombre and ruta.dest not in camino:
+                    pila.append((ruta.dest, camino + [ruta.dest]))
+    return ciclos
+
+@pytest.mark.parametrize("longitud_max", [None, 1, 2, 4])
+def test_enumerar_ciclos_coincide_con_fuerza_bruta(longitud_max):
+    from src.services.ciclos import enumerar_ciclos
+    grafo = _grafo_aleatorio(10, 28, 15)
+    a = grafo.obtener_estaciones()[0]
+    grafo.añadir_ruta(Ruta(a, a, 1))
+    esperados = {c for c in _ciclos_por_fuerza_bruta(grafo) if longitud_max is None or len(c) <= longitud_max}
+    ciclos = [tuple(e.nombre for e in ciclo) for ciclo in enumerar_ciclos(grafo, longitud_max)]
+    assert len(ciclos) == len(set(ciclos))
+    assert set(ciclos) == esperados
+
+def test_carga_masiva_formatos(tmp_path):
+    import json
+    from src.model.cargador import cargar_red, cargar_red_csr
+    grafo = _grafo_aleatorio(25, 60, 17)
+    grafo.añadir_estacion(Estacion("Aislada"))
+    rutas = [r for e in grafo.obtener_estaciones() for r in grafo.obtener_vecinos(e)]
+    estaciones = [e.nombre for e in grafo.obtener_estaciones()]
+    ndjson = tmp_path / "red.ndjson"
+    ndjson.write_text("".join(json.dumps({"estacion": n}) + "\n" for n in estaciones)
+                      + "".join(json.dumps({"origen": r.origen.nombre, "destino": r.dest.nombre, "peso": r.peso}) + "\n"
+                                for r in rutas))
+    archivo_csv = tmp_path / "red.csv"
+    archivo_csv.write_text("origen,destino,peso\n" + "".join(f"{r.origen.nombre},{r.dest.nombre},{r.peso}\n" for r in rutas))
+    archivo_json = tmp_path / "red.json"
+    grafo.guardar_a_json(archivo_json)
+    esperado = grafo.a_csr()
+    for archivo in (ndjson, archivo_json):
+        cargado, estadisticas = cargar_red(archivo, tam_bloque=7)
+        assert (estadisticas.estaciones, estadisticas.rutas) == (26, len(rutas))
+        for csr in (cargado.a_csr(), cargar_red_csr(archivo, tam_bloque=7)[0]):
+            assert csr.nombres == esperado.nombres
+            assert list(csr.offsets) == list(esperado.offsets)
+            assert list(csr.destinos) == list(esperado.destinos)
+            assert list(csr.pesos) == list(esperado.pesos)
+            assert list(csr.rango) == list(esperado.rango)
+    # El CSV solo tiene rutas: la estación aislada no aparece y el orden de ids puede cambiar
+    cargado, _ = cargar_red(archivo_csv)
+    csr = cargar_red_csr(archivo_csv)[0]
+    assert "Aislada" not in csr.indice and csr.num_rutas() == len(rutas)
+    for r in rutas:
+        u, v = csr.id_de(r.origen.nombre), csr.id_de(r.dest.nombre)
+        assert (v, r.peso) in csr.vecinos(u)
+        assert cargado.obtener_ruta(cargado.encontrar_estacion(r.origen.nombre),
+                                    cargado.encontrar_estacion(r.dest.nombre)).peso == r.peso
+    ndjson.write_text(ndjson.read_text() + json.dumps({"origen": rutas[0].origen.nombre,
+                                                       "destino": rutas[0].dest.nombre, "peso": 9}) + "\n")
+    with pytest.raises(Exception):
+        cargar_red(ndjson)
+    with pytest.raises(Exception):
+        cargar_red_csr(ndjson)
+
+def test_carga_estricta(tmp_path):
+    import json
+    from src.model.cargador import cargar_red, cargar_red_csr
+    desconocida = tmp_path / "desconocida.json"
+    desconocida.write_text(json.dumps({"estaciones": ["A", "B"],
+                                       "rutas": [{"origen": "A", "destino": "C", "peso": 1}]}))
+    repetida = tmp_path / "repetida.ndjson"
+    repetida.write_text("".join(json.dumps(r) + "\n" for r in (
+        {"estacion": "A"}, {"estacion": "B"}, {"estacion": "A", "transbordo": 3},
+        {"origen": "A", "destino": "B", "peso": 2})))
+    for archivo in (desconocida, repetida):
+        with pytest.raises(Exception):
+            cargar_red(archivo)
+        with pytest.raises(Exception):
+            cargar_red_csr(archivo)
+    with pytest.raises(Exception):
+        Grafo().cargar_desde_json(desconocida)
+    # Sin validar, las estaciones desconocidas se crean y las declaraciones repetidas se combinan
+    grafo, estadisticas = cargar_red(desconocida, estricto=False)
+    assert (estadisticas.estaciones, estadisticas.rutas) == (3, 1)
+    grafo, _ = cargar_red(repetida, estricto=False)
+    assert grafo.encontrar_estacion("A").transbordo == 3
+    assert cargar_red_csr(repetida, estricto=False)[0].nombres == ["A", "B"]
+    # Un CSV que declara estaciones también exige declararlas antes de usarlas
+    archivo_csv = tmp_path / "red.csv"
+    archivo_csv.write_text("origen,destino,peso,transbordo\nA,,,2\nA,B,1,\n")
+    with pytest.raises(Exception):
+        cargar_red(archivo_csv)
+    archivo_csv.write_text("origen,destino,peso,transbordo\nA,,,2\nB,,,\nA,B,1,\n")
+    assert cargar_red(archivo_csv)[1].rutas == 1
+
+def test_guardar_red_conserva_modos_y_transbordos(tmp_path):
+    import json
+    from src.model.cargador import cargar_red, cargar_red_csr, guardar_red
+    grafo = Grafo()
+    a, b, c, d = Estacion("A"), Estacion("B", transbordo=5), Estacion("C"), Estacion("D")
+    for estacion in (a, b, c, d):
+        grafo.añadir_estacion(estacion)
+    b.definir_transbordo("bus", "metro", 1.5)
+    b.definir_transbordo(None, "metro", 2)
+    grafo.añadir_rutas([Ruta(a, b, 2, "bus"), Ruta(b, c, 2.5, "metro"), Ruta(a, c, 9)])
+
+    def resumen(g):
+        estaciones = [(e.nombre, e.transbordo, e.transbordos) for e in g.obtener_estaciones()]
+        rutas = [(r.origen.nombre, r.dest.nombre, r.peso, r.modo)
+                 for e in g.obtener_estaciones() for r in g.obtener_vecinos(e)]
+        return estaciones, rutas
+
+    for nombre in ("red.json", "red.ndjson", "red.csv"):
+        archivo = tmp_path / nombre
+        guardar_red(grafo, archivo)
+        cargado, _ = cargar_red(archivo)
+        assert resumen(cargado) == resumen(grafo)
+        csr = cargar_red_csr(archivo)[0]
+        assert [csr.modo(e) for e in range(csr.num_rutas())] == ["bus", None, "metro"]
+    # guardar_a_json usa el mismo formato: las estaciones sin transbordos siguen siendo solo un nombre
+    grafo.guardar_a_json(tmp_path / "grafo.json")
+    recargado = Grafo()
+    recargado.cargar_desde_json(tmp_path / "grafo.json")
+    assert resumen(recargado) == resumen(grafo)
+    assert json.loads((tmp_path / "grafo.json").read_text())["estaciones"][0] == "A"
+
+def test_snapshot_binario(tmp_path):
+    import json
+    from src.model.snapshot import abrir_snapshot, guardar_snapshot, json_a_snapshot, snapshot_a_json
+    from src.services.dijkstra import camino_corto_csr
+    grafo = _grafo_aleatorio(40, 100, 18)
+    archivo = tmp_path / "red.csr"
+    guardar_snapshot(grafo, archivo)
+    esperado, mapeado = grafo.a_csr(), abrir_snapshot(archivo)
+    assert isinstance(mapeado.destinos, memoryview)
+    assert mapeado.nombres == esperado.nombres
+    for campo in ("offsets", "destinos", "pesos", "rango"):
+        assert list(getattr(mapeado, campo)) == list(getattr(esperado, campo))
+    for u in range(0, 40, 7):
+        for v in range(0, 40, 5):
+            assert camino_corto_csr(mapeado, u, v) == camino_corto_csr(esperado, u, v)
+    # Ida y vuelta con el formato JSON
+    json_a_snapshot("data/red_ejemplo.json", tmp_path / "ejemplo.csr")
+    snapshot_a_json(tmp_path / "ejemplo.csr", tmp_path / "ejemplo.json")
+    with open("data/red_ejemplo.json", encoding="utf-8") as f1, open(tmp_path / "ejemplo.json", encoding="utf-8") as f2:
+        original, convertido = json.load(f1), json.load(f2)
+    assert original["estaciones"] == convertido["estaciones"]
+    clave = lambda r: (r["origen"], r["destino"])
+    assert sorted(original["rutas"], key=clave) == sorted(convertido["rutas"], key=clave)
+    # Un byte alterado se detecta con el checksum
+    datos = bytearray(archivo.read_bytes())
+    datos[-1] ^= 0xFF
+    archivo.write_bytes(bytes(datos))
+    with pytest.raises(Exception):
+        abrir_snapshot(archivo)
+
+def test_estado_red_desde_snapshot(tmp_path):
+    import os
+    from src.model.estado import EstadoRed
+    from src.model.snapshot import abrir_snapshot, cargar_con_snapshot, guardar_snapshot
+    from src.services.actualizacion import actualizar_peso_ruta
+    from src.services.dijkstra import camino_corto_csr
+    grafo = _grafo_aleatorio(30, 90, 21)
+    red_json, archivo = tmp_path / "red.json", tmp_path / "red.csr"
+    grafo.guardar_a_json(red_json)
+    guardar_snapshot(grafo, archivo)
+    os.utime(archivo, (os.path.getmtime(red_json) + 1,) * 2)
+    # La instantánea al día se publica tal cual, sin reconstruir un Grafo
+    estado = EstadoRed(lambda: cargar_con_snapshot(red_json, archivo))
+    publicada = estado.actual()
+    assert isinstance(publicada.csr.destinos, memoryview) and estado._grafo is None
+    assert camino_corto_csr(publicada.csr, 0, 29) == camino_corto_csr(grafo.a_csr(), 0, 29)
+    # El Grafo privado se reconstruye recién con el primer escritor
+    ruta = next(r for e in grafo.obtener_estaciones() for r in grafo.obtener_vecinos(e))
+    estado.modificar_pesos(lambda g: actualizar_peso_ruta(g, ruta.origen.nombre, ruta.dest.nombre, 99))
+    nueva = estado.actual()
+    assert nueva.csr.destinos is publicada.csr.destinos and nueva.version != publicada.version
+    assert nueva.obtener_ruta(nueva.encontrar_estacion(ruta.origen.nombre), nueva.encontrar_estacion(ruta.dest.nombre)).peso == 99
+    assert estado.activar_hora(8).version != nueva.version
+    # Un archivo vacío o truncado es un error del proyecto, no un ValueError de mmap
+    for contenido in (b"", archivo.read_bytes()[:40], archivo.read_bytes()[:-8]):
+        (tmp_path / "malo.csr").write_bytes(contenido)
+        with pytest.raises(Exception) as error:
+            abrir_snapshot(tmp_path / "malo.csr")
+        assert error.type is Exception
+
+def test_estado_red_copy_on_write():
+    import threading
+    from src.model.estado import EstadoRed
+    from src.services.actualizacion import simular_congestion
+    from src.services.dijkstra import camino_corto_csr
+    estado = EstadoRed(lambda: _grafo_aleatorio(30, 90, 19))
+    inicial = estado.actual()
+    pesos_iniciales = list(inicial.a_csr().pesos)
+    cambios = estado.modificar_pesos(lambda g: simular_congestion(g, porcentaje=0.5))
+    nueva = estado.actual()
+    assert nueva.version != inicial.version
+    assert list(inicial.a_csr().pesos) == pesos_iniciales  # La versión vieja no cambia
+    assert nueva.a_csr().destinos is inicial.a_csr().destinos  # La topología se comparte
+    for origen, destino, _, peso_nuevo in cambios:
+        ruta = nueva.obtener_ruta(nueva.encontrar_estacion(origen), nueva.encontrar_estacion(destino))
+        assert ruta.peso == peso_nuevo
+    # Lectores concurrentes con un escritor: cada consulta es coherente con su versión
+    errores = []
+
+    def lector():
+        for i in range(200):
+            csr = estado.actual().a_csr()
+            ids, tiempo = camino_corto_csr(csr, i % 30, (i * 7) % 30)
+            if ids is not None:
+                costo = sum(next(p for d, p in csr.vecinos(a) if d == b) for a, b in zip(ids, ids[1:]))
+                if costo != tiempo:
+                    errores.append((ids, costo, tiempo))
+
+    hilos = [threading.Thread(target=lector) for _ in range(4)]
+    for hilo in hilos:
+        hilo.start()
+    for _ in range(20):
+        estado.modificar_pesos(lambda g: simular_congestion(g, porcentaje=0.3))
+    for hilo in hilos:
+        hilo.join()
+    assert not errores
+
+def test_estado_red_detecta_cambio_de_topologia():
+    from src.model.estado import EstadoRed
+    grafo = Grafo()
+    for nombre in ("A", "B", "C"):
+        grafo.añadir_estacion(Estacion(nombre))
+    grafo.añadir_ruta(Ruta(grafo.encontrar_estacion("A"), grafo.encontrar_estacion("B"), 3))
+    estado = EstadoRed(lambda: grafo)
+    estado.actual()
+
+    def cambiar_ruta(g):
+        # Misma cantidad de estaciones y rutas, distinta topología
+        a = g.encontrar_estacion("A")
+        g.eliminar_ruta(g.obtener_ruta(a, g.encontrar_estacion("B")))
+        g.añadir_ruta(Ruta(a, g.encontrar_estacion("C"), 7))
+
+    estado.modificar_pesos(cambiar_ruta)
+    actual = estado.actual()
+    a = actual.encontrar_estacion("A")
+    assert [(r.dest.nombre, r.peso) for r in actual.obtener_vecinos(a)] == [("C", 7)]
+    assert actual.obtener_ruta(a, actual.encontrar_estacion("B")) is None
+
+def test_instantanea_conserva_pesos_enteros():
+    from src.ui.web_app.app import app, estado_red
+    estado_red.reiniciar()
+    actual = estado_red.actual()
+    central = actual.encontrar_estacion("Estacion Central")
+    assert [type(r.peso) for r in actual.obtener_vecinos(central)] == [int, int]
+    # La página muestra los pesos y el tiempo total como con el Grafo cargado desde JSON
+    html = app.test_client().post("/", data={"origen": "Estacion Central", "destino": "Aeropuerto"}).data.decode()
+    assert "<b>Tiempo total:</b> 24 minutos" in html
+    assert "<td>8</td>" in html and "8.0" not in html
+
+def test_congestion_por_hora_no_acumula(grafo_simple):
+    from src.services.actualizacion import aplicar_congestion_por_hora
+    base = {(r.origen.nombre, r.dest.nombre): r.peso for e in grafo_simple.obtener_estaciones()
+            for r in grafo_simple.obtener_vecinos(e)}
+    aplicar_congestion_por_hora(grafo_simple, 8)
+    aplicar_congestion_por_hora(grafo_simple, 8)
+    for e in grafo_simple.obtener_estaciones():
+        for r in grafo_simple.obtener_vecinos(e):
+            assert r.peso == round(base[(r.origen.nombre, r.dest.nombre)] * 1.6, 2)
+    aplicar_congestion_por_hora(grafo_simple, 12)
+    for e in grafo_simple.obtener_estaciones():
+        for r in grafo_simple.obtener_vecinos(e):
+            assert r.peso == base[(r.origen.nombre, r.dest.nombre)]
+
+def test_perfiles_horarios_y_estado():
+    from src.model.estado import EstadoRed
+    from src.services.actualizacion import aplicar_congestion_por_hora, simular_congestion
+    from src.services.perfiles import PerfilesHorarios
+    grafo = _grafo_aleatorio(25, 60, 20)
+    perfiles = PerfilesHorarios.desde_grafo(grafo, franjas=96)
+    ocho = perfiles.instantanea_hora(8)
+    assert perfiles.instantanea_hora(8) is ocho  # Cambiar de hora no recalcula
+    aplicar_congestion_por_hora(grafo, 8)
+    assert list(ocho.pesos) == pytest.approx(list(grafo.a_csr().pesos))
+    # En el estado compartido, la hora activa se cambia sin tocar las rutas y sin acumular
+    estado = EstadoRed(lambda: _grafo_aleatorio(25, 60, 20))
+    base = list(estado.actual().a_csr().pesos)
+    estado.modificar_pesos(lambda g: simular_congestion(g, porcentaje=0.5))
+    ocho = estado.activar_hora(8)
+    estado.activar_hora(22)
+    assert estado.activar_hora(8) is ocho
+    assert list(ocho.a_csr().pesos) == pytest.approx([round(p * 1.6, 2) for p in base])
+    # Un cambio posterior parte de los pesos de la hora activa
+    estado.modificar_pesos(lambda g: None)
+    assert list(estado.actual().a_csr().pesos) == list(ocho.a_csr().pesos)
+
+def test_cambios_manuales_sobreviven_a_la_hora():
+    from src.model.estado import EstadoRed
+    from src.services.actualizacion import aplicar_congestion_por_hora
+    grafo = _grafo_aleatorio(10, 25, 23)
+    ruta = grafo.obtener_vecinos(grafo.obtener_estaciones()[0])[0]
+    origen, destino = ruta.origen.nombre, ruta.dest.nombre
+    actualizar_peso_ruta(grafo, origen, destino, 99)
+    aplicar_congestion_por_hora(grafo, 12)
+    assert ruta.peso == 99
+    aplicar_congestion_por_hora(grafo, 8)
+    assert ruta.peso == round(99 * 1.6, 2)
+    # En el estado compartido, las versiones por franja anteriores al cambio se descartan
+    estado = EstadoRed(lambda: _grafo_aleatorio(10, 25, 23))
+    estado.activar_hora(12)
+    estado.modificar_pesos(lambda g: actualizar_peso_ruta(g, origen, destino, 99))
+    for hora, esperado in ((12, 99), (8, round(99 * 1.6, 2)), (12, 99)):
+        red = estado.activar_hora(hora)
+        assert red.obtener_ruta(red.encontrar_estacion(origen), red.encontrar_estacion(destino)).peso == esperado
+
+def test_llegada_mas_temprana_dependiente_del_tiempo():
+    import random
+    from src.services.perfiles import PerfilesHorarios, llegada_mas_temprana
+    grafo = _grafo_aleatorio(9, 26, 21)
+    perfiles = PerfilesHorarios.desde_grafo(grafo, franjas=24)
+    rnd = random.Random(21)
+    for e in range(perfiles.csr.num_rutas()):
+        perfiles.establecer_perfil(e, [rnd.uniform(0.5, 2.0) for _ in range(24)])
+    estaciones = grafo.obtener_estaciones()
+    for salida in (0, 7 * 60 + 30, 17 * 60, 23 * 60 + 50):
+        for origen, destino in [(estaciones[0], estaciones[6]), (estaciones[4], estaciones[2])]:
+            camino, llegada = llegada_mas_temprana(grafo, perfiles, origen, destino, salida)
+            # Referencia: la mejor llegada entre todos los caminos simples
+            mejor = float("inf")
+            for alternativa, _ in _todos_los_caminos(grafo, origen, destino):
+                hora = salida
+                for a, b in zip(alternativa, alternativa[1:]):
+                    u, v = perfiles.csr.id_de(a.nombre), perfiles.csr.id_de(b.nombre)
+                    e = next(e for e in range(perfiles.csr.offsets[u], perfiles.csr.offsets[u + 1])
+                             if perfiles.csr.destinos[e] == v)
+                    hora += perfiles.tiempo_viaje(e, hora)
+                mejor = min(mejor, hora)
+            assert llegada == pytest.approx(mejor)
+            assert camino is None or (camino[0] == origen and camino[-1] == destino)
+
+def test_simular_congestion_vectorizada():
+    import numpy as np
+    from src.services.actualizacion import simular_congestion_csr
+    from src.services.dinamico import CaminosDinamicos
+    from src.services.dijkstra import camino_corto_csr
+    grafo = _grafo_aleatorio(30, 80, 22)
+    csr = grafo.a_csr()
+    pesos_originales = list(csr.pesos)
+    nuevo, indices, anteriores, afectados = simular_congestion_csr(csr, np.random.default_rng(5), porcentaje=0.25)
+    repetido = simular_congestion_csr(csr, np.random.default_rng(5), porcentaje=0.25)
+    assert np.array_equal(indices, repetido[1]) and np.array_equal(afectados, repetido[3])  # Reproducible
+    assert len(indices) == 20 and len(set(indices.tolist())) == 20
+    assert list(csr.pesos) == pesos_originales
+    assert np.all(afectados >= np.round(anteriores * 1.2, 2)) and np.all(afectados <= np.round(anteriores * 2.0, 2))
+    for e in range(csr.num_rutas()):
+        esperado = afectados[np.searchsorted(indices, e)] if e in set(indices.tolist()) else pesos_originales[e]
+        assert nuevo.pesos[e] == esperado
+    # Los arreglos se pueden pasar tal cual a la reparación incremental
+    dinamico = CaminosDinamicos(grafo, [csr.nombres[0]])
+    dinamico.aplicar_cambios_por_indice(indices, afectados)
+    for v in range(csr.num_estaciones()):
+        assert dinamico.distancia(csr.nombres[0], csr.nombres[v]) == pytest.approx(camino_corto_csr(nuevo, 0, v)[1])
+
+def test_simular_escenarios_monte_carlo():
+    import numpy as np
+    from src.services.actualizacion import simular_congestion_pesos
+    from src.services.dijkstra import camino_corto_csr
+    from src.services.escenarios import simular_escenarios
+    grafo = _grafo_aleatorio(30, 80, 23)
+    csr = grafo.a_csr()
+    pares = [(csr.nombres[0], csr.nombres[9]), (csr.nombres[0], csr.nombres[17]), (csr.nombres[5], csr.nombres[2])]
+    parciales = [r.completados for r in simular_escenarios(grafo, pares, 40, semilla=3, procesos=1, escenarios_por_tarea=16)]
+    assert parciales == [16, 32, 40]
+    local = list(simular_escenarios(grafo, pares, 40, semilla=3, procesos=1))[-1]
+    paralelo = list(simular_escenarios(grafo, pares, 40, semilla=3, procesos=2, escenarios_por_tarea=7))[-1]
+    assert np.array_equal(local.tiempos, paralelo.tiempos)  # No depende del reparto
+    # El escenario 4 coincide con una simulación directa
+    pesos, _, _, _ = simular_congestion_pesos(csr.pesos, np.random.default_rng([3, 4]))
+    congestionado = csr.con_pesos(memoryview(pesos))
+    for j, (origen, destino) in enumerate(pares):
+        assert local.tiempos[4, j] == camino_corto_csr(congestionado, csr.id_de(origen), csr.id_de(destino))[1]
+    resumen = paralelo.resumen()
+    for j, par in enumerate(pares):
+        columna = local.tiempos[:, j]
+        assert resumen[par]["escenarios"] == 40
+        assert resumen[par]["p50"] <= resumen[par]["p95"] <= resumen[par]["p99"] <= columna.max()
+        if np.isfinite(columna).all():
+            assert resumen[par]["media"] == pytest.approx(columna.mean())
+
+def test_camino_corto_lote():
+    import numpy as np
+    from src.services.dijkstra import camino_corto_lote
+    grafo = _grafo_aleatorio(30, 70, 29)
+    estaciones = grafo.obtener_estaciones()
+    inicios, destinos = estaciones[:6], estaciones[3:20]
+    lote = camino_corto_lote(grafo, inicios, destinos, con_caminos=True)
+    assert lote.tiempos.shape == (6, 17)
+    for i, inicio in enumerate(inicios):
+        for j, destino in enumerate(destinos):
+            camino, tiempo = camino_corto(grafo, inicio, destino)
+            assert lote.tiempo(i, j) == tiempo
+            assert lote.camino(i, j) == camino
+    paralelo = camino_corto_lote(grafo, inicios, destinos, procesos=2)
+    assert np.array_equal(paralelo.tiempos, lote.tiempos)
+    with pytest.raises(Exception):
+        paralelo.camino(0, 0)
+
+def test_api_distancias_ndjson(monkeypatch):
+    import json
+    from src.ui.web_app.app import app
+    monkeypatch.setattr("src.ui.web_app.app.PROCESOS_MAX", 2)
+    cliente = app.test_client()
+    respuesta = cliente.post("/api/distancias", json={"origenes": ["Estacion Central", "Aeropuerto"],
+                                                      "destinos": ["Hospital", "Estacion Central"]})
+    assert respuesta.status_code == 200
+    filas = [json.loads(linea) for linea in respuesta.get_data(as_text=True).splitlines()]
+    assert [f["origen"] for f in filas] == ["Estacion Central", "Aeropuerto"]
+    assert filas[0]["tiempos"]["Estacion Central"] == 0
+    assert cliente.post("/api/distancias", json={"origenes": ["No existe"]}).status_code == 400
+    for cuerpo in ([1, 2], "texto", {"origenes": "Hospital"}, {"origenes": ["Hospital"], "destinos": 3},
+                   {"origenes": ["Hospital"], "procesos": 0}, {"origenes": ["Hospital"], "procesos": "2"}):
+        assert cliente.post("/api/distancias", json=cuerpo).status_code == 400
+    # Con varios procesos las filas llegan en cualquier orden, con los mismos tiempos
+    respuesta = cliente.post("/api/distancias", json={"origenes": ["Estacion Central", "Aeropuerto"],
+                                                      "destinos": ["Hospital", "Estacion Central"], "procesos": 2})
+    assert sorted((json.loads(linea) for linea in respuesta.get_data(as_text=True).splitlines()),
+                  key=lambda fila: fila["origen"] != "Estacion Central") == filas
+
+@pytest.mark.parametrize("procesos", [0, 1])
+def test_api_json(procesos):
+    from starlette.testclient import TestClient
+    from src.ui.api.app import crear_app
+    with TestClient(crear_app(procesos=procesos)) as cliente:
+        respuesta = cliente.get("/api/camino", params={"origen": "Estacion Central", "destino": "Aeropuerto"})
+        assert respuesta.status_code == 200
+        antes = respuesta.json()
+        assert antes["camino"][0] == "Estacion Central" and antes["camino"][-1] == "Aeropuerto"
+        caminos = cliente.get("/api/k_caminos", params={"origen": "Estacion Central", "destino": "Aeropuerto", "k": 3}).json()["caminos"]
+        assert caminos[0]["tiempo"] == antes["tiempo"] and len(caminos) == 3
+        assert cliente.get("/api/componentes").json()["fuertemente_conexa"]
+        assert len(cliente.get("/api/ciclos", params={"limite": 2}).json()["ciclos"]) == 2
+        for parametros in ({"limite": -1}, {"limite": 0}, {"longitud_max": 0}):
+            assert cliente.get("/api/ciclos", params=parametros).status_code == 400
+        assert "sugerencias" in cliente.get("/api/sugerencias").json()
+        assert cliente.get("/api/camino", params={"origen": "Estacion Central", "destino": "X"}).status_code == 404
+        assert cliente.get("/api/k_caminos", params={"origen": "Estacion Central", "destino": "Aeropuerto", "k": "a"}).status_code == 400
+        # La congestión publica una versión nueva que también ven los procesos trabajadores
+        congestion = cliente.post("/api/congestion", json={"porcentaje": 1.0, "factor_min": 2, "factor_max": 2}).json()
+        red = cliente.get("/api/red").json()
+        assert red["version"] == congestion["version"]
+        assert len(congestion["afectadas"]) == len(red["rutas"])
+        despues = cliente.get("/api/camino", params={"origen": "Estacion Central", "destino": "Aeropuerto"}).json()
+        assert despues["tiempo"] == pytest.approx(2 * antes["tiempo"])
+        assert cliente.post("/api/congestion", json={"hora": 30}).status_code == 400
+
+def test_api_instantaneas_en_disco(tmp_path):
+    import os
+    from src.ui.api.app import VERSIONES_EN_DISCO, ServicioRed
+    servicio = ServicioRed(lambda: _grafo_aleatorio(8, 16, 33), procesos=0)
+    servicio._directorio = str(tmp_path)  # Sin pool: solo la gestión de archivos
+    estado = servicio.estado
+
+    def consultar(red):
+        servicio._adquirir_archivo(red)
+        servicio._liberar_archivo(red.version)
+
+    en_curso = servicio._adquirir_archivo(estado.actual())
+    for hora in range(24):
+        consultar(estado.activar_hora(hora))
+    # La tarea en curso conserva su archivo aunque sea el más viejo
+    assert os.path.exists(en_curso)
+    assert len(os.listdir(tmp_path)) == VERSIONES_EN_DISCO
+    # La franja de las 0 vuelve con su versión vieja: su archivo se reescribe y no se borra enseguida
+    ruta = servicio._adquirir_archivo(estado.activar_hora(0))
+    assert os.path.exists(ruta)
+    servicio._liberar_archivo(estado.actual().version)
+    assert os.path.exists(ruta)
+
+def test_grafo_png_cache_y_etag():
+    from src.ui.web_app.app import app, estado_red
+    cliente = app.test_client()
+    parametros = {"origen": "Estacion Central", "destino": "Aeropuerto"}
+    primera = cliente.get("/grafo.png", query_string=parametros)
+    assert primera.status_code == 200 and primera.mimetype == "image/png"
+    etag = primera.headers["ETag"]
+    assert cliente.get("/grafo.png", query_string=parametros).data == primera.data
+    assert cliente.get("/grafo.png", query_string=parametros, headers={"If-None-Match": etag}).status_code == 304
+    sin_camino = cliente.get("/grafo.png")
+    assert sin_camino.headers["ETag"] != etag
+    # Otra versión de los pesos invalida la imagen y vuelve a dar la misma al volver a la red original
+    estado_red.modificar_pesos(lambda g: actualizar_peso_ruta(g, "Estacion Central", "Plaza Norte", 99))
+    cambiada = cliente.get("/grafo.png", query_string=parametros, headers={"If-None-Match": etag})
+    assert cambiada.status_code == 200 and cambiada.headers["ETag"] != etag
+    estado_red.reiniciar()
+    assert cliente.get("/grafo.png", query_string=parametros).headers["ETag"] == etag
+
+def _png_sin_cache(grafo, pos, resaltadas=()):
+    # Dibujo de /grafo.png sin caché: una figura nueva de pyplot por imagen
+    import io
+    import matplotlib.pyplot as plt
+    import networkx as nx
+    G = nx.DiGraph()
+    for estacion in grafo.obtener_estaciones():
+        G.add_node(estacion.nombre)
+    for estacion in grafo.obtener_estaciones():
+        for ruta in grafo.obtener_vecinos(estacion):
+            G.add_edge(ruta.origen.nombre, ruta.dest.nombre, weight=ruta.peso)
+    colores = []
+    for u, v, datos in G.edges(data=True):
+        peso = datos["weight"]
+        colores.append("blue" if (u, v) in resaltadas else "green" if peso <= 7 else "orange" if peso <= 12 else "red")
+    plt.figure(figsize=(12, 9))
+    nx.draw(G, pos, with_labels=True, node_color="lightblue", node_size=2000, font_size=10, arrowsize=20,
+            edge_color=colores, width=2)
+    nx.draw_networkx_edge_labels(G, pos, edge_labels=nx.get_edge_attributes(G, "weight"))
+    buf = io.BytesIO()
+    plt.savefig(buf, format="png")
+    plt.close()
+    return buf.getvalue()
+
+def test_grafo_png_igual_al_dibujo_sin_cache():
+    from src.ui.web_app.app import POSICIONES, app, estado_red
+    cliente = app.test_client()
+    estado_red.reiniciar()
+    grafo = estado_red.actual()
+    assert cliente.get("/grafo.png").data == _png_sin_cache(grafo, POSICIONES)
+    parametros = {"origen": "Estacion Central", "destino": "Aeropuerto"}
+    camino, _ = camino_corto(grafo, grafo.encontrar_estacion("Estacion Central"), grafo.encontrar_estacion("Aeropuerto"))
+    nombres = [e.nombre for e in camino]
+    esperada = _png_sin_cache(grafo, POSICIONES, set(zip(nombres, nombres[1:])))
+    assert cliente.get("/grafo.png", query_string=parametros).data == esperada
+    # Con otros pesos (no enteros) la figura reutilizada cambia colores y etiquetas igual que un dibujo nuevo
+    estado_red.modificar_pesos(lambda g: actualizar_peso_ruta(g, "Estacion Central", "Plaza Norte", 12.5))
+    assert cliente.get("/grafo.png").data == _png_sin_cache(estado_red.actual(), POSICIONES)
+    estado_red.reiniciar()
+
+def test_buscador_caminos_reutiliza_buffers():
+    import random
+    from src.services.dijkstra import BuscadorCaminos, arbol_caminos_csr
+    grafo = _grafo_aleatorio(40, 90, 31)
+    csr = grafo.a_csr()
+    otra = csr.con_pesos([p * 3 for p in csr.pesos])
+    buscador = BuscadorCaminos(csr.num_estaciones())
+    rnd = random.Random(5)
+    for _ in range(200):
+        red = rnd.choice([csr, otra])
+        u, v = rnd.randrange(40), rnd.randrange(40)
+        distances, _ = arbol_caminos_csr(red, u)
+        ids, tiempo = buscador.camino_corto(red, u, v)
+        assert tiempo == distances[v]
+        if ids is None:
+            assert tiempo == float("inf")
+        else:
+            assert ids[0] == u and ids[-1] == v
+            assert sum(dict(red.vecinos(a))[b] for a, b in zip(ids, ids[1:])) == pytest.approx(tiempo)
+    with pytest.raises(Exception):
+        BuscadorCaminos(3).camino_corto(csr, 0, 1)
+
+def test_camino_multimodal_con_transbordos():
+    from src.services.multimodal import IndiceMultimodal, camino_multimodal
+    grafo = Grafo()
+    a, b, c, d, e = (Estacion(n) for n in "ABCDE")
+    for estacion in (a, b, c, d, e):
+        grafo.añadir_estacion(estacion)
+    b.transbordo = 5
+    grafo.añadir_rutas([
+        Ruta(a, b, 2, "bus"), Ruta(b, c, 2, "metro"),
+        Ruta(a, d, 4, "metro"), Ruta(d, c, 4, "metro"),
+        Ruta(a, e, 5, "bus"), Ruta(e, c, 5, "bus"),
+    ])
+    camino, modos, tiempo = camino_multimodal(grafo, a, c)
+    assert [x.nombre for x in camino] == ["A", "D", "C"] and modos == ["metro", "metro"] and tiempo == 8
+    indice = IndiceMultimodal(grafo)
+    assert camino_multimodal(grafo, a, c, prohibidos={"metro"}, indice=indice)[1:] == (["bus", "bus"], 10)
+    assert camino_multimodal(grafo, a, c, permitidos={"bus"}, indice=indice)[2] == 10
+    assert camino_multimodal(grafo, a, d, permitidos={"bus"}, indice=indice) == (None, None, float("inf"))
+    # Los transbordos se leen al construir el índice: cambiarlos requiere registrar el cambio
+    b.definir_transbordo("bus", "metro", 1)
+    grafo.registrar_cambio()
+    camino, modos, tiempo = camino_multimodal(grafo, a, c)
+    assert [x.nombre for x in camino] == ["A", "B", "C"] and modos == ["bus", "metro"] and tiempo == 5
+    with pytest.raises(Exception):
+        camino_multimodal(grafo, a, c, indice=indice)
+
+def test_indice_multimodal_en_cache_por_version():
+    from src.services.multimodal import indice_multimodal_de
+    grafo = Grafo()
+    a, b, c = (Estacion(n) for n in "ABC")
+    for estacion in (a, b, c):
+        grafo.añadir_estacion(estacion)
+    grafo.añadir_rutas([Ruta(a, b, 2, "bus"), Ruta(b, c, 3, "metro")])
+    indice = indice_multimodal_de(grafo)
+    assert indice_multimodal_de(grafo) is indice  # Las consultas de la misma versión no lo reconstruyen
+    actualizar_peso_ruta(grafo, "A", "B", 4)
+    nuevo = indice_multimodal_de(grafo)
+    assert nuevo is not indice and nuevo.version == grafo.version
+    assert nuevo.camino_corto_ids(0, 2)[1] == 7
+
+def test_modos_en_instantaneas(tmp_path):
+    from src.model.estado import EstadoRed
+    from src.model.snapshot import _ENCABEZADO, abrir_snapshot, csr_a_grafo, guardar_snapshot
+    from src.services.multimodal import camino_multimodal
+    grafo = Grafo()
+    a, b, c, d = (Estacion(n) for n in "ABCD")
+    for estacion in (a, b, c, d):
+        grafo.añadir_estacion(estacion)
+    grafo.añadir_rutas([Ruta(a, b, 1, "metro"), Ruta(b, c, 1, "metro"), Ruta(a, d, 2, "bus"),
+                        Ruta(d, c, 3, "bus"), Ruta(c, a, 4)])
+    csr = grafo.a_csr()
+    assert [csr.modo(e) for e in range(csr.num_rutas())] == ["metro", "bus", "metro", None, "bus"]
+    inversa = csr.inversa()
+    assert sorted(map(inversa.modo, range(inversa.num_rutas())), key=str) == [None, "bus", "bus", "metro", "metro"]
+    # La instantánea publicada conserva los modos de las rutas
+    estado = EstadoRed(lambda: grafo)
+    assert camino_multimodal(estado.actual(), a, c, prohibidos={"metro"})[1:] == (["bus", "bus"], 5)
+    # También el archivo binario y el Grafo reconstruido
+    archivo = tmp_path / "red.csr"
+    guardar_snapshot(grafo, archivo)
+    mapeado = abrir_snapshot(archivo)
+    assert [mapeado.modo(e) for e in range(5)] == [csr.modo(e) for e in range(5)]
+    reconstruido = csr_a_grafo(mapeado)
+    assert camino_multimodal(reconstruido, reconstruido.encontrar_estacion("A"), reconstruido.encontrar_estacion("C"),
+                             prohibidos={"metro"})[1:] == (["bus", "bus"], 5)
+    # Las instantáneas de la versión 1 del formato (sin modos) se siguen leyendo
+    sin_modos = tmp_path / "v1.csr"
+    guardar_snapshot(_grafo_aleatorio(10, 20, 3), sin_modos)
+    datos = bytearray(sin_modos.read_bytes())
+    assert _ENCABEZADO.unpack_from(datos, 0)[6:] == (0, 0)
+    datos[8:12] = (1).to_bytes(4, "little")
+    sin_modos.write_bytes(bytes(datos))
+    assert abrir_snapshot(sin_modos).modos is None
+
+def test_camino_multimodal_sin_modos_coincide_con_dijkstra():
+    from src.services.multimodal import IndiceMultimodal, camino_multimodal
+    grafo = _grafo_aleatorio(30, 70, 37)
+    indice = IndiceMultimodal(grafo)
+    assert indice.num_estados() == 30
+    estaciones = grafo.obtener_estaciones()
+    for inicio in estaciones[:5]:
+        for destino in estaciones:
+            camino, tiempo = camino_corto(grafo, inicio, destino)
+            assert camino_multimodal(grafo, inicio, destino, indice=indice)[::2] == (camino, tiempo)
+
+def _horario_aleatorio(semilla):
+    import random
+    from src.model.horario import Horario
+    rnd = random.Random(semilla)
+    paradas = [f"S{i}" for i in range(8)]
+    viajes = []
+    for t in range(40):
+        hora = rnd.randint(0, 120)
+        recorrido = []
+        for parada in rnd.sample(paradas, rnd.randint(2, 5)):
+            recorrido.append((parada, hora, hora + rnd.randint(0, 2)))
+            hora = recorrido[-1][2] + rnd.randint(1, 10)
+        viajes.append((f"V{t}", recorrido))
+    return Horario.desde_viajes(viajes, {p: rnd.randint(0, 3) for p in paradas})
+
+def _llegadas_por_viajes_fuerza_bruta(horario, origen, destino, salida, max_viajes):
+    # Conexiones alcanzables usando como máximo k viajes, por punto fijo
+    m = horario.num_conexiones()
+    siguiente = {(horario.viaje[c], horario.posicion[c]): c for c in range(m)}
+    alcanzables = set()
+    llegadas = []
+    for _ in range(max_viajes):
+        previas = set(alcanzables)
+        nuevas = {c for c in range(m) if horario.desde[c] == origen and horario.salida[c] >= salida}
+        nuevas |= {c for c in range(m) for c2 in previas
+                   if horario.hacia[c2] == horario.desde[c]
+                   and horario.llegada[c2] + horario.cambio[horario.desde[c]] <= horario.salida[c]}
+        pendientes = list(nuevas)
+        while pendientes:
+            c = pendientes.pop()
+            sig = siguiente.get((horario.viaje[c], horario.posicion[c] + 1))
+            if sig is not None and sig not in nuevas:
+                nuevas.add(sig)
+                pendientes.append(sig)
+        alcanzables = previas | nuevas
+        llegadas.append(min((horario.llegada[c] for c in alcanzables if horario.hacia[c] == destino), default=float("inf")))
+    return llegadas
+
+@pytest.mark.parametrize("semilla", [1, 2, 3])
+def test_connection_scan_coincide_con_fuerza_bruta(semilla):
+    from src.services.planificador import llegada_mas_temprana_horario, perfil_horario, viajes_pareto_horario
+    horario = _horario_aleatorio(semilla)
+    assert list(horario.salida) == sorted(horario.salida)
+    for origen in range(len(horario.nombres)):
+        for destino in range(len(horario.nombres)):
+            if origen == destino:
+                continue
+            llegadas = _llegadas_por_viajes_fuerza_bruta(horario, origen, destino, 30, 6)
+            tramos, llegada = llegada_mas_temprana_horario(horario, origen, destino, 30)
+            assert llegada == llegadas[-1]
+            if tramos is not None:
+                assert horario.nombres[tramos[0][1][0]] == horario.nombres[origen] and tramos[-1][1][-1] == destino
+                assert tramos[0][2] >= 30 and tramos[-1][3] == llegada
+                for (_, paradas, _, llega), (_, siguientes, sale, _) in zip(tramos, tramos[1:]):
+                    assert paradas[-1] == siguientes[0]
+                    assert llega + horario.cambio[siguientes[0]] <= sale
+            pareto = viajes_pareto_horario(horario, origen, destino, 30, 6)
+            esperado = [(k + 1, t) for k, t in enumerate(llegadas) if t < (llegadas[k - 1] if k else float("inf"))]
+            assert [(k, t) for k, t, _ in pareto] == esperado
+            for k, t, tramos in pareto:
+                assert len(tramos) == k and tramos[-1][3] == t
+            perfil = perfil_horario(horario, origen, destino, 20, 100)
+            assert all(s1 < s2 and l1 < l2 for (s1, l1), (s2, l2) in zip(perfil, perfil[1:]))
+            # Igual a una consulta por cada salida, de la última a la primera
+            esperado, mejor = [], float("inf")
+            for salida in sorted({horario.salida[c] for c in range(horario.num_conexiones())
+                                  if horario.desde[c] == origen and 20 <= horario.salida[c] <= 100}, reverse=True):
+                llegada = llegada_mas_temprana_horario(horario, origen, destino, salida)[1]
+                if llegada < mejor:
+                    mejor = llegada
+                    esperado.append((salida, llegada))
+            assert perfil == esperado[::-1]
+
+def test_horario_tramos_de_duracion_cero():
+    from src.model.horario import Horario
+    from src.services.planificador import llegada_mas_temprana_horario, perfil_horario
+    # Las conexiones A -> B y B -> C salen y llegan en el mismo minuto, y B tiene un id menor que A
+    horario = Horario.desde_viajes([
+        ("X", [("B", 0, 0), ("A", 5, 5)]),
+        ("Y", [("A", 10, 10), ("B", 10, 10), ("C", 10, 10), ("D", 12, 12)]),
+    ])
+    a, c, d = horario.indice["A"], horario.indice["C"], horario.indice["D"]
+    tramos, llegada = llegada_mas_temprana_horario(horario, a, c, 0)
+    assert llegada == 10 and [horario.nombres[s] for s in tramos[0][1]] == ["A", "B", "C"]
+    assert llegada_mas_temprana_horario(horario, a, d, 0)[1] == 12
+    assert perfil_horario(horario, a, c, 0, 60) == [(10, 10)]
+
+def test_cargar_horarios_y_camino_horario(tmp_path):
+    from src.model.horario import cargar_horarios
+    from src.services.planificador import camino_horario
+    grafo = Grafo()
+    for nombre in ("A", "B", "C"):
+        grafo.añadir_estacion(Estacion(nombre, transbordo=2))
+    archivo = tmp_path / "stop_times.csv"
+    archivo.write_text(
+        "trip_id,arrival_time,departure_time,stop_id,stop_sequence\n"
+        "L1,08:00:00,08:00:00,A,1\nL1,08:10:00,08:11:00,B,2\n"
+        "L2,08:12:00,08:12:00,B,1\nL2,08:20:00,08:20:00,C,2\n"
+        "L3,08:15:00,08:15:00,B,2\nL3,08:05:00,08:05:00,A,1\nL3,08:25:00,08:25:00,C,3\n",
+        encoding="utf-8",
+    )
+    horario = cargar_horarios(archivo, grafo)
+    assert horario.num_conexiones() == 4 and horario.cambio[horario.indice["B"]] == 2
+    a, c = grafo.encontrar_estacion("A"), grafo.encontrar_estacion("C")
+    camino, tiempo = camino_horario(grafo, horario, a, c, "07:55")
+    assert [e.nombre for e in camino] == ["A", "B", "C"] and camino[0] is a
+    assert tiempo == 8 * 60 + 20 - (7 * 60 + 55)  # L1 y transbordo en B a L2
+    grafo.encontrar_estacion("B").transbordo = 5
+    camino, tiempo = camino_horario(grafo, cargar_horarios(archivo, grafo), a, c, "08:00")
+    assert tiempo == 25  # Sin tiempo para el transbordo: L1 hasta B no sirve, se toma L3
+    assert camino_horario(grafo, horario, a, c, "09:00") == (None, float("inf"))
+
+def test_isocrona_acotada_y_multiorigen():
+    from src.services.dijkstra import arbol_caminos_csr
+    from src.services.isocronas import isocrona, isocrona_csr
+    grafo = _grafo_aleatorio(60, 150, 41)
+    csr = grafo.a_csr()
+    for limite in (0, 5, 12, 30, 1000):
+        alcanzadas = isocrona_csr(csr, [3], limite)
+        distances, _ = arbol_caminos_csr(csr, 3)
+        assert dict(alcanzadas) == {i: d for i, d in enumerate(distances) if d <= limite}
+        assert [t for _, t in alcanzadas] == sorted(t for _, t in alcanzadas)
+    # Varios orígenes en una pasada: el tiempo es el del origen más cercano
+    origenes = [grafo.encontrar_estacion(csr.nombres[i]) for i in (0, 7, 21)]
+    juntas = isocrona(grafo, origenes, 10)
+    por_separado = {}
+    for origen in origenes:
+        for estacion, tiempo in isocrona(grafo, origen, 10).items():
+            por_separado[estacion] = min(tiempo, por_separado.get(estacion, tiempo))
+    assert juntas == por_separado and all(juntas[o] == 0 for o in origenes)
+    with pytest.raises(Exception):
+        isocrona_csr(csr, [0], -1)
+
+def test_isocrona_web():
+    from src.ui.web_app.app import app
+    cliente = app.test_client()
+    parametros = {"origen": ["Estacion Central", "Hospital"], "minutos": 8}
+    datos = cliente.get("/isocrona", query_string={**parametros, "formato": "json"}).get_json()
+    assert {"estacion": "Hospital", "minutos": 0} in datos
+    assert all(d["minutos"] <= 8 for d in datos)
+    imagen = cliente.get("/isocrona", query_string=parametros)
+    assert imagen.status_code == 200 and imagen.mimetype == "image/png"
+    assert imagen.headers["ETag"] != cliente.get("/grafo.png").headers["ETag"]
+    assert cliente.get("/isocrona", query_string=parametros,
+                       headers={"If-None-Match": imagen.headers["ETag"]}).status_code == 304
+    assert cliente.get("/isocrona", query_string={"origen": "Nadie"}).status_code == 400
+    assert cliente.get("/isocrona", query_string={"origen": "Hospital", "minutos": "nan"}).status_code == 400
+    # El formulario valida igual: minutos u origen inválidos muestran un aviso, no un error 500
+    for formulario in ({"origen_isocrona": "Hospital", "minutos": "diez"}, {"origen_isocrona": "Nadie", "minutos": 5},
+                       {"origen_isocrona": "Hospital", "minutos": -1}):
+        pagina = cliente.post("/", data={"isocrona": "1", **formulario})
+        assert pagina.status_code == 200 and "minutos &gt;= 0" in pagina.get_data(as_text=True)
+    pagina = cliente.post("/", data={"isocrona": "1", "origen_isocrona": "Hospital", "minutos": 8}).get_data(as_text=True)
+    assert "en 8 minutos" in pagina and "/isocrona?origen=Hospital&minutos=8" in pagina
+    # La leyenda de /ayuda usa los mismos colores que la imagen
+    from src.ui.web_app.render import color_isocrona
+    ayuda = cliente.get("/ayuda").get_data(as_text=True)
+    assert all(f"color:{color_isocrona(t, 9)};" in ayuda for t in (0, 2, 5, 8))
+
+def _impacto_a_mano(grafo, eliminar):
+    # Referencia: copia el grafo, elimina el elemento y recalcula todos los pares
+    from src.model.snapshot import csr_a_grafo
+    from src.services.distancias import calcular_matriz_distancias
+    base = calcular_matriz_distancias(grafo, "dijkstra")
+    copia = csr_a_grafo(grafo.a_csr())
+    eliminar(copia)
+    nueva = calcular_matriz_distancias(copia, "dijkstra")
+    aumento, desconectados, pares = 0.0, 0, 0
+    for i in nueva.nombres:
+        for j in nueva.nombres:
+            antes, despues = base.tiempo(i, j), nueva.tiempo(i, j)
+            if i != j and antes != float("inf"):
+                pares += 1
+                if despues == float("inf"):
+                    desconectados += 1
+                else:
+                    aumento += despues - antes
+    return aumento / pares, desconectados
+
+@pytest.mark.parametrize("procesos", [1, 2])
+def test_ranking_resiliencia(procesos):
+    from src.services.resiliencia import ranking_resiliencia
+    grafo = _grafo_aleatorio(25, 55, 17 + procesos)
+    ranking = ranking_resiliencia(grafo, procesos=procesos, origenes_por_tarea=7)
+    assert len(ranking) == 25 + grafo.a_csr().num_rutas()
+    assert [(d, a) for _, a, d in ranking] == sorted(((d, a) for _, a, d in ranking), reverse=True)
+    for elemento, aumento, desconectados in ranking:
+        if isinstance(elemento, tuple):
+            def eliminar(g, origen=elemento[0], destino=elemento[1]):
+                g.eliminar_ruta(g.obtener_ruta(g.encontrar_estacion(origen), g.encontrar_estacion(destino)))
+        else:
+            def eliminar(g, nombre=elemento):
+                g.eliminar_estacion(g.encontrar_estacion(nombre))
+        esperado_aumento, esperado_desconectados = _impacto_a_mano(grafo, eliminar)
+        assert desconectados == esperado_desconectados
+        assert aumento == pytest.approx(esperado_aumento)
+    # Solo estaciones, y el grafo original no se modifica
+    version = grafo.version
+    solo_estaciones = ranking_resiliencia(grafo, rutas=False)
+    assert all(isinstance(e, str) for e, _, _ in solo_estaciones) and len(solo_estaciones) == 25
+    assert grafo.version == version